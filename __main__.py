@@ -5,7 +5,96 @@ python3 -m pip install -r candy_cat/requirements.txt
 python3 -m pip install -U pygame --user
 
 """
+import sys
+from typing import List
+from services.startup_profiler import StartupProfiler
+PROFILER: StartupProfiler = StartupProfiler('--profile-startup' in sys.argv)
+# pygame only falls back on its own files when pkg_resources is missing and
+# imports NumPy for pygame.surfarray / sndarray when it is installed: both
+# would double the startup time. They are hidden while pygame is imported
+# only, other modules import them as usual afterwards (NumPy is then only
+# loaded by the levels big enough to need it, import pygame.surfarray
+# explicitly to use it)
+HIDDEN_MODULES: List[str] = [name for name in ('pkg_resources', 'numpy')
+                             if name not in sys.modules]
+for hidden_module in HIDDEN_MODULES:
+    sys.modules[hidden_module] = None
+try:
+    import pygame # pylint: disable=unused-import
+finally:
+    for hidden_module in HIDDEN_MODULES:
+        del sys.modules[hidden_module]
+# pylint: disable=wrong-import-position
+import argparse
+from typing import Tuple
 from services.application_service import start
+from services.application_service import GAME_LIST
+from services.application_service import SCORE_STORES
+from services.replay_service import replay
+from domain.common import Common
+from infrastructure.asset_pack import AssetPack
+
+def address(host_port: str) -> Tuple[str, int]:
+    """
+    HOST:PORT
+    """
+    host, port = host_port.rsplit(':', 1)
+    return host, int(port)
+
+def size(width_height: str) -> Tuple[int, int]:
+    """
+    WIDTHxHEIGHT
+    """
+    width, height = width_height.lower().split('x')
+    return int(width), int(height)
 
 if __name__ == "__main__":
-    start()
+    parser = argparse.ArgumentParser(prog='candy_cat')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record all inputs of the session in FILE')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='replay a recorded session headless and verify it')
+    parser.add_argument('--hash-interval', type=int, default=80,
+                        help='ticks between two state hashes in recordings')
+    parser.add_argument('--snapshot', metavar='FILE',
+                        help='resume the game saved in FILE and save it there when leaving')
+    parser.add_argument('--render-size', type=size, default=(1000, 800), metavar='WxH',
+                        help='resolution the game is drawn at')
+    parser.add_argument('--window-size', type=size, metavar='WxH',
+                        help='size of the window, the game is scaled to it')
+    parser.add_argument('--smooth', action='store_true',
+                        help='smooth scaling instead of nearest neighbour')
+    parser.add_argument('--frame-stats', action='store_true',
+                        help='print the frame rate and CPU usage every second')
+    parser.add_argument('--build-asset-pack', action='store_true',
+                        help=f'pack all assets in {Common.ASSET_PACK} and leave')
+    parser.add_argument('--serve', type=address, metavar='HOST:PORT',
+                        help='host one headless game per client connecting to HOST:PORT')
+    parser.add_argument('--tick-rate', type=int, default=80,
+                        help='ticks per second of the games hosted by --serve')
+    parser.add_argument('--fixed-point', action='store_true',
+                        help='integer physics, identical on every machine')
+    parser.add_argument('--score-store', choices=SCORE_STORES, default=SCORE_STORES[0],
+                        help='every score in scores.db, or only the wall of fames in scores.txt')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report where the time goes until the first game frame')
+    arguments = parser.parse_args()
+    PROFILER.mark('imports')
+
+    if arguments.build_asset_pack:
+        number_assets: int = AssetPack.build(Common.GAME_NAME, Common.ASSET_PACK)
+        print(f'{number_assets} assets packed in {Common.ASSET_PACK}')
+        sys.exit(0)
+
+    if arguments.serve is not None:
+        # asyncio is only imported by the server
+        from services.game_server_service import serve # pylint: disable=import-outside-toplevel
+        serve(*arguments.serve, GAME_LIST, arguments.tick_rate, report=arguments.frame_stats)
+        sys.exit(0)
+
+    if arguments.replay is not None:
+        sys.exit(0 if replay(arguments.replay) else 1)
+
+    start(arguments.record, arguments.hash_interval, arguments.snapshot, PROFILER,
+          arguments.render_size, arguments.window_size, arguments.smooth,
+          arguments.frame_stats, arguments.fixed_point, arguments.score_store)
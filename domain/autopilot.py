@@ -0,0 +1,262 @@
+"""
+Paddle controlled by the game itself, for headless tests and soak runs
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from random import Random
+from typing import Dict, Hashable, List, Set, Tuple
+import math
+from domain.collision_handler.collision_handler import CollisionHandler
+from domain.collision_handler.exposed_faces import ExposedFaces
+from domain.metrics import Metrics
+from domain.sprites.sprites import Ball
+from domain.sprites.sprites import UserControlledGameMovingSprite
+
+@dataclass(frozen=True, slots=True)
+class AutopilotProfile:
+    """
+    How well the autopilot plays: reaction_ticks before it reacts to a
+    bounce, max_speed pixels per tick of the paddle (None: instantly),
+    aim_error pixels at most between the ball and the middle of the
+    paddle, miss_rate probability of missing the ball on purpose
+    """
+    name: str
+    reaction_ticks: int = 0
+    max_speed: float = None
+    aim_error: float = 0
+    miss_rate: float = 0
+
+PERFECT: AutopilotProfile = AutopilotProfile('perfect')
+HUMAN: AutopilotProfile = AutopilotProfile('human', reaction_ticks=15, max_speed=12, aim_error=30)
+RANDOM_MISS: AutopilotProfile = AutopilotProfile('random-miss', miss_rate=0.1)
+PROFILES: Dict[str, AutopilotProfile] = {profile.name: profile
+                                         for profile in (PERFECT, HUMAN, RANDOM_MISS)}
+
+class TrajectoryPredictor:
+    """
+    Where and when the ball reaches the line of the paddle. The ball goes
+    straight between two bounces: the tick of the next bounce against the
+    walls or the exposed faces of the static sprites is computed for each
+    of them in O(1), with the same rules as Ball.move and the collision
+    handler, instead of simulating the ball tick by tick. Only the sprites
+    in the buckets of ExposedFaces along the path are tested, section after
+    section until the first bounce: a bounce costs O(length of the path /
+    SPAN_BUCKET + sprites close to the path), not O(sprites).
+    """
+    # Bounces followed before giving up (the ball may be trapped)
+    MAX_BOUNCES: int = 64
+
+    def __init__(self, exposed_faces: ExposedFaces, screen_size: Tuple[int, int],
+                 ball_size: Tuple[float, float], paddle_top: float):
+        self.exposed_faces: ExposedFaces = exposed_faces
+        self.screen_width, self.screen_height = screen_size
+        self.ball_width, self.ball_height = ball_size
+        self.paddle_top: float = paddle_top
+
+    def predict(self, position: Tuple[float, float],
+                speed: Tuple[float, float]) -> Tuple[int, float]:
+        """
+        Number of ticks until the ball is checked against the paddle line and
+        its left position then, None if it does not come back in MAX_BOUNCES
+        """
+        pos_x, pos_y = position
+        change_x, change_y = speed
+        if change_x == 0 or change_y == 0:
+            return None
+        # Moves covered by a section of the path: about one bucket long
+        section: int = max(int(ExposedFaces.SPAN_BUCKET // max(abs(change_x), abs(change_y))), 1)
+        # Bumps left to the bricks the ball goes through during the prediction
+        remaining_bumps: Dict[Hashable, int] = {}
+        ticks: int = 0
+        for _ in range(self.MAX_BOUNCES):
+            # Ticks (moves made) before each event
+            tick: int = self.__first_wall_tick(pos_x, change_x, 1, self.screen_width - self.ball_width)
+            if change_y < 0:
+                tick = min(tick, self.__first_wall_tick(pos_y, change_y, 1, math.inf))
+            hits: List[Tuple[Hashable, Tuple[float, float, float, float]]] = []
+            tested: Set[Hashable] = set()
+            first_move: int = 1
+            # A sprite not tested yet cannot be hit before the last move tested
+            while first_move <= tick + 1:
+                last_move: int = min(first_move + section - 1, tick + 1)
+                lefts: Tuple[float, float] = (pos_x + first_move * change_x,
+                                              pos_x + last_move * change_x)
+                tops: Tuple[float, float] = (pos_y + first_move * change_y,
+                                             pos_y + last_move * change_y)
+                for sprite, rect in self.exposed_faces.get_rects_in(
+                        min(lefts), min(tops), max(lefts) + self.ball_width,
+                        max(tops) + self.ball_height).items():
+                    if sprite in tested or remaining_bumps.get(sprite, 1) <= 0:
+                        continue
+                    tested.add(sprite)
+                    brick_tick: int = self.__first_overlap_tick(pos_x, pos_y, change_x, change_y,
+                                                                rect, tick)
+                    if brick_tick is None:
+                        continue
+                    if brick_tick < tick:
+                        tick = brick_tick
+                        hits.clear()
+                    hits.append((sprite, rect))
+                first_move = last_move + 1
+            if change_y > 0:
+                paddle_tick: int = max(math.ceil((self.paddle_top - pos_y - self.ball_height)
+                                                 / change_y) - 1, 0)
+                if paddle_tick <= tick:
+                    return ticks + paddle_tick, pos_x + (paddle_tick + 1) * change_x
+
+            pos_x += tick * change_x
+            pos_y += tick * change_y
+            flip_x: bool = pos_x < 1 or pos_x + self.ball_width > self.screen_width
+            flip_y: bool = pos_y < 1
+            for sprite, rect in hits:
+                sides: Set[str] = self.__get_sides(pos_x + change_x, pos_y + change_y,
+                                                   change_x, change_y, sprite, rect)
+                if len(sides) == 0:
+                    continue
+                flip_x = flip_x or CollisionHandler.HORIZONTAL in sides
+                flip_y = flip_y or CollisionHandler.VERTICAL in sides
+                bumps: int = remaining_bumps.get(sprite,
+                                                 getattr(sprite, 'number_remaining_bumps', math.inf))
+                remaining_bumps[sprite] = bumps - 1
+            if flip_x:
+                change_x = -change_x
+            if flip_y:
+                change_y = -change_y
+            pos_x += change_x
+            pos_y += change_y
+            ticks += tick + 1
+        return None
+
+    @staticmethod
+    def __first_wall_tick(position: float, change: float, low: float, high: float) -> int:
+        """
+        First tick at which position + tick * change leaves [low, high]
+        """
+        if change < 0:
+            return 0 if position < low else math.floor((position - low) / -change) + 1
+        return 0 if position > high else math.floor((high - position) / change) + 1
+
+    def __first_overlap_tick(self, pos_x: float, pos_y: float, change_x: float, change_y: float,
+                             rect: Tuple[float, float, float, float], before: int) -> int:
+        """
+        First tick, up to before, at which the next position of the ball
+        overlaps rect (edges included)
+        """
+        left, top, right, bottom = rect
+        first: float = 1
+        last: float = before + 1
+        for position, change, low, high in ((pos_x, change_x, left - self.ball_width, right),
+                                             (pos_y, change_y, top - self.ball_height, bottom)):
+            start, end = (low - position) / change, (high - position) / change
+            if start > end:
+                start, end = end, start
+            first = max(first, start)
+            last = min(last, end)
+        moves: int = math.ceil(first)
+        return moves - 1 if moves <= last else None
+
+    def __get_sides(self, left: float, top: float, change_x: float, change_y: float,
+                    sprite: Hashable, rect: Tuple[float, float, float, float]) -> Set[str]:
+        """
+        Same rule as the collision handler: the exposed face crossed last
+        during the move
+        """
+        right: float = left + self.ball_width
+        bottom: float = top + self.ball_height
+        static_left, static_top, static_right, static_bottom = rect
+        exposed_faces: Set[str] = self.exposed_faces.get(sprite)
+        entry_x: float = None
+        entry_y: float = None
+        if change_x > 0 and CollisionHandler.LEFT in exposed_faces and \
+           right - change_x <= static_left:
+            entry_x = (static_left - right + change_x) / change_x
+        elif change_x < 0 and CollisionHandler.RIGHT in exposed_faces and \
+             left - change_x >= static_right:
+            entry_x = (left - change_x - static_right) / -change_x
+        if change_y > 0 and CollisionHandler.TOP in exposed_faces and \
+           bottom - change_y <= static_top:
+            entry_y = (static_top - bottom + change_y) / change_y
+        elif change_y < 0 and CollisionHandler.BOTTOM in exposed_faces and \
+             top - change_y >= static_bottom:
+            entry_y = (top - change_y - static_bottom) / -change_y
+        sides: Set[str] = set()
+        if entry_x is not None and (entry_y is None or entry_x >= entry_y):
+            sides.add(CollisionHandler.HORIZONTAL)
+        if entry_y is not None and (entry_x is None or entry_y >= entry_x):
+            sides.add(CollisionHandler.VERTICAL)
+        return sides
+
+class Autopilot:
+    """
+    Moves a paddle under the ball. The ball is only predicted again when it
+    did not move as expected since the last tick (it bounced, or it was put
+    back on the paddle): between two bounces update costs a few comparisons.
+    """
+    def __init__(self, paddle: UserControlledGameMovingSprite, ball: Ball,
+                 exposed_faces: ExposedFaces, profile: AutopilotProfile = PERFECT,
+                 random: Random = None):
+        self.paddle: UserControlledGameMovingSprite = paddle
+        self.ball: Ball = ball
+        self.profile: AutopilotProfile = profile
+        self.random: Random = random if random is not None else Random(0)
+        screen_width, screen_height = ball.display.screen_width, ball.display.screen_height
+        self.predictor: TrajectoryPredictor = TrajectoryPredictor(
+            exposed_faces, (screen_width, screen_height),
+            (ball.get_width(), ball.get_height()), screen_height - paddle.get_height())
+        # Ball movement expected at the next tick
+        self.expected: Tuple[float, float, float, float] = None
+        # Where the middle of the paddle goes, and from which tick on
+        self.target_x: float = None
+        self.target_tick: int = 0
+        self.tick: int = 0
+        paddle_left, _ = paddle.get_position()
+        self.paddle_x: float = paddle_left + paddle.get_width() // 2
+
+    def update(self) -> None:
+        """
+        Called once per tick before the game is updated
+        """
+        self.tick += 1
+        movement: Tuple[float, float, float, float] = self.ball.get_movement()
+        if movement != self.expected:
+            self.__predict(movement)
+        pos_x, pos_y, change_x, change_y = movement
+        self.expected = (pos_x + change_x, pos_y + change_y, change_x, change_y)
+        if self.target_x is not None and self.tick >= self.target_tick:
+            self.__move_paddle()
+
+    def __predict(self, movement: Tuple[float, float, float, float]) -> None:
+        """
+        New target for the paddle
+        """
+        pos_x, pos_y, change_x, change_y = movement
+        Metrics.add('autopilot.predictions')
+        prediction: Tuple[int, float] = self.predictor.predict((pos_x, pos_y),
+                                                                (change_x, change_y))
+        if prediction is None:
+            return
+        _, ball_x = prediction
+        target_x: float = ball_x + self.ball.get_width() / 2
+        profile: AutopilotProfile = self.profile
+        if profile.miss_rate > 0 and self.random.random() < profile.miss_rate:
+            target_x += self.random.choice((-1, 1)) * self.paddle.get_width()
+        elif profile.aim_error > 0:
+            target_x += self.random.uniform(-profile.aim_error, profile.aim_error)
+        # The paddle does not move when the mouse is too close to the sides
+        half_width: int = self.paddle.get_width() // 2
+        self.target_x = min(max(target_x, half_width + 1),
+                            self.ball.display.screen_width - half_width - 1)
+        self.target_tick = self.tick + profile.reaction_ticks
+
+    def __move_paddle(self) -> None:
+        """
+        Straight to the target, or at max_speed
+        """
+        distance: float = self.target_x - self.paddle_x
+        if distance == 0:
+            return
+        if self.profile.max_speed is not None and abs(distance) > self.profile.max_speed:
+            distance = math.copysign(self.profile.max_speed, distance)
+        self.paddle_x += distance
+        # Like the mouse, on the screen (see ScrollingLevel)
+        self.paddle.mouse_position_move((round(self.paddle_x) - self.paddle.view_x, 0))
@@ -5,6 +5,7 @@ from abc import ABC, abstractmethod
 from typing import Tuple
 from typing import Dict
 from domain.sprites.base_classes.base_sprite import BaseSprite
+from infrastructure.gui_library import SoundPlayer
 #from pprint import pprint
 class CollisionHandler(ABC):
     """
@@ -58,7 +59,14 @@ class CollisionHandler(ABC):
         """
 
     @abstractmethod
-    def unsubscribe(self, sprite) -> None:
+    def play_sound(self, sound: SoundPlayer) -> None:
         """
-        Unsubscribe the sprite
+        When a sprite is bumped, it can play a sound
+        """
+
+    @abstractmethod
+    def unsubscribe(self, sprite, inform_player_won: bool = True) -> None:
+        """
+        Unsubscribe the sprite, when the last brick bringing points is
+        unsubscribed the player won (unless inform_player_won is False)
         """
@@ -8,12 +8,14 @@ from typing import Set
 
 from domain.sprites.base_classes.static_sprite import StaticSprite
 from domain.collision_handler.collision_handler import CollisionHandler
+from domain.collision_handler.exposed_faces import ExposedFaces
+from domain.collision_handler.free_space_field import FreeSpaceField
+from domain.collision_handler.live_bricks import LiveBricks
+from domain.metrics import Metrics
 from domain.sprites.base_classes.static_sprite import Brick
 from domain.sprites.sprites import GameMovingSprite
-from domain.user_panel_interface.score_banner import Score
-from domain.game_task_handler import WinLostManagement
-
-from pprint import pprint
+from domain.frame_events import FrameEvents
+from infrastructure.gui_library import SoundPlayer
 
 class CollisionHandlerSprites(CollisionHandler):
     """
@@ -25,63 +27,52 @@ class CollisionHandlerSprites(CollisionHandler):
     PERIMETER='perimeter'
     PERIMETER_OPTIMIZED='perimeter_optimized'
 
-    def __init__(self, score: Score, win_lost_management: WinLostManagement):
-        self.score = score
+    def __init__(self, frame_events: FrameEvents):
+        self.frame_events: FrameEvents = frame_events
         self.sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]] = {}
-        self.sprite_ids_around_sprite_id: Dict[str, List[str]] = {}
         self.dynamic_sprites: Set[StaticSprite] = set()
-        self.bricks_must_disappear: Set[Brick] = set()
-        self.win_lost_management: WinLostManagement = win_lost_management
-
-    @staticmethod
-    def __get_sprites_around_sprite_from_sprite_id(sprite_ids: List[str], 
-                                                   sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]]) -> List[StaticSprite]:
-        return_sprites: List[StaticSprite] = [ sprite for sprite in sprites_to_perimeter.keys() \
-                                              if sprite.get_unique_id() in sprite_ids]
-        return return_sprites    
-
-    def __get_coordinates_corners(self, sprite: StaticSprite, optimized: bool):
-       perimeter = self.__get_perimeter(sprite, optimized, self.sprites_to_perimeter)
-       return (perimeter[0]['x'], perimeter[0]['y'], perimeter[1]['x'], perimeter[1]['y'])
-         
-    def __update_perimeters_around_added_sprite(self, current_sprite: StaticSprite, 
-                                                optimized: bool) -> None:
-        (current_sprite_pos_x, current_sprite_pos_y, current_sprite_width, current_sprite_height) = \
-            self.__get_coordinates_corners(current_sprite, optimized)
-        
-        self.sprite_ids_around_sprite_id[current_sprite.get_unique_id()] = []
-        max_diff: int = 2
-        sprite_list: List[StaticSprite] = [sprite for sprite in self.sprites_to_perimeter \
-                                  if sprite != current_sprite and sprite.get_unique_id() not in self.sprite_ids_around_sprite_id[current_sprite.get_unique_id()]]
-
-        for other_sprite in sprite_list:
-            (other_sprite_pos_x, other_sprite_pos_y, other_sprite_width, other_sprite_height) = \
-                self.__get_coordinates_corners(other_sprite, optimized)
-            if (abs(current_sprite_pos_x + current_sprite_width - other_sprite_pos_x)   < max_diff or \
-                current_sprite_pos_x == other_sprite_pos_x or \
-                abs(other_sprite_pos_x + other_sprite_width - current_sprite_pos_x) < max_diff) \
-               and \
-               (abs(current_sprite_pos_y + current_sprite_height - other_sprite_pos_y)   < max_diff or \
-                current_sprite_pos_y == other_sprite_pos_y or \
-                abs(other_sprite_pos_y + other_sprite_height - current_sprite_pos_y) < max_diff):
-                
-                self.sprite_ids_around_sprite_id[current_sprite.get_unique_id()].append(other_sprite.get_unique_id())
-
-    def __update_perimeters_around_removed_sprite(self, sprite_to_remove: StaticSprite) -> None:
-
-        del self.sprite_ids_around_sprite_id[sprite_to_remove.get_unique_id()]
-        for sprite_list in self.sprite_ids_around_sprite_id:
-            if sprite_to_remove.get_unique_id() in sprite_list:
-                sprite_list.remove(sprite_to_remove.get_unique_id())
+        self.live_bricks: LiveBricks = LiveBricks()
+        self.free_space: FreeSpaceField = FreeSpaceField()
+        self.exposed_faces: ExposedFaces = ExposedFaces()
+        # Sprites are tested in the order they were subscribed in
+        self.subscription_order: Dict[StaticSprite, int] = {}
+        self.number_subscriptions: int = 0
+        self.number_checks: int = 0
+        self.number_skipped_checks: int = 0
 
     def subscribe_static(self, sprite: Brick) -> None:
         """
         Subscribe a new static sprite which needs to be analyzed against a collision
         """
-        self.__save_sprite_for_collision(sprite)
+        self.subscribe_static_sprites([sprite])
 
-        if sprite.bring_points():
-            self.bricks_must_disappear.add(sprite)
+    def subscribe_static_sprites(self, sprites: List[Brick]) -> None:
+        """
+        Subscribe several static sprites, the free space around them is
+        updated once (chunks of a scrolling level)
+        """
+        rects: Dict[Brick, Tuple[float, float, float, float]] = {}
+        for sprite in sprites:
+            self.__save_sprite_for_collision(sprite)
+            rects[sprite] = self.__get_rect(sprite, True, self.sprites_to_perimeter)
+            self.exposed_faces.add(sprite, rects[sprite])
+            self.live_bricks.add(sprite, sprite.bring_points())
+        self.free_space.add_all(rects)
+
+    def publish_metrics(self) -> None:
+        """
+        Once per frame: the checks of the frame are added to the counters
+        shared by every game (boards of the game server) and the skip rate
+        is computed from these counters
+        """
+        if self.number_checks == 0:
+            return
+        Metrics.add('collision.checks', self.number_checks)
+        Metrics.add('collision.skipped_checks', self.number_skipped_checks)
+        Metrics.set('collision.skip_rate',
+                    Metrics.get('collision.skipped_checks') / Metrics.get('collision.checks'))
+        self.number_checks = 0
+        self.number_skipped_checks = 0
 
     def subscribe_moving(self, sprite: GameMovingSprite) -> None:
         """
@@ -94,23 +85,34 @@ class CollisionHandlerSprites(CollisionHandler):
         """
         Dynamic sprites
         """
+        if sprite not in self.subscription_order:
+            self.subscription_order[sprite] = self.number_subscriptions
+            self.number_subscriptions += 1
         self.sprites_to_perimeter[sprite] = {self.PERIMETER:           sprite.get_perimeter(),
                                 self.PERIMETER_OPTIMIZED: sprite.get_perimeter_optimized()}
-        self.__update_perimeters_around_added_sprite(sprite, True)
 
-    def unsubscribe(self, sprite: StaticSprite) -> None:
+    def unsubscribe(self, sprite: StaticSprite, inform_player_won: bool = True) -> None:
         """
         Dynamic sprites
         """
-        if sprite in self.sprites_to_perimeter:
-            del self.sprites_to_perimeter[sprite]
-        if sprite in self.dynamic_sprites:
-            self.dynamic_sprites.remove(sprite)
-        if sprite in self.bricks_must_disappear:
-            self.bricks_must_disappear.remove(sprite)
-            if len(self.bricks_must_disappear) == 0:
-                self.win_lost_management.inform_player_won()
-        self.__update_perimeters_around_removed_sprite(sprite)
+        self.unsubscribe_sprites([sprite], inform_player_won)
+
+    def unsubscribe_sprites(self, sprites: List[StaticSprite],
+                            inform_player_won: bool = True) -> None:
+        """
+        Unsubscribe several sprites, the free space around them is updated once
+        """
+        for sprite in sprites:
+            if sprite in self.sprites_to_perimeter:
+                del self.sprites_to_perimeter[sprite]
+                del self.subscription_order[sprite]
+            if sprite in self.dynamic_sprites:
+                self.dynamic_sprites.remove(sprite)
+            self.exposed_faces.remove(sprite)
+            if sprite in self.live_bricks and self.live_bricks.remove(sprite) and \
+               self.live_bricks.is_cleared() and inform_player_won:
+                self.frame_events.inform_player_won()
+        self.free_space.remove_all(sprites)
 
     def __get_moved_perimeter_to_position(self,pos_x: int, pos_y: int,
                                           perimeter: List[Dict[str, int]]) -> List[Dict[str, int]]:
@@ -130,121 +132,72 @@ class CollisionHandlerSprites(CollisionHandler):
         perimeter_type = self.PERIMETER_OPTIMIZED if optimized else self.PERIMETER
         return self.__get_moved_perimeter_to_position(pos_x, pos_y, sprites_to_perimeter[sprite][perimeter_type])
 
-    def __get_side_bumped(self,
-                          moving_sprite_perimeter: List[Dict[str, int]], 
-                          moving_sprite: GameMovingSprite, 
-                          static_sprite_perimeter: List[Dict[str, int]])  -> Tuple[bool, Dict[str, int]]:
-        has_bumped: bool = False
-        moving_sprite_side_bumped: Dict[str, int] = {}
-        moving_sprite_x_direction: int = moving_sprite.get_x_direction()
-        moving_sprite_y_direction: int = moving_sprite.get_y_direction()
-        moving_sprite_top_left_corner, moving_sprite_bottom_right_corner = moving_sprite_perimeter
-        top_left_corner,               bottom_right_corner               = static_sprite_perimeter
-
-        if not (moving_sprite_top_left_corner['x']     > bottom_right_corner['x'] or \
-                moving_sprite_bottom_right_corner['x'] < top_left_corner['x'] or \
-                moving_sprite_top_left_corner['y']     > bottom_right_corner['y'] or \
-                moving_sprite_bottom_right_corner['y'] < top_left_corner['y']):
-
-            has_bumped = True
-
-            moving_sprite_top_left_corner_next_x = moving_sprite_top_left_corner['x'] +  moving_sprite_x_direction
-            moving_sprite_bottom_right_corner_next_x = moving_sprite_bottom_right_corner['x'] +  moving_sprite_x_direction
-            moving_sprite_top_left_corner_next_y = moving_sprite_top_left_corner['y'] +  moving_sprite_y_direction
-            moving_sprite_bottom_right_corner_next_y = moving_sprite_bottom_right_corner['y'] +  moving_sprite_y_direction
-    
-            moving_sprite_diff_left   = bottom_right_corner['x']               - moving_sprite_top_left_corner_next_x 
-            moving_sprite_diff_right  = moving_sprite_bottom_right_corner_next_x - top_left_corner['x']
-            moving_sprite_diff_top    = moving_sprite_bottom_right_corner_next_y - top_left_corner['y']
-            moving_sprite_diff_bottom = bottom_right_corner['y']               - moving_sprite_top_left_corner_next_y 
-            diff_horizontal  = min(moving_sprite_diff_left, moving_sprite_diff_right)
-            diff_vertical    = min(moving_sprite_diff_top, moving_sprite_diff_bottom)
-    
-            check_next_move = [ (-moving_sprite_x_direction, moving_sprite_y_direction),\
-                                (moving_sprite_x_direction, -moving_sprite_y_direction),\
-                                (-moving_sprite_x_direction, -moving_sprite_y_direction)]
-            if diff_vertical < diff_horizontal:
-                check_next_move = [ (moving_sprite_x_direction, -moving_sprite_y_direction),\
-                                    (-moving_sprite_x_direction, moving_sprite_y_direction),\
-                                    (-moving_sprite_x_direction, -moving_sprite_y_direction)]
-    
-            selected_moving_sprite_x_direction: int = -moving_sprite_x_direction
-            selected_moving_sprite_y_direction: int = -moving_sprite_y_direction
-    
-            for (tmp_moving_sprite_x_direction, tmp_moving_sprite_y_direction) in check_next_move:
-                moving_sprite_top_left_corner_next_x = moving_sprite_top_left_corner['x'] + tmp_moving_sprite_x_direction
-                moving_sprite_bottom_right_corner_next_x = moving_sprite_bottom_right_corner['x'] + tmp_moving_sprite_x_direction
-                moving_sprite_top_left_corner_next_y = moving_sprite_top_left_corner['y'] + tmp_moving_sprite_y_direction
-                moving_sprite_bottom_right_corner_next_y = moving_sprite_bottom_right_corner['y'] + tmp_moving_sprite_y_direction
-    
-                if (moving_sprite_top_left_corner_next_x     > bottom_right_corner['x'] or \
-                    moving_sprite_bottom_right_corner_next_x < top_left_corner['x'] or \
-                    moving_sprite_top_left_corner_next_y     > bottom_right_corner['y'] or \
-                    moving_sprite_bottom_right_corner_next_y < top_left_corner['y']):
-                        selected_moving_sprite_x_direction = tmp_moving_sprite_x_direction
-                        selected_moving_sprite_y_direction = tmp_moving_sprite_y_direction
-                        break
-
-            moving_sprite_diff_left   = bottom_right_corner['x']               - moving_sprite_top_left_corner['x'] 
-            moving_sprite_diff_right  = moving_sprite_bottom_right_corner['x'] - top_left_corner['x']
-            moving_sprite_diff_top    = moving_sprite_bottom_right_corner['y'] - top_left_corner['y']
-            moving_sprite_diff_bottom = bottom_right_corner['y']               - moving_sprite_top_left_corner['y'] 
-            diff_horizontal  = min(moving_sprite_diff_left, moving_sprite_diff_right)
-            diff_vertical    = min(moving_sprite_diff_top, moving_sprite_diff_bottom)
-    
-            if selected_moving_sprite_x_direction == -moving_sprite_x_direction:
-                if moving_sprite_diff_top < moving_sprite_diff_bottom:
-                    moving_sprite_side_bumped[self.HORIZONTAL] = moving_sprite_diff_top
-                else:
-                    moving_sprite_side_bumped[self.HORIZONTAL] = -moving_sprite_diff_bottom
-    
-            if selected_moving_sprite_y_direction == -moving_sprite_y_direction:
-                if moving_sprite_diff_left < moving_sprite_diff_right:
-                    moving_sprite_side_bumped[self.VERTICAL] = moving_sprite_diff_left
-                else:
-                    moving_sprite_side_bumped[self.VERTICAL] = -moving_sprite_diff_right
-
-        return has_bumped, moving_sprite_side_bumped
-    
-    def __points_collision(self, 
-                           moving_sprite_perimeter: List[Dict[str, int]], 
-                           moving_sprite: GameMovingSprite, 
-                           static_sprite: StaticSprite, 
-                           sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]],
-                           sprites_around: List[StaticSprite],
-                           optimized_perimeter: bool) -> Tuple[bool, Dict[str, int]]:
+    def __get_rect(self, sprite: StaticSprite, optimized: bool, \
+        sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]]) \
+            -> Tuple[float, float, float, float]:
         """
-        Analyzes if a collision happened and which side collided
+        Perimeter of the sprite as (left, top, right, bottom)
         """
-        static_sprite_perimeter = self.__get_perimeter(static_sprite, optimized_perimeter, sprites_to_perimeter)
-
-        final_moving_sprite_side_bumped: Dict[str, int] = {}
-        has_bumped, moving_sprite_side_bumped = self.__get_side_bumped(moving_sprite_perimeter, 
-                                                                       moving_sprite, 
-                                                                       static_sprite_perimeter)
-        if has_bumped:
-            latest_moving_sprite_side_bumped: Dict[str, int] = moving_sprite_side_bumped
-            
-            for sprite_around in sprites_around:
-                static_sprite_perimeter = self.__get_perimeter(sprite_around, optimized_perimeter, sprites_to_perimeter)
-                has_bumped, moving_sprite_side_bumped = self.__get_side_bumped(moving_sprite_perimeter, 
-                                                                       moving_sprite, 
-                                                                       static_sprite_perimeter)
-                if has_bumped:
-                    for key in moving_sprite_side_bumped.keys():
-                        if key not in latest_moving_sprite_side_bumped.keys():
-                            latest_moving_sprite_side_bumped[key] = moving_sprite_side_bumped[key]
-                        else:
-                            if latest_moving_sprite_side_bumped[key] != moving_sprite_side_bumped[key]:
-                                latest_moving_sprite_side_bumped[key] = 0
-
-            for key in moving_sprite_side_bumped.keys():
-                if latest_moving_sprite_side_bumped[key] != 0:
-                    final_moving_sprite_side_bumped[key] = latest_moving_sprite_side_bumped[key]
+        top_left, bottom_right = self.__get_perimeter(sprite, optimized, sprites_to_perimeter)
+        return (top_left['x'], top_left['y'], bottom_right['x'], bottom_right['y'])
 
-        moving_sprite.set_collision_happened(has_bumped)
-
-        return has_bumped, final_moving_sprite_side_bumped
+    def __get_side_bumped(self,
+                          moving_sprite_rect: Tuple[float, float, float, float],
+                          moving_sprite: GameMovingSprite,
+                          static_sprite: StaticSprite,
+                          static_sprite_rect: Tuple[float, float, float, float]) -> Dict[str, int]:
+        """
+        Analyzes if a collision happened and which side collided, in one pass
+        against the exposed faces of the static sprite only: the face crossed
+        last during the move is the one bumped (both of them on a corner).
+        HORIZONTAL means the moving sprite bounces back on x, VERTICAL on y.
+        """
+        left, top, right, bottom = moving_sprite_rect
+        static_left, static_top, static_right, static_bottom = static_sprite_rect
+        if left > static_right or right < static_left or \
+           top > static_bottom or bottom < static_top:
+            return None
+
+        exposed_faces: Set[str] = self.exposed_faces.get(static_sprite)
+        change_x: float = moving_sprite.get_x_direction()
+        change_y: float = moving_sprite.get_y_direction()
+        # Fraction of the move after which a face was crossed, None if it was not
+        entry_x: float = None
+        entry_y: float = None
+        if change_x > 0 and self.LEFT in exposed_faces and right - change_x <= static_left:
+            entry_x = (static_left - right + change_x) / change_x
+        elif change_x < 0 and self.RIGHT in exposed_faces and left - change_x >= static_right:
+            entry_x = (left - change_x - static_right) / -change_x
+        if change_y > 0 and self.TOP in exposed_faces and bottom - change_y <= static_top:
+            entry_y = (static_top - bottom + change_y) / change_y
+        elif change_y < 0 and self.BOTTOM in exposed_faces and top - change_y >= static_bottom:
+            entry_y = (top - change_y - static_bottom) / -change_y
+
+        penetration_x: float = min(right - static_left, static_right - left)
+        penetration_y: float = min(bottom - static_top, static_bottom - top)
+        side_bumped: Dict[str, int] = {}
+        if entry_x is not None and (entry_y is None or entry_x >= entry_y):
+            side_bumped[self.HORIZONTAL] = penetration_x
+        if entry_y is not None and (entry_x is None or entry_y >= entry_x):
+            side_bumped[self.VERTICAL] = penetration_y
+        if entry_x is None and entry_y is None and \
+           not (left - change_x > static_right or right - change_x < static_left or \
+                top - change_y > static_bottom or bottom - change_y < static_top):
+            # Already overlapping before moving: leave through the nearest
+            # exposed face the sprite is not moving away from
+            exits: List[Tuple[float, str]] = []
+            if self.LEFT in exposed_faces and change_x >= 0:
+                exits.append((right - static_left, self.HORIZONTAL))
+            if self.RIGHT in exposed_faces and change_x <= 0:
+                exits.append((static_right - left, self.HORIZONTAL))
+            if self.TOP in exposed_faces and change_y >= 0:
+                exits.append((bottom - static_top, self.VERTICAL))
+            if self.BOTTOM in exposed_faces and change_y <= 0:
+                exits.append((static_bottom - top, self.VERTICAL))
+            if len(exits) > 0:
+                penetration, side = min(exits)
+                side_bumped[side] = penetration
+        return side_bumped
 
     def horizontal_collision_side_bumped(self, from_side_bumped: Dict[str, int]) -> Tuple[bool, int]:
         """
@@ -273,48 +226,114 @@ class CollisionHandlerSprites(CollisionHandler):
         moving_sprites_collided: Dict[StaticSprite, Dict[str, int]] = {}
         moving_sprite: GameMovingSprite = None
         dynamic_sprites = self.dynamic_sprites.copy()
-        sprites = self.sprites_to_perimeter.copy()
         for moving_sprite in dynamic_sprites:
-            moving_sprite_side_bumped: Dict[str, int] = self.check_for_collision(moving_sprite, sprites, optimized_perimeter)
+            moving_sprite_side_bumped: Dict[str, int] = \
+                self.check_for_collision(moving_sprite, optimized_perimeter=optimized_perimeter)
             if moving_sprite_side_bumped is not None:
                 moving_sprites_collided[moving_sprite] = moving_sprite_side_bumped
 
         for moving_sprite, moving_sprite_side_bumped in moving_sprites_collided.items():
             moving_sprite.bumped(moving_sprite_side_bumped)
 
+    def __is_in_free_space(self, moving_sprite: GameMovingSprite,
+                           moving_sprite_rect: Tuple[float, float, float, float],
+                           sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]],
+                           optimized_perimeter: bool) -> bool:
+        """
+        True when the moving sprite can touch neither a static sprite (the free
+        space field tells) nor another moving sprite (checked one by one)
+        """
+        left, top, right, bottom = moving_sprite_rect
+        if not self.free_space.is_free(left, top, right, bottom):
+            return False
+        for sprite in self.dynamic_sprites:
+            if sprite != moving_sprite and sprite in sprites_to_perimeter:
+                other_left, other_top, other_right, other_bottom = \
+                    self.__get_rect(sprite, optimized_perimeter, sprites_to_perimeter)
+                if not (left > other_right or right < other_left or \
+                        top > other_bottom or bottom < other_top):
+                    return False
+        return True
+
     def check_for_collision(self, moving_sprite: GameMovingSprite, \
         sprites_to_perimeter: Dict[StaticSprite, Dict[str, List[Dict[str, int]]]] = None, \
             optimized_perimeter: bool = True) -> Dict[str, int]:
         """
         When a moving sprite is about to move he should call this method first
-        before moving: this will call the method bumped of all moving sprites
-        that collided
+        before moving: every sprite it bumps into is informed, the sides bumped
+        on all of them are returned (None without collision).
+        With the subscribed sprites and optimized perimeters, only the static
+        sprites in the buckets of ExposedFaces touched by the move and the
+        moving sprites are tested, in the order they were subscribed in.
         """
-        #pprint(self.sprite_ids_around_sprite_id)
-
+        # Not copied: sprites are only bumped (and maybe unsubscribed) after the loop below
         if sprites_to_perimeter is None:
-            sprites_to_perimeter = self.sprites_to_perimeter.copy()
-        moving_sprite_perimeter = self.__get_perimeter(moving_sprite, optimized_perimeter, sprites_to_perimeter)
-        for sprite in sprites_to_perimeter:
+            sprites_to_perimeter = self.sprites_to_perimeter
+        moving_sprite_rect: Tuple[float, float, float, float] = \
+            self.__get_rect(moving_sprite, optimized_perimeter, sprites_to_perimeter)
+        self.number_checks += 1
+        if self.__is_in_free_space(moving_sprite, moving_sprite_rect, sprites_to_perimeter,
+                                   optimized_perimeter):
+            self.number_skipped_checks += 1
+            moving_sprite.set_collision_happened(False)
+            return None
+
+        candidates: List[Tuple[StaticSprite, Tuple[float, float, float, float]]]
+        if sprites_to_perimeter is self.sprites_to_perimeter and optimized_perimeter:
+            candidates = self.__get_candidates(moving_sprite, moving_sprite_rect)
+        else:
+            candidates = [(sprite, self.__get_rect(sprite, optimized_perimeter,
+                                                   sprites_to_perimeter))
+                          for sprite in sprites_to_perimeter if sprite != moving_sprite]
+
+        moving_sprite_side_bumped: Dict[str, int] = {}
+        sprites_bumped: List[Tuple[StaticSprite, Dict[str, int]]] = []
+        for sprite, rect in candidates:
+            side_bumped: Dict[str, int] = self.__get_side_bumped(
+                moving_sprite_rect, moving_sprite, sprite, rect)
+            if side_bumped:
+                sprites_bumped.append((sprite, side_bumped))
+                for side, penetration in side_bumped.items():
+                    moving_sprite_side_bumped.setdefault(side, penetration)
+
+        moving_sprite.set_collision_happened(len(sprites_bumped) > 0)
+        # Bumped once everything is analyzed: a destroyed brick must not
+        # uncover faces while its neighbours are being tested
+        for sprite, side_bumped in sprites_bumped:
+            sprite.bumped(side_bumped)
+            self.frame_events.bumped(sprite)
+        return moving_sprite_side_bumped if len(sprites_bumped) > 0 else None
+
+    def __get_candidates(self, moving_sprite: GameMovingSprite,
+                         moving_sprite_rect: Tuple[float, float, float, float]) \
+            -> List[Tuple[StaticSprite, Tuple[float, float, float, float]]]:
+        """
+        Sprites the move can touch with their rect: the static sprites around
+        the rect swept by the move (their rect does not change once
+        subscribed) and every other moving sprite
+        """
+        left, top, right, bottom = moving_sprite_rect
+        change_x: float = moving_sprite.get_x_direction()
+        change_y: float = moving_sprite.get_y_direction()
+        candidates: Dict[StaticSprite, Tuple[float, float, float, float]] = \
+            self.exposed_faces.get_rects_in(min(left, left - change_x), min(top, top - change_y),
+                                            max(right, right - change_x),
+                                            max(bottom, bottom - change_y))
+        for sprite in self.dynamic_sprites:
             if sprite != moving_sprite:
-                has_bumped, moving_sprite_side_bumped = \
-                        self.__points_collision(moving_sprite_perimeter, 
-                                                moving_sprite, 
-                                                sprite,
-                                                sprites_to_perimeter,
-                                                CollisionHandlerSprites.__get_sprites_around_sprite_from_sprite_id(\
-                                                    self.sprite_ids_around_sprite_id[moving_sprite.get_unique_id()], 
-                                                    sprites_to_perimeter),
-                                                optimized_perimeter
-                                                )
-                if has_bumped:
-                    sprite.bumped(moving_sprite_side_bumped)
-                    return moving_sprite_side_bumped
-        return None
+                candidates[sprite] = self.__get_rect(sprite, True, self.sprites_to_perimeter)
+        return sorted(candidates.items(),
+                      key=lambda sprite_rect: self.subscription_order[sprite_rect[0]])
 
     def add_score(self, add_score: int) -> None:
         """
-        This method is used by a sprite to inform the scor that points need to be added or removed
-        TODO: This method should be moved in a separate class as it is breaking the SRP principle
+        This method is used by a sprite to inform the score that points need to be added or removed,
+        the score is updated at the end of the frame
+        """
+        self.frame_events.add_score(add_score)
+
+    def play_sound(self, sound: SoundPlayer) -> None:
+        """
+        The sound is played at the end of the frame, once whatever the number of bumps
         """
-        self.score.increase_score(add_score)
+        self.frame_events.play(sound)
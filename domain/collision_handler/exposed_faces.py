@@ -0,0 +1,157 @@
+"""
+Faces of the static sprites a moving sprite can actually hit
+"""
+from typing import Dict, FrozenSet, Hashable, List, Set, Tuple
+from domain.collision_handler.collision_handler import CollisionHandler
+
+class ExposedFaces:
+    """
+    A face of a static sprite is covered when adjacent static sprites touch
+    it along its whole length: nothing can reach it without going through
+    them first. Only exposed faces need to be tested by the narrow phase.
+    Adding or removing a sprite only updates the sprites touching it.
+    The sprites are also indexed by the SPAN_BUCKET square buckets they
+    touch, to find the few sprites in a region.
+    """
+    # Bricks are placed on a grid with float coordinates: touching edges can
+    # differ by a rounding error
+    TOLERANCE: float = 0.5
+    # Length of the buckets along a face in the index
+    SPAN_BUCKET: int = 64
+    ALL_FACES: FrozenSet[str] = frozenset((CollisionHandler.LEFT, CollisionHandler.RIGHT,
+                                           CollisionHandler.TOP, CollisionHandler.BOTTOM))
+    # For each face: the face of a neighbour touching it, the index in the
+    # rect of the face coordinate, and the indexes of the span of the face
+    GEOMETRY: Dict[str, Tuple[str, int, int, int]] = {
+        CollisionHandler.LEFT:   (CollisionHandler.RIGHT,  0, 1, 3),
+        CollisionHandler.RIGHT:  (CollisionHandler.LEFT,   2, 1, 3),
+        CollisionHandler.TOP:    (CollisionHandler.BOTTOM, 1, 0, 2),
+        CollisionHandler.BOTTOM: (CollisionHandler.TOP,    3, 0, 2),
+    }
+
+    def __init__(self):
+        self.rects: Dict[Hashable, Tuple[float, float, float, float]] = {}
+        self.exposed: Dict[Hashable, Set[str]] = {}
+        # Sprites indexed by the coordinate of each of their faces, rounded to
+        # the pixel, and by the buckets of the span of the face
+        self.faces: Dict[str, Dict[Tuple[int, int], Set[Hashable]]] = \
+            {face: {} for face in self.ALL_FACES}
+        self.buckets: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    def add(self, sprite: Hashable, rect: Tuple[float, float, float, float]) -> None:
+        """
+        rect is (left, top, right, bottom)
+        """
+        self.remove(sprite)
+        self.rects[sprite] = rect
+        self.exposed[sprite] = set()
+        for face in self.ALL_FACES:
+            for key in self.__keys(rect, face, 0):
+                self.faces[face].setdefault(key, set()).add(sprite)
+        for key in self.__buckets(rect):
+            self.buckets.setdefault(key, set()).add(sprite)
+        for face in self.ALL_FACES:
+            touching: List[Tuple[Hashable, float, float]] = self.__touching(sprite, face)
+            self.__update(sprite, face, touching)
+            for other, _, _ in touching:
+                self.__update(other, self.GEOMETRY[face][0])
+
+    def remove(self, sprite: Hashable) -> None:
+        """
+        The faces the sprite covered become exposed
+        """
+        rect: Tuple[float, float, float, float] = self.rects.get(sprite)
+        if rect is None:
+            return
+        touching: Dict[str, List[Tuple[Hashable, float, float]]] = \
+            {face: self.__touching(sprite, face) for face in self.ALL_FACES}
+        for face in self.ALL_FACES:
+            for key in self.__keys(rect, face, 0):
+                self.faces[face][key].discard(sprite)
+        for key in self.__buckets(rect):
+            self.buckets[key].discard(sprite)
+        del self.rects[sprite]
+        del self.exposed[sprite]
+        for face, others in touching.items():
+            for other, _, _ in others:
+                self.__update(other, self.GEOMETRY[face][0])
+
+    def get(self, sprite: Hashable) -> Set[str]:
+        """
+        Exposed faces of the sprite (read only): all of them for a sprite not indexed
+        """
+        return self.exposed.get(sprite, self.ALL_FACES)
+
+    def get_rects_in(self, left: float, top: float, right: float,
+                     bottom: float) -> Dict[Hashable, Tuple[float, float, float, float]]:
+        """
+        Rect of the indexed sprites in the buckets the box touches: every
+        sprite overlapping the box (edges included) and a few around it
+        """
+        return {sprite: self.rects[sprite]
+                for key in self.__buckets((left, top, right, bottom))
+                for sprite in self.buckets.get(key, ())}
+
+    def get_number_exposed_faces(self) -> int:
+        """
+        Number of faces the narrow phase can hit
+        """
+        return sum(len(faces) for faces in self.exposed.values())
+
+    def __keys(self, rect: Tuple[float, float, float, float], face: str,
+               margin: int) -> List[Tuple[int, int]]:
+        """
+        Keys of the index for a face, widened by margin pixels across it
+        """
+        _, coordinate, first, last = self.GEOMETRY[face]
+        return [(position, bucket)
+                for position in range(round(rect[coordinate]) - margin,
+                                      round(rect[coordinate]) + margin + 1)
+                for bucket in range(int(rect[first] // self.SPAN_BUCKET),
+                                    int(rect[last] // self.SPAN_BUCKET) + 1)]
+
+    def __buckets(self, rect: Tuple[float, float, float, float]) -> List[Tuple[int, int]]:
+        left, top, right, bottom = rect
+        return [(column, row)
+                for column in range(int(left // self.SPAN_BUCKET),
+                                    int(right // self.SPAN_BUCKET) + 1)
+                for row in range(int(top // self.SPAN_BUCKET), int(bottom // self.SPAN_BUCKET) + 1)]
+
+    def __touching(self, sprite: Hashable, face: str) -> List[Tuple[Hashable, float, float]]:
+        """
+        Sprites touching a face of sprite, with the span of the face they cover
+        """
+        rect: Tuple[float, float, float, float] = self.rects[sprite]
+        opposite_face, coordinate, first, last = self.GEOMETRY[face]
+        opposite_coordinate: int = self.GEOMETRY[opposite_face][1]
+        faces: Dict[Tuple[int, int], Set[Hashable]] = self.faces[opposite_face]
+        candidates: Set[Hashable] = set()
+        for key in self.__keys(rect, face, 1):
+            candidates.update(faces.get(key, ()))
+        touching: List[Tuple[Hashable, float, float]] = []
+        for other in candidates:
+            other_rect: Tuple[float, float, float, float] = self.rects[other]
+            if other is not sprite and \
+               abs(other_rect[opposite_coordinate] - rect[coordinate]) <= self.TOLERANCE and \
+               other_rect[first] < rect[last] and other_rect[last] > rect[first]:
+                touching.append((other, other_rect[first], other_rect[last]))
+        return touching
+
+    def __update(self, sprite: Hashable, face: str,
+                 touching: List[Tuple[Hashable, float, float]] = None) -> None:
+        """
+        A face is exposed unless the spans of its neighbours cover it entirely
+        """
+        if touching is None:
+            touching = self.__touching(sprite, face)
+        rect: Tuple[float, float, float, float] = self.rects[sprite]
+        _, _, first, last = self.GEOMETRY[face]
+        covered_until: float = rect[first]
+        for _, span_first, span_last in sorted(touching, key=lambda span: span[1]):
+            if span_first > covered_until + self.TOLERANCE:
+                break
+            covered_until = max(covered_until, span_last)
+        if covered_until < rect[last] - self.TOLERANCE:
+            self.exposed[sprite].add(face)
+        else:
+            self.exposed[sprite].discard(face)
@@ -0,0 +1,239 @@
+"""
+Distance field telling where moving sprites cannot collide with static sprites
+"""
+from typing import Dict, Hashable, List, Tuple
+
+class FreeSpaceField:
+    """
+    Coarse grid over the static sprites: each cell holds the Chebyshev
+    distance, counted in cells and capped at max_distance, to the nearest
+    cell touched by a static sprite. A rectangle centered in a cell at
+    distance k is at least (k - 1) cells away from every static sprite.
+    Adding or removing a sprite only recomputes the cells around it:
+    cells further than max_distance cannot change. Sprites added or removed
+    together (chunks of a scrolling level) recompute the cells around their
+    bounding box once. Sprites added close to the edge move and enlarge the
+    grid instead of building it again.
+    """
+    def __init__(self, max_distance: int = 8):
+        self.max_distance: int = max_distance
+        self.rects: Dict[Hashable, Tuple[float, float, float, float]] = {}
+        self.built: bool = False
+        self.cell_size: float = 1
+        self.origin_column: int = 0
+        self.origin_row: int = 0
+        self.columns: int = 0
+        self.rows: int = 0
+        self.occupancy: List[int] = []
+        self.distances: List[int] = []
+
+    def add(self, sprite: Hashable, rect: Tuple[float, float, float, float]) -> None:
+        """
+        rect is (left, top, right, bottom), edges included
+        """
+        self.add_all({sprite: rect})
+
+    def add_all(self, rects: Dict[Hashable, Tuple[float, float, float, float]]) -> None:
+        """
+        Several sprites with their rect
+        """
+        if len(rects) == 0:
+            return
+        self.rects.update(rects)
+        if self.built and self.columns == 0:
+            # The size of the cells comes from the sprites
+            self.built = False
+        if self.built:
+            cells: List[Tuple[int, int, int, int]] = [self.__cells_of(rect)
+                                                      for rect in rects.values()]
+            columns_rows: Tuple[int, int, int, int] = self.__union(cells)
+            first_column, first_row, last_column, last_row = columns_rows
+            # Cells out of the grid must stay max_distance away from any sprite
+            if first_column < self.max_distance or first_row < self.max_distance or \
+               last_column >= self.columns - self.max_distance or \
+               last_row >= self.rows - self.max_distance:
+                self.__grow(columns_rows)
+                cells = [self.__cells_of(rect) for rect in rects.values()]
+                columns_rows = self.__union(cells)
+            for sprite_cells in cells:
+                self.__occupy(sprite_cells, 1)
+            self.__update_around(columns_rows)
+
+    def remove(self, sprite: Hashable) -> None:
+        """
+        The sprite is not an obstacle anymore
+        """
+        self.remove_all([sprite])
+
+    def remove_all(self, sprites: List[Hashable]) -> None:
+        """
+        Several sprites, the ones not added are ignored
+        """
+        rects: List[Tuple[float, float, float, float]] = \
+            [rect for rect in (self.rects.pop(sprite, None) for sprite in sprites)
+             if rect is not None]
+        if len(rects) > 0 and self.built:
+            cells: List[Tuple[int, int, int, int]] = [self.__cells_of(rect) for rect in rects]
+            for sprite_cells in cells:
+                self.__occupy(sprite_cells, -1)
+            self.__update_around(self.__union(cells))
+
+    def is_free(self, left: float, top: float, right: float, bottom: float) -> bool:
+        """
+        True when the rectangle cannot touch any static sprite
+        """
+        if not self.built:
+            self.__build()
+        column: int = int((left + right) / 2 // self.cell_size) - self.origin_column
+        row: int = int((top + bottom) / 2 // self.cell_size) - self.origin_row
+        distance: int = self.max_distance
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            distance = self.distances[row * self.columns + column]
+        return max(right - left, bottom - top) / 2 < (distance - 1) * self.cell_size
+
+    def __cells_of(self, rect: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        left, top, right, bottom = rect
+        return (int(left // self.cell_size) - self.origin_column,
+                int(top // self.cell_size) - self.origin_row,
+                int(right // self.cell_size) - self.origin_column,
+                int(bottom // self.cell_size) - self.origin_row)
+
+    def __occupy(self, columns_rows: Tuple[int, int, int, int], increment: int) -> None:
+        first_column, first_row, last_column, last_row = columns_rows
+        for row in range(first_row, last_row + 1):
+            for index in range(row * self.columns + first_column,
+                               row * self.columns + last_column + 1):
+                self.occupancy[index] += increment
+
+    def __build(self) -> None:
+        """
+        Grid covering the static sprites and max_distance cells around them
+        """
+        self.built = True
+        if len(self.rects) == 0:
+            self.columns = self.rows = 0
+            return
+        self.cell_size = max(4, min(min(right - left, bottom - top)
+                                    for left, top, right, bottom in self.rects.values()) // 2)
+        self.origin_column = self.origin_row = 0
+        first_column, first_row, last_column, last_row = self.__bounds()
+        self.origin_column = first_column - self.max_distance
+        self.origin_row = first_row - self.max_distance
+        self.columns = last_column - first_column + 1 + 2 * self.max_distance
+        self.rows = last_row - first_row + 1 + 2 * self.max_distance
+        self.occupancy = [0] * (self.columns * self.rows)
+        for rect in self.rects.values():
+            self.__occupy(self.__cells_of(rect), 1)
+        self.distances = [0 if occupied else self.max_distance for occupied in self.occupancy]
+        self.__chamfer(0, 0, self.columns - 1, self.rows - 1)
+
+    def __grow(self, columns_rows: Tuple[int, int, int, int]) -> None:
+        """
+        The grid is moved over the static sprites, max_distance cells around
+        them and, on each side where columns_rows did not fit, half the size of
+        the sprites bounds more so that the next sprites added on that side
+        fit: the cells kept are copied, the new cells are free (all static
+        sprites were in the old grid) and the cells left behind are dropped.
+        No distance is computed, the caller updates the cells around the
+        sprites added.
+        """
+        first_column, first_row, last_column, last_row = self.__bounds()
+        extra_columns: int = (last_column - first_column + 1) // 2
+        extra_rows: int = (last_row - first_row + 1) // 2
+        first_column -= self.max_distance + \
+            (extra_columns if columns_rows[0] < self.max_distance else 0)
+        first_row -= self.max_distance + \
+            (extra_rows if columns_rows[1] < self.max_distance else 0)
+        last_column += self.max_distance + \
+            (extra_columns if columns_rows[2] >= self.columns - self.max_distance else 0)
+        last_row += self.max_distance + \
+            (extra_rows if columns_rows[3] >= self.rows - self.max_distance else 0)
+        columns: int = last_column - first_column + 1
+        rows: int = last_row - first_row + 1
+        occupancy: List[int] = [0] * (columns * rows)
+        distances: List[int] = [self.max_distance] * (columns * rows)
+        # Cells of the old grid inside the new one, in old grid coordinates
+        kept_columns: Tuple[int, int] = (max(first_column, 0), min(last_column, self.columns - 1))
+        for row in range(max(first_row, 0), min(last_row, self.rows - 1) + 1):
+            old: int = row * self.columns
+            new: int = (row - first_row) * columns - first_column
+            occupancy[new + kept_columns[0]:new + kept_columns[1] + 1] = \
+                self.occupancy[old + kept_columns[0]:old + kept_columns[1] + 1]
+            distances[new + kept_columns[0]:new + kept_columns[1] + 1] = \
+                self.distances[old + kept_columns[0]:old + kept_columns[1] + 1]
+        self.origin_column += first_column
+        self.origin_row += first_row
+        self.columns = columns
+        self.rows = rows
+        self.occupancy = occupancy
+        self.distances = distances
+
+    def __bounds(self) -> Tuple[int, int, int, int]:
+        return self.__union([self.__cells_of(rect) for rect in self.rects.values()])
+
+    @staticmethod
+    def __union(cells: List[Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
+        return (min(cell[0] for cell in cells), min(cell[1] for cell in cells),
+                max(cell[2] for cell in cells), max(cell[3] for cell in cells))
+
+    def __update_around(self, columns_rows: Tuple[int, int, int, int]) -> None:
+        """
+        Only the cells less than max_distance away from the changed cells can
+        change: they are reset and the distances propagated again from the
+        cells around them, which are still correct
+        """
+        first_column, first_row, last_column, last_row = columns_rows
+        reset_box: Tuple[int, int, int, int] = self.__clip(
+            first_column - self.max_distance, first_row - self.max_distance,
+            last_column + self.max_distance, last_row + self.max_distance)
+        for row in range(reset_box[1], reset_box[3] + 1):
+            for index in range(row * self.columns + reset_box[0],
+                               row * self.columns + reset_box[2] + 1):
+                self.distances[index] = 0 if self.occupancy[index] else self.max_distance
+        self.__chamfer(*self.__clip(
+            first_column - 2 * self.max_distance, first_row - 2 * self.max_distance,
+            last_column + 2 * self.max_distance, last_row + 2 * self.max_distance))
+
+    def __clip(self, first_column: int, first_row: int,
+               last_column: int, last_row: int) -> Tuple[int, int, int, int]:
+        return (max(first_column, 0), max(first_row, 0),
+                min(last_column, self.columns - 1), min(last_row, self.rows - 1))
+
+    def __chamfer(self, first_column: int, first_row: int, last_column: int, last_row: int) -> None:
+        """
+        Two raster passes with the 8 neighbours (chessboard distance) in a box
+        """
+        distances: List[int] = self.distances
+        columns: int = self.columns
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                index: int = row * columns + column
+                distance: int = distances[index]
+                if distance == 0:
+                    continue
+                if column > first_column:
+                    distance = min(distance, distances[index - 1] + 1)
+                if row > first_row:
+                    above: int = index - columns
+                    distance = min(distance, distances[above] + 1)
+                    if column > first_column:
+                        distance = min(distance, distances[above - 1] + 1)
+                    if column < last_column:
+                        distance = min(distance, distances[above + 1] + 1)
+                distances[index] = distance
+        for row in range(last_row, first_row - 1, -1):
+            for column in range(last_column, first_column - 1, -1):
+                index: int = row * columns + column
+                distance: int = distances[index]
+                if distance == 0:
+                    continue
+                if column < last_column:
+                    distance = min(distance, distances[index + 1] + 1)
+                if row < last_row:
+                    below: int = index + columns
+                    distance = min(distance, distances[below] + 1)
+                    if column < last_column:
+                        distance = min(distance, distances[below + 1] + 1)
+                    if column > first_column:
+                        distance = min(distance, distances[below - 1] + 1)
+                distances[index] = distance
@@ -0,0 +1,63 @@
+"""
+Static sprites still in play
+"""
+from typing import Hashable, Iterator, Set
+
+class LiveBricks:
+    """
+    The static sprites subscribed to the collision handler and not destroyed
+    (or evicted) yet, the ones which must be destroyed to win the level among
+    them. number_elsewhere counts the bricks to destroy which are not
+    subscribed yet (see ScrollingLevel). Everything is updated when a sprite
+    is added or removed: whatever the number of bricks created, iterating and
+    counting only costs the bricks alive.
+    The counts belong to one board (the game server runs many), they are not
+    published in the Metrics. len() counts colliders: the unbreakable bricks
+    merged into one UnbreakableWall count once.
+    """
+    def __init__(self):
+        self.sprites: Set[Hashable] = set()
+        self.to_destroy: Set[Hashable] = set()
+        self.number_elsewhere: int = 0
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.sprites)
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def __contains__(self, sprite: Hashable) -> bool:
+        return sprite in self.sprites
+
+    def add(self, sprite: Hashable, must_be_destroyed: bool) -> None:
+        """
+        A new static sprite
+        """
+        self.sprites.add(sprite)
+        if must_be_destroyed:
+            self.to_destroy.add(sprite)
+
+    def remove(self, sprite: Hashable) -> bool:
+        """
+        True when the sprite was one of the bricks to destroy
+        """
+        self.sprites.discard(sprite)
+        was_to_destroy: bool = sprite in self.to_destroy
+        if was_to_destroy:
+            self.to_destroy.remove(sprite)
+        return was_to_destroy
+
+    def add_elsewhere(self, number_bricks: int) -> None:
+        """
+        Bricks to destroy leaving (positive) or joining (negative) the game
+        """
+        self.number_elsewhere += number_bricks
+
+    def get_number_to_destroy(self) -> int:
+        return len(self.to_destroy) + self.number_elsewhere
+
+    def is_cleared(self) -> bool:
+        """
+        No brick left to destroy, subscribed or not
+        """
+        return self.get_number_to_destroy() == 0
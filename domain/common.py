@@ -16,6 +16,11 @@ class Common:
     UNBREAKABLE_BRICK_IMAGE_NAME = GAME_NAME + 'assets/images/IceBrick.png'
     POISONED_BRICK_IMAGE_NAME = GAME_NAME + 'assets/images/PoisonedBrick.png'
 
+    ASSET_PACK = GAME_NAME + 'assets.pack'
+    # Levels with more bricks are stored in NumPy columns (see BrickStore)
+    BRICK_STORE_MIN_BRICKS: int = 5000
+    # Wider levels scroll with the ball and are streamed by chunks (see ScrollingLevel)
+    SCROLLING_MIN_COLUMNS: int = 200
     START_MUSIC = GAME_NAME + 'assets/sounds/guitar_start.wav'
     START_BALL = GAME_NAME + 'assets/sounds/explosion.wav'
     DESTROYED_POISON = GAME_NAME + 'assets/sounds/scream.wav'
@@ -30,6 +35,10 @@ class Common:
     YOU_LOST = GAME_NAME + 'assets/sounds/lost.wav'
     KEY_PRESSED = GAME_NAME + 'assets/sounds/key_pressed.wav'
     GO_GAME_BOARD = GAME_NAME + 'assets/sounds/ohyeah.wav'
+    SOUNDS: Tuple[str, ...] = (START_BALL, DESTROYED_POISON, MISSED_BALL, BUMP_POISON,
+                               BUMP_BRICK, BUMP_UNBREAKABLE_BRICK, BUMP_PLAYER,
+                               DESTROYED_BRICK, NEXT_LEVEL, YOU_LOST, KEY_PRESSED,
+                               GO_GAME_BOARD)
 
     red: Tuple[int, int, int] = (255, 0, 0)
     black: Tuple[int, int, int] = (0, 0, 0)
@@ -0,0 +1,104 @@
+"""
+Detect a ball going round in circles
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, List, Tuple, TYPE_CHECKING
+from domain.metrics import Metrics
+if TYPE_CHECKING:
+    from domain.sprites.sprites import Ball
+    from domain.sprites.sprites import Player
+
+class CycleDetector:
+    """
+    The trajectory only depends on the ball, the paddle and the bricks: when
+    the ball bounces in a state it already bounced in, it will repeat the same
+    bounces forever. The state at each bounce (position and speed quantized,
+    paddle position, bricks) is kept for the last HISTORY_SIZE bounces, a
+    repeat costs one dictionary lookup.
+    Bricks only change when a breakable brick is bumped: the history is then
+    emptied, as no older state can come back. get_state / set_state save and
+    restore what was seen (snapshots).
+    """
+    HISTORY_SIZE: int = 256
+    # Pixels, and pixels per tick
+    POSITION_QUANTUM: float = 1
+    SPEED_QUANTUM: float = 1 / 8
+    # Remaining bumps of the unbreakable bricks of a BrickStore
+    UNBREAKABLE: int = 255
+
+    def __init__(self, ball: Ball, paddle: Player):
+        self.ball: Ball = ball
+        self.paddle: Player = paddle
+        # Bounce number of each state, and states in bounce order
+        self.bounces: Dict[Tuple, int] = {}
+        self.history: Deque[Tuple[Tuple, int]] = deque()
+        self.number_bounces: int = 0
+        self.number_escapes: int = 0
+        self.right: bool = ball.get_x_direction() > 0
+        self.down: bool = ball.get_y_direction() > 0
+
+    def update(self, bumped_sprites: Iterable[Hashable]) -> bool:
+        """
+        Called after each tick with the sprites the ball bumped. When the
+        ball entered a cycle it is sent out of it at once: True is returned.
+        """
+        # Exact speed, whatever the physics: the pixels moved by a fixed-point
+        # ball vary from one tick to the next
+        pos_x, pos_y, change_x, change_y = self.ball.get_movement()
+        right: bool = change_x > 0
+        down: bool = change_y > 0
+        if right == self.right and down == self.down:
+            return False
+        self.right, self.down = right, down
+        for sprite in bumped_sprites:
+            if getattr(sprite, 'number_remaining_bumps', self.UNBREAKABLE) != self.UNBREAKABLE:
+                self.clear()
+                break
+
+        paddle_x, _ = self.paddle.get_position()
+        state: Tuple = (round(pos_x / self.POSITION_QUANTUM), round(pos_y / self.POSITION_QUANTUM),
+                        round(change_x / self.SPEED_QUANTUM), round(change_y / self.SPEED_QUANTUM),
+                        round(paddle_x))
+        self.number_bounces += 1
+        if state in self.bounces:
+            Metrics.add('cycle_detector.escapes')
+            self.ball.escape_cycle(self.number_escapes % 2 == 0)
+            self.number_escapes += 1
+            self.clear()
+            return True
+        self.bounces[state] = self.number_bounces
+        self.history.append((state, self.number_bounces))
+        if len(self.history) > self.HISTORY_SIZE:
+            old_state, bounce = self.history.popleft()
+            if self.bounces.get(old_state) == bounce:
+                del self.bounces[old_state]
+        return False
+
+    def get_state(self) -> Tuple[bool, bool, int, int, List[Tuple[Tuple, int]]]:
+        """
+        Last direction, number of bounces and escapes, and the states of the
+        history with their bounce number, oldest first
+        """
+        return self.right, self.down, self.number_bounces, self.number_escapes, \
+               list(self.history)
+
+    def set_state(self, right: bool, down: bool, number_bounces: int, number_escapes: int,
+                  history: List[Tuple[Tuple, int]]) -> None:
+        """
+        Put back a state returned by get_state
+        """
+        self.right, self.down = right, down
+        self.number_bounces = number_bounces
+        self.number_escapes = number_escapes
+        self.clear()
+        for state, bounce in history:
+            self.bounces[state] = bounce
+            self.history.append((state, bounce))
+
+    def clear(self) -> None:
+        """
+        Forget the previous bounces
+        """
+        self.bounces.clear()
+        self.history.clear()
@@ -6,24 +6,39 @@ from domain.sprites.sprites import UserControlledGameMovingSprite
 from domain.game_task_handler import GameTaskChanger
 from domain.user_panel_interface.information_screen import InputOnScreen
 from domain.common import Common
+from domain.game_clock import GameClock
 from infrastructure.gui_library import Canvas
 from infrastructure.gui_library import SoundPlayer
 from infrastructure.gui_library import Constants
 from infrastructure.gui_library import Events
+from infrastructure.input_recording import InputLog
+from infrastructure.input_recording import InputRecorder
+from infrastructure.input_recording import ReplayEvents
 
 class EventDispatcher():
     """
     Event dispatcher informs registered sprites when specific events occur like
-    mouse move or key pressed
+    mouse move or key pressed.
+    All the inputs can be recorded, or read back from a recording instead of
+    coming from the user. They can also come from another source like the
+    network (events).
     """
 
-    def __init__(self):
+    def __init__(self, recorder: InputRecorder = None, input_log: InputLog = None,
+                 events: Events = None, clock: GameClock = None):
         self.is_done_status: bool = False
         self.controlled_moving_sprites: List[UserControlledGameMovingSprite] = []
         self.game_task_changer: GameTaskChanger = None
         self.input_on_screen: InputOnScreen = None
         self.sound_start_ball: SoundPlayer = SoundPlayer([Common.START_BALL])
-        self.event_handler: Events = Events()
+        self.recorder: InputRecorder = recorder
+        self.replay_events: ReplayEvents = None
+        self.event_handler: Events = events if events is not None else Events()
+        # Paused by the player
+        self.clock: GameClock = clock
+        if input_log is not None:
+            self.replay_events = ReplayEvents(input_log)
+            self.event_handler = self.replay_events
 
     def subscribe(self, controlled_moving_sprite: UserControlledGameMovingSprite) -> None:
         """
@@ -62,11 +77,15 @@ class EventDispatcher():
         """
         return self.is_done_status
 
-    def process_event(self) -> None:
+    def process_event(self, tick: int = 0) -> None:
         """
         Handle the events
         """
+        if self.replay_events is not None:
+            self.replay_events.set_tick(tick)
         while (self.event_handler.has_more_events()):
+            if self.recorder is not None:
+                self.recorder.record_event(tick, self.event_handler.get_current_event())
 
             if self.event_handler.wants_to_quit():
                 self.is_done_status = True
@@ -98,6 +117,16 @@ class EventDispatcher():
             for controlled_moving_sprite in self.controlled_moving_sprites:
                 controlled_moving_sprite.start_direction(self.event_handler.key_pressed())
 
+        if self.clock is not None:
+            if self.event_handler.key_down([Constants.KEY_P]):
+                if self.clock.is_paused():
+                    self.clock.resume()
+                else:
+                    self.clock.pause()
+            # Nothing moves while the game is paused
+            if self.clock.is_paused():
+                return
+
         if self.event_handler.any_key_release():
             for controlled_moving_sprite in self.controlled_moving_sprites:
                 controlled_moving_sprite.stop_direction(self.event_handler.key_pressed())
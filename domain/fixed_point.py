@@ -0,0 +1,55 @@
+"""
+Integer arithmetic of the fixed-point physics
+"""
+
+class FixedPoint:
+    """
+    A fixed-point number is an int counting ONE-ths of a pixel. Only integer
+    operations are used on them, which give the same result on every machine
+    and every Python build, so that a replay or a simulation run in another
+    process stays bit-identical.
+    Rounding rules:
+    - from_float: to the nearest, ties away from zero
+    - to_pixels: floor, the remainder is always between 0 and ONE - 1
+    - multiply: toward zero, a negative speed changes exactly as its opposite
+    """
+    FRACTION_BITS: int = 8
+    ONE: int = 1 << FRACTION_BITS
+    FRACTION_MASK: int = ONE - 1
+
+    @staticmethod
+    def from_float(value: float) -> int:
+        """
+        Nearest fixed-point number
+        """
+        fixed: int = int(abs(value) * FixedPoint.ONE + 0.5)
+        return -fixed if value < 0 else fixed
+
+    @staticmethod
+    def to_float(fixed: int) -> float:
+        """
+        Exact: a fixed-point number is a float with few significant bits
+        """
+        return fixed / FixedPoint.ONE
+
+    @staticmethod
+    def to_pixels(fixed: int) -> int:
+        """
+        Whole pixels, the fraction is dropped towards minus infinity
+        """
+        return fixed >> FixedPoint.FRACTION_BITS
+
+    @staticmethod
+    def fraction(fixed: int) -> int:
+        """
+        What to_pixels dropped
+        """
+        return fixed & FixedPoint.FRACTION_MASK
+
+    @staticmethod
+    def multiply(fixed: int, factor: int) -> int:
+        """
+        Product of two fixed-point numbers
+        """
+        product: int = (abs(fixed) * abs(factor)) >> FixedPoint.FRACTION_BITS
+        return -product if (fixed < 0) != (factor < 0) else product
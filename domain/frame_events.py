@@ -0,0 +1,92 @@
+"""
+Events produced while a frame is simulated
+"""
+from __future__ import annotations
+from typing import Dict, List, TYPE_CHECKING
+from domain.game_task_handler import WinLostManagement
+if TYPE_CHECKING:
+    from domain.sprites.base_classes.base_sprite import BaseSprite
+    from domain.user_panel_interface.score_banner import Score
+    from infrastructure.gui_library import SoundPlayer
+
+class FrameEvents(WinLostManagement):
+    """
+    Collisions only record what happened: the score delta, the sounds to play
+    and whether the player won or lost. Everything is applied once, after the
+    physics of the frame, whatever the number of bumps.
+    """
+    def __init__(self, score: Score, win_lost_management: WinLostManagement):
+        self.score: Score = score
+        self.win_lost_management: WinLostManagement = win_lost_management
+        self.score_delta: int = 0
+        # Played once per frame each, in the order they were first requested
+        self.sounds: Dict[str, SoundPlayer] = {}
+        self.player_won: bool = False
+        self.player_lost: bool = False
+        self.bumped_sprites: List[BaseSprite] = []
+        # What was bumped during the last frame applied, for the state streams
+        self.last_bumped_sprites: List[BaseSprite] = []
+
+    def add_score(self, score_delta: int) -> None:
+        """
+        Points to add (or remove) at the end of the frame
+        """
+        self.score_delta += score_delta
+
+    def play(self, sound: SoundPlayer) -> None:
+        """
+        Sound to play at the end of the frame
+        """
+        self.sounds.setdefault(sound.path_to_sounds[0], sound)
+
+    def bumped(self, sprite: BaseSprite) -> None:
+        """
+        A static sprite was bumped: its state may have changed
+        """
+        self.bumped_sprites.append(sprite)
+
+    def get_last_bumped_sprites(self) -> List[BaseSprite]:
+        """
+        Sprites bumped during the last frame applied (read only)
+        """
+        return self.last_bumped_sprites
+
+    def inform_player_lost(self) -> None:
+        """
+        The ball went below the player during the frame
+        """
+        self.player_lost = True
+
+    def inform_player_won(self) -> None:
+        """
+        The last brick bringing points was destroyed during the frame
+        """
+        self.player_won = True
+
+    def apply(self) -> None:
+        """
+        End of the frame: the score is updated before the state of the game
+        changes, so that the state machine sees the final score.
+        Clearing the level wins over losing the ball in the same frame.
+        """
+        if self.score_delta != 0:
+            self.score.increase_score(self.score_delta)
+        for sound in self.sounds.values():
+            sound.play()
+        if self.player_won:
+            self.win_lost_management.inform_player_won()
+        elif self.player_lost:
+            self.win_lost_management.inform_player_lost()
+        self.last_bumped_sprites, self.bumped_sprites = \
+            self.bumped_sprites, self.last_bumped_sprites
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Forget the events recorded so far
+        """
+        self.score_delta = 0
+        self.sounds.clear()
+        self.player_won = False
+        self.player_lost = False
+        self.bumped_sprites.clear()
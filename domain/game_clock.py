@@ -0,0 +1,81 @@
+"""
+Time as seen by the game
+"""
+from typing import Callable
+import time
+
+class GameClock:
+    """
+    Live, the time comes from time.monotonic_ns: setting the wall clock does
+    not change it. Virtual, it only moves when the game ticks, by the duration
+    of a tick: a headless game goes through its timers as fast as it can tick
+    and sees exactly what it would see live.
+    No time passes while the clock is paused, time_scale speeds time up (or
+    slows it down) from the moment it is set.
+    """
+    NANOSECONDS_PER_SECOND: int = 1_000_000_000
+
+    def __init__(self, virtual: bool = False, ticks_per_second: int = 80,
+                 source: Callable[[], int] = time.monotonic_ns):
+        self.virtual: bool = virtual
+        self.tick_ns: int = self.NANOSECONDS_PER_SECOND // ticks_per_second
+        self.source: Callable[[], int] = source
+        self.time_scale: float = 1.0
+        self.paused: bool = False
+        # Game time at the last change of pace, and time of the source then
+        self.base_ns: int = 0
+        self.source_base_ns: int = source()
+
+    def now_ns(self) -> int:
+        """
+        Nanoseconds of game time since the clock was created
+        """
+        if self.virtual or self.paused:
+            return self.base_ns
+        return self.base_ns + round((self.source() - self.source_base_ns) * self.time_scale)
+
+    def now(self) -> float:
+        """
+        Seconds of game time since the clock was created
+        """
+        return self.now_ns() / self.NANOSECONDS_PER_SECOND
+
+    def tick(self) -> None:
+        """
+        Called once per tick of the game: virtual time moves forward
+        """
+        if self.virtual and not self.paused:
+            self.base_ns += round(self.tick_ns * self.time_scale)
+
+    def pause(self) -> None:
+        """
+        Stop the time
+        """
+        if not self.paused:
+            self.__rebase()
+            self.paused = True
+
+    def resume(self) -> None:
+        """
+        Let the time pass again from where it was paused
+        """
+        if self.paused:
+            self.paused = False
+            self.source_base_ns = self.source()
+
+    def is_paused(self) -> bool:
+        return self.paused
+
+    def set_time_scale(self, time_scale: float) -> None:
+        """
+        2.0: game time passes twice as fast as real time
+        """
+        self.__rebase()
+        self.time_scale = time_scale
+
+    def __rebase(self) -> None:
+        """
+        Time passed so far is kept, the pace may change from now on
+        """
+        self.base_ns = self.now_ns()
+        self.source_base_ns = self.source()
@@ -0,0 +1,48 @@
+"""
+Registry of the values the game measures about itself
+"""
+from typing import Dict, Union
+
+class Metrics:
+    """
+    Named values set by the component which measures them and read by
+    whoever reports them (--frame-stats, tools)
+    """
+    values: Dict[str, Union[int, float, str]] = {}
+
+    @staticmethod
+    def set(name: str, value: Union[int, float, str]) -> None:
+        """
+        Replace the value
+        """
+        Metrics.values[name] = value
+
+    @staticmethod
+    def add(name: str, increment: Union[int, float] = 1) -> None:
+        """
+        Counters
+        """
+        Metrics.values[name] = Metrics.values.get(name, 0) + increment
+
+    @staticmethod
+    def get(name: str, default: Union[int, float, str] = None) -> Union[int, float, str]:
+        """
+        Current value, default when it was never set
+        """
+        return Metrics.values.get(name, default)
+
+    @staticmethod
+    def get_all() -> Dict[str, Union[int, float, str]]:
+        """
+        Copy of all the values
+        """
+        return dict(Metrics.values)
+
+    @staticmethod
+    def format(prefix: str = '') -> str:
+        """
+        One line with the values whose name starts with prefix
+        """
+        return ', '.join(f'{name}={value:.3g}' if isinstance(value, float) else f'{name}={value}'
+                         for name, value in sorted(Metrics.values.items())
+                         if name.startswith(prefix))
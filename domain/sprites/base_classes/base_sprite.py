@@ -6,6 +6,8 @@ from typing import Tuple
 
 
 class BaseSprite(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_position_for_collision_analysis(self) -> Tuple[int, int]:
         """
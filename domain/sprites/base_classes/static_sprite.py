@@ -10,9 +10,10 @@ from domain.sprites.base_classes.base_sprite import BaseSprite
 from infrastructure.gui_library import Canvas
 from infrastructure.gui_library import SpriteImage
 from infrastructure.gui_library import SpriteImageOpaque
+from infrastructure.gui_library import SpriteBatch
 from infrastructure.gui_library import Rect
 from infrastructure.gui_library import SoundPlayer
-@dataclass
+@dataclass(slots=True)
 class Display:
     """
     This data class factors all display related variables
@@ -21,7 +22,7 @@ class Display:
     screen_width: int = 0
     screen_height: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Image:
     """
     This data class factors all images related variables
@@ -38,13 +39,15 @@ class StaticSprite(BaseSprite):
     Static sprites cannot move, moving sprites are handled by another class
     TODO: A build in the builder patter is needed
     """
+    # Sprites, the images and sounds they hold are slotted: no __dict__ per brick
+    __slots__ = ('collision_handler', 'image', 'display')
+
     def __init__(self, screen: Canvas):
         self.collision_handler: CollisionHandler = None
         self.image: Image = None
         super().__init__()
         screen_width, screen_height = screen.get_screen_size()
         self.display: Display = Display(screen, screen_width, screen_height)
-        self.unique_id: str = str(hex(id(self)))
 
     def get_width(self) -> int:
         return self.image.width
@@ -72,7 +75,7 @@ class StaticSprite(BaseSprite):
         return self
 
     def get_unique_id(self) -> str:
-        return self.unique_id
+        return hex(id(self))
 
     def load_image(self, width: int, height: int, image_path: str) -> StaticSprite:
         return self.display.screen.load(image_path, width, height)
@@ -101,6 +104,13 @@ class StaticSprite(BaseSprite):
         """
         self.image.image.display_on_screen()
 
+    def set_batch(self, batch: SpriteBatch) -> StaticSprite:
+        """
+        Let the batch paint the sprite instead of display_on_screen
+        """
+        batch.add(self.image.image)
+        return self
+
     def get_perimeter(self) -> List[Dict[str, int]]:
         """
         Get the perimeter of the sprite (Currently only as rectanle)
@@ -136,6 +146,8 @@ class Brick(StaticSprite):
     """
     Default behaviour for a brick
     """
+    __slots__ = ('bring_point', 'bump_sound')
+
     def __init__(self, screen: Canvas, bring_point: bool, bump_sound: str):
         self.bring_point = bring_point
         super().__init__(screen)
@@ -145,7 +157,7 @@ class Brick(StaticSprite):
         """
         Play bump sound
         """
-        self.bump_sound.play()
+        self.collision_handler.play_sound(self.bump_sound)
 
     def bring_points(self) -> bool:
         """
@@ -158,12 +170,13 @@ class DestroyableStaticSprite(Brick):
     """
     Handle the behaviour of destroyable bricks
     """
+    __slots__ = ('number_remaining_bumps', 'number_opacities', 'destroyed_sound',
+                 'sprite_image_opaque')
+
     def __init__(self, screen: Canvas, number_remaining_bumps: int,
                  number_opacities: int,
                  bring_points: bool, bump_sound: str, destroyed_sound: str):
         super().__init__(screen, bring_points, bump_sound)
-        screen_width, screen_height = screen.get_screen_size()
-        self.display: Display = Display(screen, screen_width, screen_height)
         self.number_remaining_bumps: int = number_remaining_bumps
         self.number_opacities: int = number_opacities
         self.destroyed_sound: SoundPlayer = SoundPlayer([destroyed_sound])
@@ -199,7 +212,8 @@ class DestroyableStaticSprite(Brick):
             if self.number_remaining_bumps == 0:
                 self.collision_handler.add_score(100)
                 self.collision_handler.unsubscribe(self)
-                self.destroyed_sound.play()
+                self.image.image.hide()
+                self.collision_handler.play_sound(self.destroyed_sound)
             else:
                 self.sprite_image_opaque.select_image_index(self.number_remaining_bumps)
                 self.play_bump()
@@ -209,6 +223,17 @@ class DestroyableStaticSprite(Brick):
         super().set_position(pos_x, pos_y)
         return self
 
+    def restore_number_bumped(self, number_remaining_bumps: int) -> None:
+        """
+        Put the brick back in a previously saved state, without sound nor score
+        """
+        self.number_remaining_bumps = number_remaining_bumps
+        if number_remaining_bumps > 0:
+            self.sprite_image_opaque.select_image_index(number_remaining_bumps)
+        else:
+            self.collision_handler.unsubscribe(self, inform_player_won=False)
+            self.image.image.hide()
+
     @abstractmethod
     def sprite_destroyed(self) -> None:
         """
@@ -0,0 +1,308 @@
+"""
+Bricks stored column by column: one NumPy array per attribute instead of
+one object graph (sprite, images, rects, sounds) per brick
+"""
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from domain.collision_handler.collision_handler import CollisionHandler
+from domain.common import Common
+from domain.sprites.base_classes.base_sprite import BaseSprite
+from infrastructure.gui_library import Canvas
+from infrastructure.gui_library import SoundPlayer
+from infrastructure.gui_library import SpriteImage
+from infrastructure.gui_library import SpriteImageOpaque
+from infrastructure.gui_library import TextureAtlas
+
+class BrickKind:
+    """
+    Kinds of bricks and what they share: images, sounds and scores
+    """
+    BREAKABLE: int = 0
+    UNBREAKABLE: int = 1
+    POISONED: int = 2
+
+    IMAGES: Dict[int, str] = {
+        BREAKABLE: Common.BRICK_IMAGE_NAME,
+        UNBREAKABLE: Common.UNBREAKABLE_BRICK_IMAGE_NAME,
+        POISONED: Common.POISONED_BRICK_IMAGE_NAME,
+    }
+    BUMP_SOUNDS: Dict[int, str] = {
+        BREAKABLE: Common.BUMP_BRICK,
+        UNBREAKABLE: Common.BUMP_UNBREAKABLE_BRICK,
+        POISONED: Common.BUMP_POISON,
+    }
+    DESTROYED_SOUNDS: Dict[int, str] = {
+        BREAKABLE: Common.DESTROYED_BRICK,
+        UNBREAKABLE: None,
+        POISONED: Common.DESTROYED_POISON,
+    }
+    # Same values as BreakableBrick, UnbreakableBrick and PoisonedBrick
+    BUMP_SCORES: Dict[int, int] = {BREAKABLE: 5, UNBREAKABLE: 0, POISONED: -10}
+    SPRITE_DESTROYED_SCORES: Dict[int, int] = {BREAKABLE: 100, UNBREAKABLE: 0, POISONED: -200}
+    # Added when the last bump destroys the brick (see DestroyableStaticSprite)
+    DESTROYED_SCORE: int = 100
+
+class StoredBrick(BaseSprite):
+    """
+    Thin proxy giving a brick of the store the interface of a Brick:
+    the collision handler and the game use it as any other brick
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: BrickStore, index: int):
+        self.store: BrickStore = store
+        self.index: int = index
+
+    @property
+    def number_remaining_bumps(self) -> int:
+        """
+        BrickStore.UNBREAKABLE_BUMPS for unbreakable bricks
+        """
+        return int(self.store.remaining_bumps[self.index])
+
+    def get_width(self) -> int:
+        return self.store.brick_width
+
+    def get_height(self) -> int:
+        return self.store.brick_height
+
+    def get_perimeter(self) -> List[Dict[str, int]]:
+        """
+        All the bricks of a store have the same perimeter
+        """
+        return self.store.perimeter
+
+    def get_perimeter_optimized(self) -> List[Dict[str, int]]:
+        return self.store.perimeter
+
+    def get_position(self) -> Tuple[int, int]:
+        return self.store.get_position(self.index)
+
+    def get_position_for_collision_analysis(self) -> Tuple[int, int]:
+        return self.store.get_position(self.index)
+
+    def bring_points(self) -> bool:
+        return self.store.kind[self.index] == BrickKind.BREAKABLE
+
+    def bumped(self, from_side_bumped: Dict[str, int]) -> None:
+        self.store.bumped(self.index)
+
+    def sprite_destroyed(self) -> None:
+        self.store.sprite_destroyed(self.index)
+
+    def restore_number_bumped(self, number_remaining_bumps: int) -> None:
+        self.store.restore_number_bumped(self.index, number_remaining_bumps)
+
+    def display_on_screen(self) -> None:
+        """
+        The store draws all its bricks at once
+        """
+
+class BrickStore:
+    """
+    Bricks of a level in NumPy columns (kind, remaining bumps, alive flag,
+    grid coordinates and scores). Everything a kind of brick needs (images
+    for each number of remaining bumps, sounds) is shared by its bricks.
+    Bricks are drawn with a single Surface.blits call from a texture atlas,
+    the blit sequence is only updated for bumped bricks.
+    """
+    UNBREAKABLE_BUMPS: int = 255
+
+    def __init__(self, screen: Canvas, brick_width: float, brick_height: float,
+                 from_height: int):
+        self.screen: Canvas = screen
+        self.brick_width: float = brick_width
+        self.brick_height: float = brick_height
+        self.from_height: int = from_height
+        self.perimeter: List[Dict[str, int]] = [{'x': 0, 'y': 0},
+                                                {'x': brick_width, 'y': brick_height}]
+        self.collision_handler: CollisionHandler = None
+        self.kind: np.ndarray = np.zeros(0, np.uint8)
+        self.remaining_bumps: np.ndarray = np.zeros(0, np.uint8)
+        self.alive: np.ndarray = np.zeros(0, np.bool_)
+        self.column: np.ndarray = np.zeros(0, np.int32)
+        self.row: np.ndarray = np.zeros(0, np.int32)
+        self.bump_score: np.ndarray = np.zeros(0, np.int16)
+        self.destroyed_score: np.ndarray = np.zeros(0, np.int16)
+        self.proxies: Dict[int, StoredBrick] = {}
+        self.bump_sounds: Dict[int, SoundPlayer] = {
+            kind: SoundPlayer([sound]) for kind, sound in BrickKind.BUMP_SOUNDS.items()}
+        self.destroyed_sounds: Dict[int, SoundPlayer] = {
+            kind: SoundPlayer([sound]) for kind, sound in BrickKind.DESTROYED_SOUNDS.items()
+            if sound is not None}
+        self.images: Dict[int, List[SpriteImage]] = {}
+        self.atlas: TextureAtlas = TextureAtlas()
+        self.atlas_version: int = 0
+        # Bricks drawn, the position of each brick in the blit sequence (-1 when not drawn)
+        self.sequence: List[Tuple] = []
+        self.sequence_bricks: List[int] = []
+        self.sequence_index: np.ndarray = np.zeros(0, np.int32)
+
+    def set_collision_handler(self, collision_handler: CollisionHandler) -> BrickStore:
+        """
+        Shared by all the bricks of the store
+        """
+        self.collision_handler = collision_handler
+        return self
+
+    def add_bricks(self, kinds: Sequence[int], columns: Sequence[int], rows: Sequence[int],
+                   remaining_bumps: Sequence[int]) -> BrickStore:
+        """
+        Append bricks, remaining_bumps is ignored for unbreakable bricks
+        """
+        kinds = np.asarray(kinds, np.uint8)
+        remaining_bumps = np.where(kinds == BrickKind.UNBREAKABLE, self.UNBREAKABLE_BUMPS,
+                                   np.asarray(remaining_bumps)).astype(np.uint8)
+        first: int = len(self.kind)
+        self.kind = np.concatenate((self.kind, kinds))
+        self.remaining_bumps = np.concatenate((self.remaining_bumps, remaining_bumps))
+        self.alive = np.concatenate((self.alive, np.ones(len(kinds), np.bool_)))
+        self.column = np.concatenate((self.column, np.asarray(columns, np.int32)))
+        self.row = np.concatenate((self.row, np.asarray(rows, np.int32)))
+        bump_scores: np.ndarray = np.array([BrickKind.BUMP_SCORES[kind]
+                                            for kind in range(len(BrickKind.IMAGES))], np.int16)
+        destroyed_scores: np.ndarray = np.array(
+            [BrickKind.SPRITE_DESTROYED_SCORES[kind] for kind in range(len(BrickKind.IMAGES))],
+            np.int16)
+        self.bump_score = np.concatenate((self.bump_score, bump_scores[kinds]))
+        self.destroyed_score = np.concatenate((self.destroyed_score, destroyed_scores[kinds]))
+        self.sequence_index = np.concatenate((self.sequence_index,
+                                              np.full(len(kinds), -1, np.int32)))
+        self.__load_images()
+        for index in range(first, len(self.kind)):
+            self.__show(index)
+        return self
+
+    def __load_images(self) -> None:
+        """
+        One image per number of remaining bumps, as SpriteImageOpaque does
+        for the bricks of a level
+        """
+        for kind, image_path in BrickKind.IMAGES.items():
+            image: SpriteImage = self.screen.load(image_path, self.brick_width,
+                                                  self.brick_height)
+            if kind == BrickKind.UNBREAKABLE:
+                self.images[kind] = [image]
+                continue
+            of_kind: np.ndarray = self.kind == kind
+            number_opacities: int = int(self.remaining_bumps[of_kind].max()) \
+                                    if of_kind.any() else 1
+            self.images[kind] = SpriteImageOpaque(image, self.screen, number_opacities,
+                                                  image_path).get_images()
+
+    def get_number_bricks(self) -> int:
+        return len(self.kind)
+
+    def get_number_alive_bricks(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    def get_brick(self, index: int) -> StoredBrick:
+        """
+        The proxy of a brick, always the same one for a given brick
+        """
+        brick: StoredBrick = self.proxies.get(index)
+        if brick is None:
+            brick = self.proxies[index] = StoredBrick(self, index)
+        return brick
+
+    def get_bricks(self) -> List[StoredBrick]:
+        return [self.get_brick(index) for index in range(len(self.kind))]
+
+    def get_position(self, index: int) -> Tuple[float, float]:
+        """
+        Top left corner of a brick
+        """
+        return (int(self.column[index]) * self.brick_width,
+                int(self.row[index]) * self.brick_height + self.from_height)
+
+    def get_nbytes(self) -> int:
+        """
+        Memory used by the columns
+        """
+        return sum(column.nbytes for column in (self.kind, self.remaining_bumps, self.alive,
+                                                self.column, self.row, self.bump_score,
+                                                self.destroyed_score, self.sequence_index))
+
+    def bumped(self, index: int) -> None:
+        """
+        Same behaviour as the bumped method of the brick classes
+        """
+        kind: int = int(self.kind[index])
+        if self.bump_score[index] != 0:
+            self.collision_handler.add_score(int(self.bump_score[index]))
+        if kind == BrickKind.UNBREAKABLE:
+            self.collision_handler.play_sound(self.bump_sounds[kind])
+            return
+        remaining_bumps: int = int(self.remaining_bumps[index])
+        if remaining_bumps > 0:
+            remaining_bumps -= 1
+            self.remaining_bumps[index] = remaining_bumps
+            if remaining_bumps == 0:
+                self.collision_handler.add_score(BrickKind.DESTROYED_SCORE)
+                self.__destroy(index)
+                self.collision_handler.unsubscribe(self.get_brick(index))
+                self.collision_handler.play_sound(self.destroyed_sounds[kind])
+            else:
+                self.__show(index)
+                self.collision_handler.play_sound(self.bump_sounds[kind])
+
+    def sprite_destroyed(self, index: int) -> None:
+        self.collision_handler.add_score(int(self.destroyed_score[index]))
+
+    def restore_number_bumped(self, index: int, number_remaining_bumps: int) -> None:
+        """
+        Put the brick back in a previously saved state, without sound nor score
+        """
+        self.remaining_bumps[index] = number_remaining_bumps
+        if number_remaining_bumps > 0:
+            self.__show(index)
+        else:
+            self.collision_handler.unsubscribe(self.get_brick(index), inform_player_won=False)
+            self.__destroy(index)
+
+    def __entry(self, index: int) -> Tuple:
+        images: List[SpriteImage] = self.images[int(self.kind[index])]
+        image: SpriteImage = images[min(int(self.remaining_bumps[index]), len(images) - 1)]
+        # Adding the image can replace the atlas surface: area first
+        area: Tuple[int, int, int, int] = self.atlas.get_area(image.image)
+        return (self.atlas.surface, self.get_position(index), area)
+
+    def __show(self, index: int) -> None:
+        """
+        Add the brick to the blit sequence or update its image
+        """
+        sequence_index: int = int(self.sequence_index[index])
+        entry: Tuple = self.__entry(index)
+        if sequence_index < 0:
+            self.sequence_index[index] = len(self.sequence)
+            self.sequence.append(entry)
+            self.sequence_bricks.append(index)
+        else:
+            self.sequence[sequence_index] = entry
+
+    def __destroy(self, index: int) -> None:
+        """
+        The last brick of the blit sequence takes the place of the destroyed one
+        """
+        self.alive[index] = False
+        sequence_index: int = int(self.sequence_index[index])
+        if sequence_index < 0:
+            return
+        last_brick: int = self.sequence_bricks.pop()
+        last_entry: Tuple = self.sequence.pop()
+        if last_brick != index:
+            self.sequence[sequence_index] = last_entry
+            self.sequence_bricks[sequence_index] = last_brick
+            self.sequence_index[last_brick] = sequence_index
+        self.sequence_index[index] = -1
+
+    def display_on_screen(self) -> None:
+        """
+        Paint all the bricks alive
+        """
+        if self.atlas_version != self.atlas.version:
+            self.atlas_version = self.atlas.version
+            self.sequence = [(self.atlas.surface, position, area)
+                             for _, position, area in self.sequence]
+        self.screen.blits(self.sequence)
@@ -4,13 +4,15 @@ Handle all sprites
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Tuple
+from typing import List
 from typing import Dict
-from random import random
-from time import time
+import math
 from domain.common import Common
+from domain.fixed_point import FixedPoint
 from domain.game_task_handler import WinLostManagement
 from domain.sprites.base_classes.static_sprite import Brick
 from domain.sprites.base_classes.static_sprite import StaticSprite
+from domain.sprites.base_classes.static_sprite import Image
 from domain.sprites.base_classes.static_sprite import DestroyableStaticSprite
 from infrastructure.gui_library import Canvas
 from infrastructure.gui_library import Constants
@@ -18,17 +20,51 @@ from infrastructure.gui_library import SoundPlayer
 class GameMovingSprite(StaticSprite, ABC):
     """
     Moving sprites should inherit me and provide their own functionality
+    With fixed-point physics, speeds are FixedPoint numbers and the fraction
+    of pixel not moved yet is kept in remainder_x / remainder_y: the position
+    on screen stays in whole pixels and no float is ever involved.
     """
+    __slots__ = ('change_x', 'change_y', 'highest_increment', 'collision_happened',
+                 'fixed_point', 'remainder_x', 'remainder_y')
+
     def __init__(self, screen: Canvas):
         super().__init__(screen)
         self.change_x: int = 0
         self.change_y: int = 0
         self.highest_increment = 100
         self.collision_happened = False
+        self.fixed_point: bool = False
+        self.remainder_x: int = 0
+        self.remainder_y: int = 0
 
     def __limit_speed(self) -> None:
-        self.change_x = min(self.highest_increment, self.change_x)
-        self.change_y = min(self.highest_increment, self.change_y)
+        highest_increment: int = self.highest_increment
+        if self.fixed_point:
+            highest_increment = FixedPoint.from_float(highest_increment)
+        self.change_x = min(highest_increment, self.change_x)
+        self.change_y = min(highest_increment, self.change_y)
+
+    def set_fixed_point(self, fixed_point: bool) -> GameMovingSprite:
+        """
+        Switch to fixed-point physics, the current speed is converted
+        """
+        if fixed_point != self.fixed_point:
+            if fixed_point:
+                self.change_x = FixedPoint.from_float(self.change_x)
+                self.change_y = FixedPoint.from_float(self.change_y)
+            else:
+                self.change_x = FixedPoint.to_float(self.change_x)
+                self.change_y = FixedPoint.to_float(self.change_y)
+            self.fixed_point = fixed_point
+            self.remainder_x = self.remainder_y = 0
+        return self
+
+    def set_world_width(self, world_width: int) -> GameMovingSprite:
+        """
+        Bounce on the sides of a level wider than the screen (see ScrollingLevel)
+        """
+        self.display.screen_width = world_width
+        return self
 
     def set_max_increment(self, highest_increment: int) -> GameMovingSprite:
         self.highest_increment = highest_increment
@@ -39,6 +75,9 @@ class GameMovingSprite(StaticSprite, ABC):
         """
         Increase / decrease speed (decrease with negative values)
         """
+        if self.fixed_point:
+            horizontal_speed = FixedPoint.from_float(horizontal_speed)
+            vertical_speed = FixedPoint.from_float(vertical_speed)
         self.change_x += horizontal_speed
         self.change_y += vertical_speed
         self.__limit_speed()
@@ -59,20 +98,20 @@ class GameMovingSprite(StaticSprite, ABC):
         """
         Analyze collision taking into account next position
         """
-        return (self.image.image.get_pos_x() + self.change_x,
-                self.image.image.get_pos_y() + self.change_y)
-
-    def adapt_infinte_loop(self):
-        if random() < 0.5:
-            self.change_x = max(self.change_x * 10 / 15, self.image.width / 3)
-        else:
-            self.change_y = max(self.change_y * 10 / 15, self.image.height / 3)
+        return (self.image.image.get_pos_x() + self.get_x_direction(),
+                self.image.image.get_pos_y() + self.get_y_direction())
 
     def change_speed_factor(self, factor_x: int, factor_y: int) -> None:
         """
         Speed factor should not be greater than half of the size of the sprite
         otherwise movement will not be fluid anymore
         """
+        if self.fixed_point:
+            if 2 * abs(self.change_x) < self.image.width * FixedPoint.ONE:
+                self.change_x = FixedPoint.multiply(self.change_x, FixedPoint.from_float(factor_x))
+            if 2 * abs(self.change_y) < self.image.height * FixedPoint.ONE:
+                self.change_y = FixedPoint.multiply(self.change_y, FixedPoint.from_float(factor_y))
+            return
         if abs(self.change_x) < self.image.width / 2:
             self.change_x *= factor_x
         if abs(self.change_y) < self.image.height / 2:
@@ -82,6 +121,11 @@ class GameMovingSprite(StaticSprite, ABC):
         """
         Default move
         """
+        if self.fixed_point:
+            self.image.image.move_relative(self.get_x_direction(), self.get_y_direction())
+            self.remainder_x = FixedPoint.fraction(self.remainder_x + self.change_x)
+            self.remainder_y = FixedPoint.fraction(self.remainder_y + self.change_y)
+            return
         self.image.image.move_relative(self.change_x, self.change_y)
 
     def move_from_bottom(self, position) -> None:
@@ -90,11 +134,46 @@ class GameMovingSprite(StaticSprite, ABC):
         """
         pos_x, pos_y = position
         self.image.image.set_position(pos_x, pos_y - self.image.height)
+        self.remainder_x = self.remainder_y = 0
+
+    def get_movement(self) -> Tuple[float, float, float, float]:
+        """
+        Position and speed in pixels, enough to save and restore the sprite
+        (exactly, fixed-point numbers are exact floats)
+        """
+        if self.fixed_point:
+            return (self.image.image.get_pos_x() + FixedPoint.to_float(self.remainder_x),
+                    self.image.image.get_pos_y() + FixedPoint.to_float(self.remainder_y),
+                    FixedPoint.to_float(self.change_x), FixedPoint.to_float(self.change_y))
+        return (self.image.image.get_pos_x(), self.image.image.get_pos_y(),
+                self.change_x, self.change_y)
+
+    def set_movement(self, movement: Tuple[float, float, float, float]) -> None:
+        """
+        Restore what get_movement returned
+        """
+        pos_x, pos_y, self.change_x, self.change_y = movement
+        if self.fixed_point:
+            fixed_x: int = FixedPoint.from_float(pos_x)
+            fixed_y: int = FixedPoint.from_float(pos_y)
+            pos_x, pos_y = FixedPoint.to_pixels(fixed_x), FixedPoint.to_pixels(fixed_y)
+            self.remainder_x, self.remainder_y = \
+                FixedPoint.fraction(fixed_x), FixedPoint.fraction(fixed_y)
+            self.change_x = FixedPoint.from_float(self.change_x)
+            self.change_y = FixedPoint.from_float(self.change_y)
+        self.image.image.set_position(pos_x, pos_y)
 
     def get_x_direction(self) -> int:
+        """
+        Pixels moved by the next move
+        """
+        if self.fixed_point:
+            return FixedPoint.to_pixels(self.remainder_x + self.change_x)
         return self.change_x
 
     def get_y_direction(self) -> int:
+        if self.fixed_point:
+            return FixedPoint.to_pixels(self.remainder_y + self.change_y)
         return self.change_y
     
     def get_collision_happened(self) -> bool:
@@ -107,6 +186,15 @@ class UserControlledGameMovingSprite(GameMovingSprite, ABC):
     """
     This is purely user controlled class
     """
+    __slots__ = ('view_x',)
+
+    def __init__(self, screen: Canvas):
+        super().__init__(screen)
+        # Left of the screen in the level: the mouse moves on the screen
+        self.view_x: int = 0
+
+    def set_view_x(self, view_x: int) -> None:
+        self.view_x = view_x
 
     @abstractmethod
     def start_direction(self, direction: int) -> None:
@@ -130,6 +218,8 @@ class Ball(GameMovingSprite):
     """
     This is the sprite representing the ball bumping
     """
+    __slots__ = ('horizontal_collision', 'vertical_collision', 'win_lost_management',
+                 'sound_missed_ball', 'highest_ball_increment')
 
     def __init__(self, screen: Canvas):
         super().__init__(screen)
@@ -183,7 +273,7 @@ class Ball(GameMovingSprite):
             # Check if the ball went below the player 
             if self.image.image.get_pos_y() + self.image.height > self.display.screen_height:
                 self.win_lost_management.inform_player_lost()
-                self.sound_missed_ball.play()
+                self.collision_handler.play_sound(self.sound_missed_ball)
 
         if horizontal_collision or \
            (self.image.image.get_pos_x() < 1 or \
@@ -193,10 +283,34 @@ class Ball(GameMovingSprite):
         self.change_speed_factor(1.05, 1.05)
         super().move()
 
+    def escape_cycle(self, horizontal: bool) -> None:
+        """
+        Slow down one direction for a while: the ball leaves its cycle with
+        another angle until change_speed_factor gives it its speed back
+        """
+        if self.fixed_point:
+            # Integer division rounds toward zero on the magnitudes
+            if horizontal:
+                change: int = max(abs(self.change_x) * 10 // 15,
+                                  self.image.width * FixedPoint.ONE // 3)
+                self.change_x = change if self.change_x > 0 else -change
+            else:
+                change = max(abs(self.change_y) * 10 // 15,
+                             self.image.height * FixedPoint.ONE // 3)
+                self.change_y = change if self.change_y > 0 else -change
+        elif horizontal:
+            self.change_x = math.copysign(max(abs(self.change_x) * 10 / 15, self.image.width / 3),
+                                          self.change_x)
+        else:
+            self.change_y = math.copysign(max(abs(self.change_y) * 10 / 15, self.image.height / 3),
+                                          self.change_y)
+
 class BreakableBrick(DestroyableStaticSprite):
     """
     Handles breakable bricks
     """
+    __slots__ = ('max_bumped_value',)
+
     def __init__(self, screen: Canvas, number_remaining_bumps: int,
                 number_opacities: int):
         super().__init__(screen, number_remaining_bumps, \
@@ -223,6 +337,8 @@ class UnbreakableBrick(Brick): # pylint: disable=too-few-public-methods
     """
     Handle unbreakable bricks
     """
+    __slots__ = ()
+
     def __init__(self, screen: Canvas):
         super().__init__(screen, False, Common.BUMP_UNBREAKABLE_BRICK)
 
@@ -232,10 +348,46 @@ class UnbreakableBrick(Brick): # pylint: disable=too-few-public-methods
         """
         self.play_bump()
 
+class UnbreakableWall(Brick):
+    """
+    Contiguous unbreakable bricks merged in a single collider: the ball cannot
+    bounce wrongly on the seams between them anymore. The bricks are still
+    drawn one by one and a bump is handled by one of them.
+    """
+    __slots__ = ('bricks', 'position')
+
+    def __init__(self, screen: Canvas, bricks: List[UnbreakableBrick]):
+        super().__init__(screen, False, Common.BUMP_UNBREAKABLE_BRICK)
+        self.bricks: List[UnbreakableBrick] = bricks
+        left, top = bricks[0].get_position()
+        last_left, last_top = bricks[-1].get_position()
+        width: float = last_left + bricks[-1].get_width() - left
+        height: float = last_top + bricks[-1].get_height() - top
+        self.position: Tuple[float, float] = (left, top)
+        self.image = Image(None, width, height,
+                           [{'x': 0, 'y': 0}, {'x': width, 'y': height}], None, [])
+
+    def set_position(self, pos_x: int, pos_y: int) -> UnbreakableWall:
+        self.position = (pos_x - self.image.width // 2, pos_y - self.image.height // 2)
+        return self
+
+    def get_position(self) -> Tuple[int, int]:
+        return self.position
+
+    def display_on_screen(self) -> None:
+        """
+        The bricks are displayed, not the wall
+        """
+
+    def bumped(self, from_side_bumped: Dict[str, int]) -> None:
+        self.bricks[0].bumped(from_side_bumped)
+
 class PoisonedBrick(DestroyableStaticSprite):
     """
     Poison bricks remove pints by collisions and even more when they disappear
     """
+    __slots__ = ('max_bumped_value',)
+
     def __init__(self, screen: Canvas, number_remaining_bumps: int,
                  number_opacities: int):
         super().__init__(screen, number_remaining_bumps, number_opacities,
@@ -259,14 +411,12 @@ class Player(UserControlledGameMovingSprite):
     """
     This is the concrete user player class
     """
+    __slots__ = ('sound', 'next_position_x')
+
     def __init__(self, screen: Canvas):
         super().__init__(screen)
         self.sound: SoundPlayer = SoundPlayer([Common.BUMP_PLAYER])
         self.next_position_x: int = 0
-        self.last_time_bump: float = time()
-        self.max_time_between_player_bump: int = 25
-        self.max_time_between_player_bump_after_timeout: int = 1
-        self.timeout_happened: bool = False
 
     def set_position(self, pos_x: int, pos_y: int) -> StaticSprite:
         """
@@ -314,6 +464,7 @@ class Player(UserControlledGameMovingSprite):
         self.change_x = 0
         self.change_y = 0
         mouse_position_x, _ = mouse_position
+        mouse_position_x += self.view_x
         if self.image.width // 2 < \
            mouse_position_x < self.display.screen_width - self.image.width // 2:
             self.next_position_x = mouse_position_x -  self.image.width // 2
@@ -329,30 +480,31 @@ class Player(UserControlledGameMovingSprite):
         """
         Ball bumped with the player
         """
-        self.last_time_bump = time()
-        self.timeout_happened = False
-        #Here we must save the last time for the ball that player was touched!
-        #    Then each other bump should check time diff and update increment y or x if overtime is reached
-        self.sound.play()
+        self.collision_handler.play_sound(self.sound)
         horizontal_collision, _ = \
             self.collision_handler.horizontal_collision_side_bumped(from_side_bumped)
         if horizontal_collision:
             self.collision_handler.add_score(10)
 
-    def timeout(self) -> bool:
-        if (time() - self.last_time_bump) > self.max_time_between_player_bump if not self.timeout_happened else self.max_time_between_player_bump_after_timeout:
-            self.last_time_bump = time()
-            self.timeout_happened = True
-            return True
-        return False
+    def get_next_position_x(self) -> float:
+        """
+        Position used for collisions
+        """
+        return self.next_position_x
+
+    def set_next_position_x(self, next_position_x: float) -> None:
+        """
+        Restore what get_next_position_x returned
+        """
+        self.next_position_x = next_position_x
 
     def move(self) -> None:
         """
         Move
         """
         super().change_speed_factor(1.10, 1.10)
-        if(self.image.image.get_pos_x() + self.change_x < 1 or \
-           self.image.image.get_pos_x() + self.image.width + self.change_x > \
+        if(self.image.image.get_pos_x() + self.get_x_direction() < 1 or \
+           self.image.image.get_pos_x() + self.image.width + self.get_x_direction() > \
            self.display.screen_width):
             self.change_x = 0
         #if(self.rect.y + self.change_y < 1 or
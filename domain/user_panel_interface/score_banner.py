@@ -21,6 +21,9 @@ class Score:
         self.height = height
         self.score = score
         self.remaining_balls = remaining_balls
+        # Text is only rendered again when the score or the number of balls changes
+        self.score_images_key: Tuple[int, int] = None
+        self.score_images: Tuple[SpriteImage, SpriteImage, SpriteImage] = None
 
     def increase_score(self, added_score) -> None:
         """
@@ -28,6 +31,12 @@ class Score:
         """
         self.score += added_score
 
+    def set_score(self, score: int) -> None:
+        """
+        Restore a saved score
+        """
+        self.score = score
+
     def set_number_balls(self, remaining_balls: int) -> None:
         """
         We want to display the number of balls
@@ -44,6 +53,8 @@ class Score:
         """
         Return the images to be displayed on the banner
         """
+        if self.score_images_key == (self.score, self.remaining_balls):
+            return self.score_images
         color_score: Tuple[int, int, int] = Common.blue
         if self.score < 0:
             color_score = Common.red
@@ -53,7 +64,9 @@ class Score:
         remaining_balls_surface: SpriteImage = \
             self.font.render_font('  -  Remaining balls: ' + \
                 str(self.remaining_balls), Constants.green)
-        return text_surface, score_surface, remaining_balls_surface
+        self.score_images_key = (self.score, self.remaining_balls)
+        self.score_images = (text_surface, score_surface, remaining_balls_surface)
+        return self.score_images
 
     def display_on_screen(self) -> None:
         """
@@ -18,31 +18,89 @@ class ScoreSaver(ABC):
         """
         Load the scores
         """
+
+    def append_score(self, user_name: str, score: int,
+                     score_list: List[Tuple[str, int]], level: str = None) -> None:
+        """
+        Persist a single new entry, score_list being the updated wall of fame.
+        By default the whole list is saved again
+        """
+        self.save_scores(score_list)
+
+    def rank_of(self, score: int, at_most: int = None, level: str = None,
+                day: str = None) -> int:
+        """
+        Number of saved scores strictly greater than score (0 is the best rank),
+        optionally for one level or one day (YYYY-MM-DD).
+        When at_most is given the count may stop there.
+        By default computed from the loaded scores, only for the global board
+        """
+        if level is not None or day is not None:
+            print(f'ERROR: {type(self).__name__} does not keep per level or per day scores')
+            return 0
+        rank: int = len([ saved_score for _, saved_score in self.load_scores() \
+                          if saved_score > score ])
+        return rank if at_most is None else min(rank, at_most)
+
+    def top_scores(self, count: int, level: str = None,
+                   day: str = None) -> List[Tuple[str, int]]:
+        """
+        Best count scores, optionally for one level or one day (YYYY-MM-DD).
+        By default only the global board is available
+        """
+        if level is not None or day is not None:
+            print(f'ERROR: {type(self).__name__} does not keep per level or per day scores')
+            return []
+        return self.load_scores()[0:count]
+
+    def close(self) -> None:
+        """
+        Flush pending writes and release resources
+        """
+
 class ScoreHandler:
     """
     Concrete class displaying score and other stuff in the banner
     """
     max_scores: int = 10
+    # Name of the scores which did not enter the wall of fames
+    anonymous_name: str = 'anonymous'
     def __init__(self, score_saver: ScoreSaver):
         self.score_saver: ScoreSaver = score_saver
-        self.score_list: List[Tuple[str, int]] = self.score_saver.load_scores()
+        # Only needed once the game is over: loaded on first use
+        self.loaded_score_list: List[Tuple[str, int]] = None
+
+    @property
+    def score_list(self) -> List[Tuple[str, int]]:
+        """
+        The wall of fame
+        """
+        if self.loaded_score_list is None:
+            self.loaded_score_list = self.score_saver.load_scores()
+        return self.loaded_score_list
+
+    @score_list.setter
+    def score_list(self, score_list: List[Tuple[str, int]]) -> None:
+        self.loaded_score_list = score_list
 
     def is_wall_of_fames(self, score: int) -> bool:
         """
         Is the user electable to the wall of fame (10 best players?)
         """
-        if len(self.score_list) >= self.max_scores:
-            _, lowest_score = self.score_list[-1]
-            if score < lowest_score:
-                return False
-        return True
+        return self.score_saver.rank_of(score, self.max_scores) < self.max_scores
+
+    def add_score(self, user_name: str, score: int, level: str = None) -> None:
+        """
+        Every score is saved, the ones electable join the wall of fames
+        """
+        if self.is_wall_of_fames(score):
+            self.__add_to_wall_of_fames(user_name, score)
+        self.score_saver.append_score(user_name, score, self.score_list, level)
 
-    def add_score(self, user_name: str, score: int) -> None:
+    def __add_to_wall_of_fames(self, user_name: str, score: int) -> None:
         """
-        Add score to the wall of fames
+        Insert the score in the wall of fames, sorted
         """
-        if not self.is_wall_of_fames(score):
-            return
         if len(self.score_list) == 0:
             self.score_list.append((user_name, score))
         else:
@@ -65,10 +123,14 @@ class ScoreHandler:
         if len(self.score_list) > self.max_scores:
             self.score_list = self.score_list[0:10]
 
-        self.score_saver.save_scores(self.score_list)
-
     def get_score_list_formated(self) -> List[str]:
         """
         Return the scores in a fromatted way
         """
         return [ user_name + ':' + str(score) for user_name, score in self.score_list]
+
+    def close(self) -> None:
+        """
+        Make sure all scores reached the storage
+        """
+        self.score_saver.close()
@@ -0,0 +1,192 @@
+"""
+Single file holding all the assets: one open and one memory map instead of
+many small reads. Assets missing from the pack are read from loose files.
+
+File layout (little endian):
+    header:  magic 'CCAP', version u16, number of assets u32
+    index:   for each asset: kind u8, offset u64, length u64 and its utf-8 name
+             (path relative to the game directory) prefixed by its length (u16)
+    data:    the asset files one after the other
+"""
+from __future__ import annotations
+from typing import BinaryIO, Dict, List, Tuple, Union
+import io
+import mmap
+import os
+import struct
+
+class AssetKind:
+    """
+    Kinds of assets, deduced from the file extension
+    """
+    IMAGE: int = 0
+    SOUND: int = 1
+    LEVEL: int = 2
+    OTHER: int = 3
+
+    EXTENSIONS: Dict[str, int] = {
+        '.png': IMAGE,
+        '.wav': SOUND,
+        '.txt': LEVEL,
+    }
+
+MAGIC: bytes = b'CCAP'
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct('<4sHI')
+ENTRY: struct.Struct = struct.Struct('<BQQH')
+
+class AssetReader(io.RawIOBase):
+    """
+    Read only file object over a slice of the memory mapped pack:
+    decoders read straight from the map, nothing is copied beforehand
+    """
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self.view: memoryview = view
+        self.position: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        length: int = min(len(buffer), len(self.view) - self.position)
+        buffer[0:length] = self.view[self.position:self.position + length]
+        self.position += length
+        return length
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+class AssetPack:
+    """
+    The mounted pack is shared by the whole game (see mount / open)
+    """
+    mounted: AssetPack = None
+
+    def __init__(self, file_name: str, prefix: str = ''):
+        self.prefix: str = self.__normalize(prefix) + '/' if prefix else ''
+        with open(file_name, 'rb') as file:
+            self.map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view: memoryview = memoryview(self.map)
+        magic, version, number_assets = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{file_name} is not an asset pack this version can read')
+        self.index: Dict[str, Tuple[int, int, int]] = {}
+        offset: int = HEADER.size
+        for _ in range(number_assets):
+            kind, asset_offset, length, name_length = ENTRY.unpack_from(self.map, offset)
+            offset += ENTRY.size
+            name: str = bytes(self.view[offset:offset + name_length]).decode('utf-8')
+            offset += name_length
+            self.index[name] = (asset_offset, length, kind)
+
+    @staticmethod
+    def __normalize(path: str) -> str:
+        return os.path.normpath(path).replace(os.sep, '/')
+
+    def __name(self, path: str) -> str:
+        name: str = self.__normalize(path)
+        if self.prefix and name.startswith(self.prefix):
+            return name[len(self.prefix):]
+        return name
+
+    def get(self, path: str) -> memoryview:
+        """
+        Content of an asset, None when it is not in the pack
+        """
+        entry: Tuple[int, int, int] = self.index.get(self.__name(path))
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        return self.view[offset:offset + length]
+
+    def close(self) -> None:
+        """
+        Release the memory map
+        """
+        self.view.release()
+        self.map.close()
+
+    @staticmethod
+    def mount(file_name: str, prefix: str = '') -> bool:
+        """
+        Use the pack if it exists: paths starting with prefix are looked up
+        in it, without the prefix
+        """
+        if not os.path.isfile(file_name):
+            return False
+        try:
+            AssetPack.mounted = AssetPack(file_name, prefix)
+        except (OSError, ValueError, struct.error) as error:
+            print(f'ERROR: Ignoring asset pack {file_name}: {error}')
+            return False
+        return True
+
+    @staticmethod
+    def open(path: str) -> Union[str, BinaryIO]:
+        """
+        What pygame should load: a reader over the pack or the loose file
+        """
+        if AssetPack.mounted is not None:
+            view: memoryview = AssetPack.mounted.get(path)
+            if view is not None:
+                return AssetReader(view)
+        return path
+
+    @staticmethod
+    def read_lines(path: str) -> List[str]:
+        """
+        Lines of a text asset
+        """
+        if AssetPack.mounted is not None:
+            view: memoryview = AssetPack.mounted.get(path)
+            if view is not None:
+                return str(view, 'utf-8').splitlines(keepends=True)
+        with open(path, encoding="utf-8") as file:
+            return file.readlines()
+
+    @staticmethod
+    def build(game_directory: str, file_name: str, asset_directory: str = 'assets') -> int:
+        """
+        Pack every file below game_directory/asset_directory, return the number of assets
+        """
+        names: List[str] = []
+        for directory, _, files in os.walk(os.path.join(game_directory, asset_directory)):
+            for asset_file in files:
+                names.append(os.path.relpath(os.path.join(directory, asset_file),
+                                             game_directory).replace(os.sep, '/'))
+        names.sort()
+
+        contents: List[bytes] = []
+        for name in names:
+            with open(os.path.join(game_directory, name), 'rb') as file:
+                contents.append(file.read())
+        encoded_names: List[bytes] = [name.encode('utf-8') for name in names]
+        offset: int = HEADER.size + sum(ENTRY.size + len(encoded_name)
+                                        for encoded_name in encoded_names)
+        index: List[bytes] = []
+        for name, encoded_name, content in zip(names, encoded_names, contents):
+            kind: int = AssetKind.EXTENSIONS.get(os.path.splitext(name)[1].lower(),
+                                                 AssetKind.OTHER)
+            index.append(ENTRY.pack(kind, offset, len(content), len(encoded_name)) + encoded_name)
+            offset += len(content)
+
+        temporary_file_name: str = file_name + '.tmp'
+        with open(temporary_file_name, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(names)))
+            file.write(b''.join(index))
+            for content in contents:
+                file.write(content)
+        os.replace(temporary_file_name, file_name)
+        return len(names)
@@ -0,0 +1,65 @@
+"""
+Decide when the next frame is due
+"""
+import time
+import pygame
+from domain.metrics import Metrics
+from infrastructure.gui_library import Events
+
+class FrameMode:
+    """
+    Modes of the scheduler
+    """
+    FULL_RATE: str = 'full rate'
+    IDLE: str = 'idle'
+
+class FrameScheduler:
+    """
+    Full frame rate while the scene is animated, event driven otherwise:
+    waiting for an event costs no CPU, idle_timeout_ms bounds the time
+    between two idle frames. The event which wakes the scheduler up is
+    given back to Events, ahead of the events which arrived after it.
+    Every second the mode, frames and CPU time per second are published
+    in Metrics; when report is set all the metrics are printed.
+    """
+    def __init__(self, frame_rate: int = 80, idle_timeout_ms: int = 250, report: bool = False):
+        self.frame_rate: int = frame_rate
+        self.idle_timeout_ms: int = idle_timeout_ms
+        self.report: bool = report
+        self.clock: pygame.time.Clock = pygame.time.Clock()
+        self.mode: str = FrameMode.FULL_RATE
+        self.frames: int = 0
+        self.second_start: float = time.perf_counter()
+        self.cpu_start: float = time.process_time()
+
+    def wait_next_frame(self, animating: bool) -> None:
+        """
+        Sleep until the next frame is due
+        """
+        if animating:
+            self.mode = FrameMode.FULL_RATE
+            self.clock.tick(self.frame_rate)
+        else:
+            self.mode = FrameMode.IDLE
+            event: pygame.event.Event = pygame.event.wait(self.idle_timeout_ms)
+            if event.type != pygame.NOEVENT:
+                Events.give_back(event)
+            # Next full rate frame is timed from now, not from the last one
+            self.clock.tick()
+        self.frames += 1
+        self.__measure()
+
+    def __measure(self) -> None:
+        now: float = time.perf_counter()
+        elapsed: float = now - self.second_start
+        if elapsed < 1.0:
+            return
+        cpu_now: float = time.process_time()
+        Metrics.set('frames.mode', self.mode)
+        Metrics.set('frames.per_second', self.frames / elapsed)
+        Metrics.set('frames.cpu_time_per_second', (cpu_now - self.cpu_start) / elapsed)
+        if self.report:
+            print(Metrics.format())
+        self.frames = 0
+        self.second_start = now
+        self.cpu_start = cpu_now
@@ -0,0 +1,79 @@
+"""
+Messages exchanged between the game server and thin clients over TCP
+
+Client to server (little endian, fixed size, no framing):
+    input:   sequence u32, paddle x i16, buttons u8 (see Buttons)
+Server to client: the state stream of the board (see infrastructure/state_stream),
+    its input_sequence acknowledges the last input applied.
+"""
+from __future__ import annotations
+import asyncio
+import struct
+import pygame
+from infrastructure.gui_library import Constants
+from infrastructure.gui_library import Events
+
+class Buttons:
+    """
+    Bits of the buttons field of an input
+    """
+    START: int = 1
+    VALIDATE: int = 2
+
+INPUT: struct.Struct = struct.Struct('<IhB')
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Next frame of the state stream, without its length prefix
+    """
+    length: int = 0
+    shift: int = 0
+    while True:
+        byte: int = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return await reader.readexactly(length)
+        shift += 7
+
+class RemoteEvents(Events):
+    """
+    Inputs received from a client instead of pygame. Inputs received
+    between two ticks are merged: the last paddle position wins, buttons
+    are kept until the next tick.
+    """
+    def __init__(self):
+        super().__init__()
+        self.sequence: int = 0
+        self.paddle_x: int = None
+        self.buttons: int = 0
+
+    def push(self, sequence: int, paddle_x: int, buttons: int) -> None:
+        """
+        Input received from the client
+        """
+        self.sequence = sequence
+        self.paddle_x = paddle_x
+        self.buttons |= buttons
+
+    def has_more_events(self) -> bool:
+        if len(self.event_list) == 0:
+            self.__queue_pending_input()
+        if len(self.event_list) > 0:
+            self.current_event = self.event_list.popleft()
+        else:
+            self.current_event = None
+        return self.current_event is not None
+
+    def __queue_pending_input(self) -> None:
+        """
+        Turn the input received since the last tick into pygame events
+        """
+        if self.paddle_x is not None:
+            self.event_list.append(pygame.event.Event(pygame.MOUSEMOTION, pos=(self.paddle_x, 0)))
+        if self.buttons & Buttons.START:
+            self.event_list.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                                      pos=(self.paddle_x or 0, 0)))
+        if self.buttons & Buttons.VALIDATE:
+            self.event_list.append(pygame.event.Event(pygame.KEYDOWN, key=Constants.RETURN))
+        self.paddle_x = None
+        self.buttons = 0
@@ -1,8 +1,11 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import Deque, List, Dict, Tuple
+import collections
+import threading
 import pygame
+from infrastructure.asset_pack import AssetPack
 class Constants:
     LEFT_KEY: int = pygame.K_LEFT
     RIGHT_KEY: int = pygame.K_RIGHT
@@ -11,6 +14,7 @@ class Constants:
     ESCAPE: int = pygame.K_ESCAPE
     RETURN: int = pygame.K_RETURN
     KEY_Q: int = pygame.K_q
+    KEY_P: int = pygame.K_p
     SPACE: int = pygame.K_SPACE
     red: Tuple[int, int, int] = (255, 0, 0)
     black: Tuple[int, int, int] = (0, 0, 0)
@@ -25,7 +29,13 @@ class BasicCanvas(ABC):
          Display image
          """
 
-@dataclass
+    @abstractmethod
+    def blits(self, sequence: List[Tuple[pygame.Surface, Tuple[int, int], pygame.Rect]]) -> None:
+         """
+         Display many images (image, position, area of the image) in one call
+         """
+
+@dataclass(slots=True)
 class Rect:
     x: int
     y: int
@@ -35,16 +45,21 @@ class Rect:
     right: int
 
 class SpriteImage:
+    __slots__ = ('image', 'screen', 'rect', 'image_path', 'batch', 'batch_index')
+
     def __init__(self, image: pygame.Surface, screen: BasicCanvas, image_path: str):
         self.image: pygame.Surface = image
         self.screen: BasicCanvas = screen
         self.rect: Rect = self.get_rect()
         self.image_path = image_path
-        self.unused: pygame.Surface = pygame.Surface((10, 10))
+        self.batch: SpriteBatch = None
+        self.batch_index: int = -1
 
     def set_position(self, pos_x: int, pos_y: int) -> None:
         self.rect.x = pos_x
         self.rect.y = pos_y
+        if self.batch is not None:
+            self.batch.update(self)
 
     def get_width(self) -> int:
         return self.image.get_width()
@@ -61,6 +76,8 @@ class SpriteImage:
     def move_relative(self, inc_x: int, inc_y: int) -> None:
         self.rect.x += inc_x
         self.rect.y += inc_y
+        if self.batch is not None:
+            self.batch.update(self)
 
     def get_pos_x(self) -> int:
         return self.rect.x
@@ -83,15 +100,28 @@ class SpriteImage:
 
     def set_new_image(self, sprite_image: SpriteImage) -> None:
         self.image = sprite_image.image
+        if self.batch is not None:
+            self.batch.update(self)
+
+    def hide(self) -> None:
+        """
+        Stop drawing the sprite when it is drawn by a batch
+        """
+        if self.batch is not None:
+            self.batch.remove(self)
 
 
 
 class SpriteImageOpaque(SpriteImage):
-    
+    # Opacity variants only depend on the image and its size: all the bricks
+    # of a kind share them, which also keeps the texture atlas small
+    opaque_images: Dict[Tuple[str, int, int, int], List[SpriteImage]] = {}
+    __slots__ = ('opaque_key', 'image_key', 'number_opacities')
 
     def __init__(self, image_key: SpriteImage, screen: BasicCanvas, number_opacities: int, image_path: str):
         super().__init__(image_key.image, screen, image_path)
-        self.opaque_images: Dict[str, List[SpriteImage]] = dict()
+        self.opaque_key: Tuple[str, int, int, int] = (image_path, *image_key.image.get_size(),
+                                                      number_opacities)
         self.image_key: SpriteImage = image_key
         self.screen: BasicCanvas = screen
         self.rect: Rect = self.get_rect()
@@ -103,57 +133,266 @@ class SpriteImageOpaque(SpriteImage):
         Breakable bricks change opacity when they get bumped.
         All the opacities are created upfront to be sure the effect will be smooth
         """
-        if self.image_path in self.opaque_images:
+        if self.opaque_key in self.opaque_images:
             return
 
-        self.opaque_images[self.image_path] = []#[self.image]
+        opaque_images: List[SpriteImage] = []
         for opacity in range(self.number_opacities):
             new_image = self.image_key.image.copy()
             new_image.fill((255, 255, 255,
                             100 + opacity * 155 // self.number_opacities),
                             None, pygame.BLEND_RGBA_MULT)
-            self.opaque_images[self.image_path].append(\
-                SpriteImage(new_image, self.screen, self.image_path))
-        self.opaque_images[self.image_path].append(self)
+            opaque_images.append(SpriteImage(new_image, self.screen, self.image_path))
+        opaque_images.append(SpriteImage(self.image_key.image, self.screen, self.image_path))
+        self.opaque_images[self.opaque_key] = opaque_images
+
+    def get_images(self) -> List[SpriteImage]:
+        """
+        The images select_image_index chooses from
+        """
+        return self.opaque_images[self.opaque_key]
 
     def select_image_index(self, index:int) -> None:
-        max_images: int = len(self.opaque_images[self.image_path])
+        max_images: int = len(self.opaque_images[self.opaque_key])
         if index >= 0 and index < max_images:
-            self.image_key.set_new_image(self.opaque_images[self.image_path][index])
+            self.image_key.set_new_image(self.opaque_images[self.opaque_key][index])
 
         else:
             print(f'ERROR: Using index {index} whose value must be between 0 and {max_images}')
     
 
+class TextureAtlas:
+    """
+    Images packed on the shelves of a single surface. Images are added on
+    first use, the surface grows (and is replaced) when it is full:
+    version changes each time this happens.
+    """
+    def __init__(self, width: int = 1024):
+        self.width: int = width
+        self.surface: pygame.Surface = None
+        self.version: int = 0
+        self.areas: Dict[int, pygame.Rect] = {}
+        # Keeps the images alive so that their id is never reused
+        self.images: List[pygame.Surface] = []
+        self.shelf_x: int = 0
+        self.shelf_y: int = 0
+        self.shelf_height: int = 0
+
+    def get_area(self, image: pygame.Surface) -> pygame.Rect:
+        """
+        Where the image is in the atlas
+        """
+        area: pygame.Rect = self.areas.get(id(image))
+        if area is None:
+            area = self.__add(image)
+        return area
+
+    def __add(self, image: pygame.Surface) -> pygame.Rect:
+        width, height = image.get_size()
+        if self.shelf_x + width > self.width:
+            self.shelf_x = 0
+            self.shelf_y += self.shelf_height
+            self.shelf_height = 0
+        area: pygame.Rect = pygame.Rect(self.shelf_x, self.shelf_y, width, height)
+        self.shelf_x += width
+        self.shelf_height = max(self.shelf_height, height)
+        if self.surface is None or area.right > self.surface.get_width() or \
+           area.bottom > self.surface.get_height():
+            self.__grow(max(self.width, area.right), area.bottom)
+        # An exact copy (alpha included) on the transparent atlas, not a blend
+        self.surface.blit(image, area, special_flags=pygame.BLEND_RGBA_MAX)
+        self.areas[id(image)] = area
+        self.images.append(image)
+        return area
+
+    def __grow(self, width: int, height: int) -> None:
+        previous_surface: pygame.Surface = self.surface
+        if previous_surface is not None:
+            height = max(height, 2 * previous_surface.get_height())
+        self.width = width
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+            self.surface.fill((0, 0, 0, 0))
+        if previous_surface is not None:
+            self.surface.blit(previous_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.version += 1
+
+class SpriteBatch:
+    """
+    Sprites drawn with a single Surface.blits call from a texture atlas.
+    The blit sequence is only updated for the sprites which change image,
+    move or disappear, drawing costs one Python call whatever their number.
+    """
+    def __init__(self, screen: BasicCanvas):
+        self.screen: BasicCanvas = screen
+        self.atlas: TextureAtlas = TextureAtlas()
+        self.atlas_version: int = 0
+        self.sprite_images: List[SpriteImage] = []
+        self.sequence: List[Tuple[pygame.Surface, Tuple[int, int], pygame.Rect]] = []
+
+    def __entry(self, sprite_image: SpriteImage) -> Tuple[pygame.Surface, Tuple[int, int],
+                                                          pygame.Rect]:
+        area: pygame.Rect = self.atlas.get_area(sprite_image.image)
+        return (self.atlas.surface, (sprite_image.rect.x, sprite_image.rect.y), area)
+
+    def add(self, sprite_image: SpriteImage) -> None:
+        """
+        The sprite is drawn by the batch from now on
+        """
+        sprite_image.batch = self
+        sprite_image.batch_index = len(self.sequence)
+        self.sprite_images.append(sprite_image)
+        self.sequence.append(self.__entry(sprite_image))
+
+    def update(self, sprite_image: SpriteImage) -> None:
+        """
+        The sprite changed image or position
+        """
+        self.sequence[sprite_image.batch_index] = self.__entry(sprite_image)
+
+    def remove(self, sprite_image: SpriteImage) -> None:
+        """
+        The last sprite takes the place of the removed one: sprites of a
+        batch must not overlap as the drawing order changes
+        """
+        index: int = sprite_image.batch_index
+        last_sprite_image: SpriteImage = self.sprite_images.pop()
+        last_entry: Tuple[pygame.Surface, Tuple[int, int], pygame.Rect] = self.sequence.pop()
+        if last_sprite_image is not sprite_image:
+            self.sprite_images[index] = last_sprite_image
+            self.sequence[index] = last_entry
+            last_sprite_image.batch_index = index
+        sprite_image.batch = None
+        sprite_image.batch_index = -1
+
+    def get_number_sprites(self) -> int:
+        return len(self.sprite_images)
+
+    def display_on_screen(self) -> None:
+        """
+        Paint all the sprites
+        """
+        if self.atlas_version != self.atlas.version:
+            self.atlas_version = self.atlas.version
+            self.sequence = [self.__entry(sprite_image) for sprite_image in self.sprite_images]
+        self.screen.blits(self.sequence)
+
+class SoundLibrary:
+    """
+    Sounds are decoded once and shared by all the sound players.
+    The mixer is initialized and the sounds decoded on a background
+    thread (preload) so that the first frame does not wait for them;
+    a sound requested before it is preloaded is decoded on first use.
+    """
+    sounds: Dict[str, pygame.mixer.Sound] = {}
+    lock: threading.RLock = threading.RLock()
+    mixer_ready: bool = False
+    # The mixer is only tried once: without audio every sound is silent
+    mixer_failed: bool = False
+
+    @staticmethod
+    def __init_mixer() -> bool:
+        with SoundLibrary.lock:
+            if not SoundLibrary.mixer_ready and not SoundLibrary.mixer_failed:
+                try:
+                    pygame.mixer.init()
+                    SoundLibrary.mixer_ready = True
+                except pygame.error as error:
+                    SoundLibrary.mixer_failed = True
+                    print(f'ERROR: No sound available: {error}')
+            return SoundLibrary.mixer_ready
+
+    @staticmethod
+    def get(path_to_sound: str) -> pygame.mixer.Sound:
+        """
+        The decoded sound, None when sound is not available
+        """
+        sound: pygame.mixer.Sound = SoundLibrary.sounds.get(path_to_sound)
+        if sound is not None or SoundLibrary.mixer_failed:
+            return sound
+        with SoundLibrary.lock:
+            if path_to_sound not in SoundLibrary.sounds and SoundLibrary.__init_mixer():
+                SoundLibrary.sounds[path_to_sound] = pygame.mixer.Sound(
+                    file=AssetPack.open(path_to_sound))
+            return SoundLibrary.sounds.get(path_to_sound)
+
+    @staticmethod
+    def preload(path_to_sounds: List[str], play_when_loaded: str = None) -> threading.Thread:
+        """
+        Decode the sounds on a background thread
+        """
+        def load() -> None:
+            for path_to_sound in path_to_sounds:
+                SoundLibrary.get(path_to_sound)
+                if path_to_sound == play_when_loaded and SoundLibrary.mixer_ready:
+                    pygame.mixer.Sound.play(SoundLibrary.get(path_to_sound))
+        loader: threading.Thread = threading.Thread(target=load, name='sound-loader', daemon=True)
+        loader.start()
+        return loader
+
 class SoundPlayer:
     def __init__(self, path_to_sounds: List[str]):
-        self.sounds: Dict[str, pygame.mixer.Sound] = dict()
-        for path_to_sound in path_to_sounds:
-            self.sounds[path_to_sound] =  pygame.mixer.Sound(path_to_sound)
+        self.path_to_sounds: List[str] = path_to_sounds
     
     def play(self, path_to_sound = None):
-        if path_to_sound in self.sounds:
-            pygame.mixer.Sound.play(self.sounds[path_to_sound])
-        elif len(self.sounds) == 1:
-            sound = list(self.sounds.values())[0]
+        if path_to_sound not in self.path_to_sounds:
+            if len(self.path_to_sounds) != 1:
+                print(f'ERROR: sound {self.path_to_sounds} seems to be empty!')
+                return
+            path_to_sound = self.path_to_sounds[0]
+        sound: pygame.mixer.Sound = SoundLibrary.get(path_to_sound)
+        if sound is not None:
             pygame.mixer.Sound.play(sound)
-        else:
-            print(f'ERROR: sound {self.sounds} seems to be empty!')
 
 class Events:
+    # Window to render resolution (see Canvas): mouse positions are given
+    # in render coordinates, they do not depend on the size of the window
+    render_scale: Tuple[float, float] = (1.0, 1.0)
+    MOUSE_EVENTS: Tuple[int, ...] = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                                     pygame.MOUSEBUTTONUP)
+    # Taken from the pygame queue by someone else (see FrameScheduler): they
+    # are older than the events still in the queue and handled first
+    taken_events: Deque[pygame.event.Event] = collections.deque()
+
     def __init__(self):
         self.type: int = 0
         self.key: int = 0
-        self.event_list: List[pygame.event.Event] = []
+        # Consumed from the left: popleft is O(1) whatever the number queued
+        self.event_list: Deque[pygame.event.Event] = collections.deque()
         self.current_event: pygame.event.Event = None
 
+    @staticmethod
+    def set_render_scale(scale_x: float, scale_y: float) -> None:
+        Events.render_scale = (scale_x, scale_y)
+
+    @staticmethod
+    def __to_render_position(event: pygame.event.Event) -> pygame.event.Event:
+        scale_x, scale_y = Events.render_scale
+        if event.type not in Events.MOUSE_EVENTS or (scale_x, scale_y) == (1.0, 1.0):
+            return event
+        pos_x, pos_y = event.pos
+        attributes = dict(event.dict)
+        attributes['pos'] = (int(pos_x * scale_x), int(pos_y * scale_y))
+        return pygame.event.Event(event.type, attributes)
+
+    @staticmethod
+    def give_back(event: pygame.event.Event) -> None:
+        """
+        An event taken from the pygame queue which still needs to be handled
+        """
+        Events.taken_events.append(event)
+
     def has_more_events(self) -> bool:
         new_events = pygame.event.get()
+        if len(Events.taken_events) > 0:
+            self.event_list.extend(self.__to_render_position(event)
+                                   for event in Events.taken_events)
+            Events.taken_events.clear()
         if len(new_events) > 0:
-            self.event_list.extend(new_events)
+            self.event_list.extend(self.__to_render_position(event) for event in new_events)
         if len(self.event_list) > 0:
-            self.current_event = self.event_list[0]
-            self.event_list = self.event_list[1:]
+            self.current_event = self.event_list.popleft()
         else:
             self.current_event = None
         return self.current_event != None
@@ -171,7 +410,10 @@ class Events:
         return self.current_event.type == pygame.MOUSEMOTION
         
     def get_mouse_position(self) ->  Tuple[int, int]:
-        return pygame.mouse.get_pos()
+        return self.current_event.pos
+
+    def get_current_event(self) -> pygame.event.Event:
+        return self.current_event
         
     def mouse_button_down(self) -> bool:
         return self.current_event.type == pygame.MOUSEBUTTONDOWN
@@ -189,32 +431,76 @@ class Events:
 class Canvas(BasicCanvas):
     @staticmethod
     def __init():
-      pygame.init()
-      pygame.mixer.init()
-      pygame.font.init()
+        # Only what the first frame needs: the mixer is started by SoundLibrary
+        pygame.display.init()
+        pygame.font.init()
 
     def blit(self, image: pygame.Surface, pos_x: int, pos_y: int) -> None:
-        self.screen.blit(image, (pos_x, pos_y))
+        camera_x, camera_y = self.camera
+        self.screen.blit(image, (pos_x - camera_x, pos_y - camera_y))
+
+    def blits(self, sequence: List[Tuple[pygame.Surface, Tuple[int, int], pygame.Rect]]) -> None:
+        if self.camera != (0, 0):
+            camera_x, camera_y = self.camera
+            sequence = [(image, (pos_x - camera_x, pos_y - camera_y), area)
+                        for image, (pos_x, pos_y), area in sequence]
+        self.screen.blits(sequence, False)
+
+    def set_camera(self, pos_x: int, pos_y: int) -> None:
+        """
+        Position of the top left corner of the screen in the world: what is
+        drawn from now on is moved by the opposite
+        """
+        self.camera = (pos_x, pos_y)
 
     def __init__(self,
                  window_title: str, 
                  screen_width: int, screen_height: int,
-                 start_music_path: str):
+                 start_music_path: str,
+                 window_size: Tuple[int, int] = None, smooth_scale: bool = False):
+        """
+        The game is drawn at screen_width x screen_height (render resolution).
+        When the window has another size the game is drawn offscreen and
+        presented with a single scale pass, smooth or nearest neighbour.
+        """
         Canvas.__init()
-        self.screen: pygame.Surface = pygame.display.set_mode((screen_width, screen_height),
+        window_width, window_height = window_size if window_size is not None \
+                                      else (screen_width, screen_height)
+        self.window: pygame.Surface = pygame.display.set_mode((window_width, window_height),
                                      pygame.HWSURFACE | pygame.DOUBLEBUF) # | pygame.FULLSCREEN)
+        self.screen: pygame.Surface = self.window
+        if (window_width, window_height) != (screen_width, screen_height):
+            self.screen = pygame.Surface((screen_width, screen_height)).convert()
+        self.smooth_scale: bool = smooth_scale
+        Events.set_render_scale(screen_width / window_width, screen_height / window_height)
         pygame.display.set_caption(window_title)
-        start_sound = pygame.mixer.Sound(start_music_path)
-        pygame.mixer.Sound.play(start_sound)
+        SoundLibrary.preload([start_music_path], start_music_path)
         self.clock: pygame.time.Clock = pygame.time.Clock()
+        self.images: Dict[Tuple[str, int, int], pygame.Surface] = {}
+        self.camera: Tuple[int, int] = (0, 0)
 
     def fill_color(self, color: Tuple[int, int, int]) -> None:
         self.screen.fill(color)
 
     def get_screen_size(self) -> Tuple[int, int]:
-        return pygame.display.get_surface().get_size()
-    def refresh(self) -> None:
+        return self.screen.get_size()
+
+    def get_window_size(self) -> Tuple[int, int]:
+        return self.window.get_size()
+
+    def present(self) -> None:
+        """
+        Scale the render surface to the window, if they differ, and show it
+        """
+        if self.screen is not self.window:
+            if self.smooth_scale:
+                pygame.transform.smoothscale(self.screen, self.window.get_size(), self.window)
+            else:
+                pygame.transform.scale(self.screen, self.window.get_size(), self.window)
         pygame.display.flip()
+
+    def refresh(self) -> None:
+        self.present()
         self.clock.tick(80)
 
     @staticmethod
@@ -225,11 +511,30 @@ class Canvas(BasicCanvas):
     def get_surface(self) -> pygame.Surface:
         return self.screen
     def __load_image(self, image_path: str, width: int, height:int) -> pygame.Surface:
-        image = pygame.image.load(image_path).convert_alpha()
-        image = pygame.transform.scale(image, (width, height))
+        """
+        Images are decoded and scaled once per size: loaded surfaces are
+        never drawn on, so they can be shared
+        """
+        image_key: Tuple[str, int, int] = (image_path, width, height)
+        image: pygame.Surface = self.images.get(image_key)
+        if image is None:
+            image = pygame.image.load(AssetPack.open(image_path), image_path).convert_alpha()
+            image = pygame.transform.scale(image, (width, height))
+            self.images[image_key] = image
 
         return image
 
+    def show_progress(self, progress: float) -> None:
+        """
+        Loading screen: a progress bar is enough, it does not need any font
+        """
+        screen_width, screen_height = self.get_screen_size()
+        self.screen.fill(Constants.black)
+        self.screen.fill(Constants.blue, pygame.Rect(
+            screen_width // 4, screen_height // 2, int(screen_width // 2 * progress), 10))
+        self.present()
+        pygame.event.pump()
+
     def load(self, image_path: str, width: int, height:int) -> SpriteImage:
         return SpriteImage(self.__load_image(image_path, width, height), self, image_path)
 
@@ -245,11 +550,15 @@ class Canvas(BasicCanvas):
 
 
 class Font:
+    # Looking system fonts up is slow: one font per size for the whole game
+    fonts: Dict[int, pygame.font.Font] = {}
+
     def __init__(self, screen: BasicCanvas, font_size: int):
         super().__init__()
         self.screen = screen
-        self.font:  pygame.font.Font = \
-            pygame.font.SysFont(Constants.PREFERRED_FONT, font_size)
+        if font_size not in Font.fonts:
+            Font.fonts[font_size] = pygame.font.SysFont(Constants.PREFERRED_FONT, font_size)
+        self.font:  pygame.font.Font = Font.fonts[font_size]
     
     def render_font(self, message: str, color: Tuple[int, int, int]) -> SpriteImage:
         font_image: pygame.Surface =  self.font.render(message, False, color)
@@ -0,0 +1,186 @@
+"""
+Record the inputs of a game session in a compact binary file and read them back
+so that the session can be replayed deterministically
+
+File layout (little endian):
+    header:  magic 'CCIR', version u16, hash interval u16,
+             screen width u16, screen height u16, number of levels u16,
+             physics u8 (1: fixed point),
+             then for each level its utf-8 name prefixed by its length (u16)
+    records: tick u32, kind u8 and a payload depending on the kind
+"""
+from __future__ import annotations
+from typing import BinaryIO, Dict, List, Tuple
+import collections
+import struct
+import pygame
+from infrastructure.gui_library import Events
+
+class RecordKind:
+    """
+    Kinds of records and their payload
+    """
+    QUIT: int = 0
+    KEY_DOWN: int = 1
+    KEY_UP: int = 2
+    MOUSE_MOTION: int = 3
+    MOUSE_BUTTON_DOWN: int = 4
+    # 5 was the player timeout of version 1
+    STATE_HASH: int = 6
+    END: int = 7
+    WALL_OF_FAME: int = 8
+
+    PAYLOADS: Dict[int, struct.Struct] = {
+        QUIT: struct.Struct('<'),
+        KEY_DOWN: struct.Struct('<i'),
+        KEY_UP: struct.Struct('<i'),
+        MOUSE_MOTION: struct.Struct('<hh'),
+        MOUSE_BUTTON_DOWN: struct.Struct('<Bhh'),
+        STATE_HASH: struct.Struct('<Q'),
+        END: struct.Struct('<'),
+        WALL_OF_FAME: struct.Struct('<?'),
+    }
+
+    EVENT_TYPES: Dict[int, int] = {
+        pygame.QUIT: QUIT,
+        pygame.KEYDOWN: KEY_DOWN,
+        pygame.KEYUP: KEY_UP,
+        pygame.MOUSEMOTION: MOUSE_MOTION,
+        pygame.MOUSEBUTTONDOWN: MOUSE_BUTTON_DOWN,
+    }
+
+MAGIC: bytes = b'CCIR'
+VERSION: int = 4
+HEADER: struct.Struct = struct.Struct('<4sHHHHHB')
+LEVEL_NAME_LENGTH: struct.Struct = struct.Struct('<H')
+RECORD: struct.Struct = struct.Struct('<IB')
+
+class InputRecorder:
+    """
+    Write the inputs dispatched at each tick
+    """
+    def __init__(self, file_name: str, hash_interval: int,
+                 screen_size: Tuple[int, int], game_list: List[str], fixed_point: bool = False):
+        self.file: BinaryIO = open(file_name, 'wb') # pylint: disable=consider-using-with
+        self.last_tick: int = 0
+        self.hash_interval: int = hash_interval
+        self.fixed_point: bool = fixed_point
+        screen_width, screen_height = screen_size
+        self.file.write(HEADER.pack(MAGIC, VERSION, hash_interval,
+                                    screen_width, screen_height, len(game_list), fixed_point))
+        for game_name in game_list:
+            encoded_name: bytes = game_name.encode('utf-8')
+            self.file.write(LEVEL_NAME_LENGTH.pack(len(encoded_name)) + encoded_name)
+
+    def __write(self, tick: int, kind: int, *payload) -> None:
+        self.last_tick = tick
+        self.file.write(RECORD.pack(tick, kind) + RecordKind.PAYLOADS[kind].pack(*payload))
+
+    def record_event(self, tick: int, event: pygame.event.Event) -> None:
+        """
+        Keep the events the game reacts to, ignore the others
+        """
+        kind: int = RecordKind.EVENT_TYPES.get(event.type, -1)
+        if kind in (RecordKind.KEY_DOWN, RecordKind.KEY_UP):
+            self.__write(tick, kind, event.key)
+        elif kind == RecordKind.MOUSE_MOTION:
+            self.__write(tick, kind, *event.pos)
+        elif kind == RecordKind.MOUSE_BUTTON_DOWN:
+            self.__write(tick, kind, event.button, *event.pos)
+        elif kind == RecordKind.QUIT:
+            self.__write(tick, kind)
+
+    def record_wall_of_fame(self, tick: int, is_wall_of_fame: bool) -> None:
+        """
+        The wall of fame depends on the scores saved before: recorded as an input
+        """
+        self.__write(tick, RecordKind.WALL_OF_FAME, is_wall_of_fame)
+
+    def record_state_hash(self, tick: int, state_hash: int) -> None:
+        """
+        Hash of the game state used to verify the replay
+        """
+        self.__write(tick, RecordKind.STATE_HASH, state_hash)
+
+    def close(self, last_tick: int) -> None:
+        """
+        Mark the end of the session
+        """
+        if self.file.closed:
+            return
+        self.__write(max(last_tick, self.last_tick), RecordKind.END)
+        self.file.close()
+
+class InputLog:
+    """
+    Content of a recorded session
+    """
+    def __init__(self, file_name: str):
+        with open(file_name, 'rb') as file:
+            data: bytes = file.read()
+        magic, version, self.hash_interval, screen_width, screen_height, \
+            number_levels, physics = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{file_name} is not a recording this version can replay')
+        self.screen_size: Tuple[int, int] = (screen_width, screen_height)
+        self.fixed_point: bool = physics == 1
+        offset: int = HEADER.size
+        self.game_list: List[str] = []
+        for _ in range(number_levels):
+            (length,) = LEVEL_NAME_LENGTH.unpack_from(data, offset)
+            offset += LEVEL_NAME_LENGTH.size
+            self.game_list.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+
+        self.events: Dict[int, List[pygame.event.Event]] = {}
+        self.wall_of_fames: Dict[int, bool] = {}
+        self.state_hashes: Dict[int, int] = {}
+        self.last_tick: int = 0
+        while offset < len(data):
+            tick, kind = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            payload: Tuple = RecordKind.PAYLOADS[kind].unpack_from(data, offset)
+            offset += RecordKind.PAYLOADS[kind].size
+            self.last_tick = tick
+            if kind == RecordKind.STATE_HASH:
+                self.state_hashes[tick] = payload[0]
+            elif kind == RecordKind.WALL_OF_FAME:
+                self.wall_of_fames[tick] = payload[0]
+            elif kind != RecordKind.END:
+                self.events.setdefault(tick, []).append(self.__to_event(kind, payload))
+
+    @staticmethod
+    def __to_event(kind: int, payload: Tuple) -> pygame.event.Event:
+        """
+        Rebuild the pygame event
+        """
+        if kind == RecordKind.KEY_DOWN:
+            return pygame.event.Event(pygame.KEYDOWN, key=payload[0])
+        if kind == RecordKind.KEY_UP:
+            return pygame.event.Event(pygame.KEYUP, key=payload[0])
+        if kind == RecordKind.MOUSE_MOTION:
+            return pygame.event.Event(pygame.MOUSEMOTION, pos=payload)
+        if kind == RecordKind.MOUSE_BUTTON_DOWN:
+            return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=payload[0], pos=payload[1:])
+        return pygame.event.Event(pygame.QUIT)
+
+class ReplayEvents(Events):
+    """
+    Events coming from a recorded session instead of pygame
+    """
+    def __init__(self, input_log: InputLog):
+        super().__init__()
+        self.input_log: InputLog = input_log
+
+    def set_tick(self, tick: int) -> None:
+        """
+        Queue the events recorded for this tick
+        """
+        self.event_list = collections.deque(self.input_log.events.get(tick, ()))
+
+    def has_more_events(self) -> bool:
+        if len(self.event_list) > 0:
+            self.current_event = self.event_list.popleft()
+        else:
+            self.current_event = None
+        return self.current_event is not None
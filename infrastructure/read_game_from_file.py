@@ -1,8 +1,12 @@
 """
 Infrastructure access to read a game
 """
-from typing import List
+from __future__ import annotations
+from typing import BinaryIO, List, Set
+import os.path
+import tempfile
 from services.bricks_creator_service import  ReadGame
+from infrastructure.asset_pack import AssetPack
 
 class ReadGameFromFile(ReadGame): # pylint: disable=too-few-public-methods
     """
@@ -12,8 +16,94 @@ class ReadGameFromFile(ReadGame): # pylint: disable=too-few-public-methods
     SUFFIX: str = '.txt'
     def read_game(self) -> List[str]:
         """
-        Read the game
+        Read the game, from the asset pack when it is mounted
         """
         filename: str = self.DIRECTORY + self.game_name + self.SUFFIX
-        with open(filename, encoding="utf-8") as file:
-            return file.readlines()
+        return AssetPack.read_lines(filename)
+
+class LevelChunkFile:
+    """
+    Random access to a level file on disk by chunks of chunk_columns columns:
+    only the offset of each row is kept in memory, a chunk is read with one
+    seek per row. A chunk saved with save_chunk is read back from a temporary
+    file with the same layout (one character per cell), never from the level.
+    """
+    EMPTY: bytes = b' '
+    # Bricks which must be destroyed to win the level
+    BREAKABLE: bytes = b'0123456789'
+
+    def __init__(self, file_name: str, chunk_columns: int):
+        self.file: BinaryIO = open(file_name, 'rb') # pylint: disable=consider-using-with
+        self.row_offsets: List[int] = []
+        self.row_lengths: List[int] = []
+        self.number_breakable_bricks: int = 0
+        offset: int = 0
+        for line in self.file:
+            row: bytes = line.rstrip(b'\r\n')
+            self.row_offsets.append(offset)
+            self.row_lengths.append(len(row))
+            self.number_breakable_bricks += self.count_breakable(row)
+            offset += len(line)
+        self.rows: int = len(self.row_offsets)
+        self.columns: int = max(self.row_lengths, default=0)
+        self.chunk_columns: int = chunk_columns
+        self.number_chunks: int = -(-self.columns // chunk_columns)
+        self.state_file: BinaryIO = tempfile.TemporaryFile()
+        self.saved_chunks: Set[int] = set()
+
+    @staticmethod
+    def get_number_columns(game_name: str) -> int:
+        """
+        Width of the first row of a level on disk, 0 when it is not on disk
+        """
+        file_name: str = ReadGameFromFile.DIRECTORY + game_name + ReadGameFromFile.SUFFIX
+        if not os.path.isfile(file_name):
+            return 0
+        with open(file_name, 'rb') as file:
+            return len(file.readline().rstrip(b'\r\n'))
+
+    @staticmethod
+    def open_level(game_name: str, chunk_columns: int) -> LevelChunkFile:
+        """
+        The level game_name, as ReadGameFromFile would find it on disk
+        """
+        return LevelChunkFile(ReadGameFromFile.DIRECTORY + game_name + ReadGameFromFile.SUFFIX,
+                              chunk_columns)
+
+    @classmethod
+    def count_breakable(cls, cells: bytes) -> int:
+        """
+        Number of breakable bricks in cells
+        """
+        return len(cells) - len(cells.translate(None, cls.BREAKABLE))
+
+    def read_chunk(self, chunk: int) -> List[str]:
+        """
+        Rows of the chunk, padded with empty cells, each ending with a new line
+        """
+        if chunk in self.saved_chunks:
+            self.state_file.seek(chunk * self.rows * self.chunk_columns)
+            state: bytes = self.state_file.read(self.rows * self.chunk_columns)
+            return [state[row:row + self.chunk_columns].decode('latin-1') + '\n'
+                    for row in range(0, len(state), self.chunk_columns)]
+        first_column: int = chunk * self.chunk_columns
+        rows: List[str] = []
+        for offset, length in zip(self.row_offsets, self.row_lengths):
+            cells: bytes = b''
+            if first_column < length:
+                self.file.seek(offset + first_column)
+                cells = self.file.read(min(self.chunk_columns, length - first_column))
+            rows.append(cells.ljust(self.chunk_columns, self.EMPTY).decode('latin-1') + '\n')
+        return rows
+
+    def save_chunk(self, chunk: int, rows: List[str]) -> None:
+        """
+        State of an evicted chunk, rows as read_chunk returns them
+        """
+        self.state_file.seek(chunk * self.rows * self.chunk_columns)
+        self.state_file.write(''.join(row.rstrip('\n') for row in rows).encode('latin-1'))
+        self.saved_chunks.add(chunk)
+
+    def close(self) -> None:
+        self.file.close()
+        self.state_file.close()
@@ -0,0 +1,253 @@
+"""
+Stream of the state of a board, for clients, spectators and archives:
+only what changed is written at each tick, a keyframe with everything
+is written periodically and when a level starts so that the stream can be
+read from any keyframe.
+
+Integers are varints (LEB128), signed values are zigzag encoded first.
+Each frame is prefixed by its length (varint), then its kind (u8):
+    keyframe: tick, game index, then each field of BoardState.FIELDS,
+              number of bricks, then runs of bricks with the same remaining
+              bumps: run length, remaining bumps (u8, 255 for unbreakable)
+    delta:    tick increment, mask of the fields which changed (bit i for
+              BoardState.FIELDS[i]), their increments, number of bricks
+              which changed, then for each of them, by increasing index,
+              its index increment and its remaining bumps (u8)
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+
+class FrameKind:
+    """
+    First byte of a frame
+    """
+    KEYFRAME: int = 0
+    DELTA: int = 1
+
+@dataclass(slots=True)
+class BoardState:
+    """
+    Everything a client needs to draw a board. Positions are in pixels.
+    """
+    FIELDS = ('ball_x', 'ball_y', 'paddle_x', 'score', 'remaining_balls',
+              'game_state', 'input_sequence')
+
+    tick: int = 0
+    game_index: int = 0
+    ball_x: int = 0
+    ball_y: int = 0
+    paddle_x: int = 0
+    score: int = 0
+    remaining_balls: int = 0
+    game_state: int = 0
+    # Sequence of the last input of the client applied to the board
+    input_sequence: int = 0
+    bricks: bytearray = field(default_factory=bytearray)
+
+    def get_fields(self) -> Tuple[int, ...]:
+        """
+        Values of FIELDS
+        """
+        return (self.ball_x, self.ball_y, self.paddle_x, self.score, self.remaining_balls,
+                self.game_state, self.input_sequence)
+
+    def set_fields(self, values: Iterable[int]) -> None:
+        """
+        Reverse of get_fields
+        """
+        self.ball_x, self.ball_y, self.paddle_x, self.score, self.remaining_balls, \
+            self.game_state, self.input_sequence = values
+
+def write_varint(out: bytearray, value: int) -> None:
+    """
+    Unsigned LEB128
+    """
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def write_signed(out: bytearray, value: int) -> None:
+    """
+    Zigzag: small negative values are small varints as well
+    """
+    write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """
+    Value and offset after it
+    """
+    value: int = 0
+    shift: int = 0
+    while True:
+        byte: int = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def read_signed(data: bytes, offset: int) -> Tuple[int, int]:
+    """
+    Reverse of write_signed
+    """
+    value, offset = read_varint(data, offset)
+    return (value >> 1) ^ -(value & 1), offset
+
+def split_frames(data: bytes) -> List[bytes]:
+    """
+    Frames of a stream read from a file
+    """
+    frames: List[bytes] = []
+    offset: int = 0
+    while offset < len(data):
+        length, offset = read_varint(data, offset)
+        frames.append(data[offset:offset + length])
+        offset += length
+    return frames
+
+class StateEncoder:
+    """
+    Encode the state of a board after each tick
+    """
+    # Ticks between two keyframes: 5 s at 80 ticks per second
+    KEYFRAME_INTERVAL: int = 400
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.keyframe_interval: int = keyframe_interval
+        self.last_keyframe_tick: int = None
+        self.tick: int = 0
+        self.game_index: int = 0
+        self.number_bricks: int = 0
+        self.fields: Tuple[int, ...] = ()
+
+    def encode(self, state: BoardState, changed_bricks: Iterable[int],
+               keyframe: bool = False) -> bytes:
+        """
+        Frame with its length prefix. changed_bricks are the indexes of the
+        bricks which may have changed since the last frame. keyframe forces
+        a keyframe, when the bricks were created again for instance.
+        """
+        out: bytearray = bytearray()
+        if keyframe or self.last_keyframe_tick is None or \
+           state.tick - self.last_keyframe_tick >= self.keyframe_interval or \
+           state.game_index != self.game_index or len(state.bricks) != self.number_bricks:
+            self.__write_keyframe(out, state)
+        else:
+            self.__write_delta(out, state, changed_bricks)
+        self.tick = state.tick
+        self.fields = state.get_fields()
+        prefix: bytearray = bytearray()
+        write_varint(prefix, len(out))
+        return bytes(prefix + out)
+
+    def __write_keyframe(self, out: bytearray, state: BoardState) -> None:
+        """
+        Everything, bricks run length encoded
+        """
+        self.last_keyframe_tick = state.tick
+        self.game_index = state.game_index
+        self.number_bricks = len(state.bricks)
+        out.append(FrameKind.KEYFRAME)
+        write_varint(out, state.tick)
+        write_varint(out, state.game_index)
+        for value in state.get_fields():
+            write_signed(out, value)
+        write_varint(out, len(state.bricks))
+        bricks: bytearray = state.bricks
+        start: int = 0
+        while start < len(bricks):
+            end: int = start + 1
+            while end < len(bricks) and bricks[end] == bricks[start]:
+                end += 1
+            write_varint(out, end - start)
+            out.append(bricks[start])
+            start = end
+
+    def __write_delta(self, out: bytearray, state: BoardState,
+                      changed_bricks: Iterable[int]) -> None:
+        """
+        Only what changed since the last frame
+        """
+        out.append(FrameKind.DELTA)
+        write_varint(out, state.tick - self.tick)
+        fields: Tuple[int, ...] = state.get_fields()
+        mask: int = 0
+        for index, (value, previous) in enumerate(zip(fields, self.fields)):
+            if value != previous:
+                mask |= 1 << index
+        out.append(mask)
+        for value, previous in zip(fields, self.fields):
+            if value != previous:
+                write_signed(out, value - previous)
+        indexes: List[int] = sorted(set(changed_bricks))
+        write_varint(out, len(indexes))
+        previous_index: int = 0
+        for index in indexes:
+            write_varint(out, index - previous_index)
+            out.append(state.bricks[index])
+            previous_index = index
+
+class StateDecoder:
+    """
+    Rebuild the state of a board from its frames. Frames are ignored
+    until the first keyframe.
+    """
+    def __init__(self):
+        self.state: BoardState = None
+        # Bricks which changed in the last frame decoded, all of them after a keyframe
+        self.changed_bricks: List[int] = []
+
+    def decode(self, frame: bytes) -> BoardState:
+        """
+        frame without its length prefix. The state is updated in place,
+        None until a keyframe was decoded.
+        """
+        if frame[0] == FrameKind.KEYFRAME:
+            self.__read_keyframe(frame)
+        elif frame[0] == FrameKind.DELTA:
+            if self.state is not None:
+                self.__read_delta(frame)
+        else:
+            raise ValueError(f'Unknown frame kind {frame[0]}')
+        return self.state
+
+    def __read_keyframe(self, frame: bytes) -> None:
+        state: BoardState = BoardState()
+        state.tick, offset = read_varint(frame, 1)
+        state.game_index, offset = read_varint(frame, offset)
+        values: List[int] = []
+        for _ in BoardState.FIELDS:
+            value, offset = read_signed(frame, offset)
+            values.append(value)
+        state.set_fields(values)
+        number_bricks, offset = read_varint(frame, offset)
+        while len(state.bricks) < number_bricks:
+            run, offset = read_varint(frame, offset)
+            state.bricks.extend(bytes((frame[offset],)) * run)
+            offset += 1
+        self.state = state
+        self.changed_bricks = list(range(number_bricks))
+
+    def __read_delta(self, frame: bytes) -> None:
+        state: BoardState = self.state
+        increment, offset = read_varint(frame, 1)
+        state.tick += increment
+        mask: int = frame[offset]
+        offset += 1
+        values: List[int] = list(state.get_fields())
+        for index in range(len(values)):
+            if mask & (1 << index):
+                increment, offset = read_signed(frame, offset)
+                values[index] += increment
+        state.set_fields(values)
+        number_changes, offset = read_varint(frame, offset)
+        self.changed_bricks = []
+        index: int = 0
+        for _ in range(number_changes):
+            increment, offset = read_varint(frame, offset)
+            index += increment
+            state.bricks[index] = frame[offset]
+            offset += 1
+            self.changed_bricks.append(index)
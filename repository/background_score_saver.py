@@ -0,0 +1,107 @@
+"""
+Move score persistence out of the game loop
+"""
+from typing import Callable, List, Tuple
+import queue
+import threading
+from domain.user_panel_interface.score_handler import ScoreSaver
+
+class BackgroundScoreSaver(ScoreSaver):
+    """
+    Decorates another ScoreSaver: writes are queued in a bounded queue and
+    executed by a writer thread so that a slow disk never stalls a frame.
+    Loading waits for pending writes to be done first.
+    """
+    def __init__(self, score_saver: ScoreSaver, max_pending_writes: int = 32):
+        self.score_saver: ScoreSaver = score_saver
+        self.pending_writes: queue.Queue = queue.Queue(max_pending_writes)
+        self.writer: threading.Thread = threading.Thread(
+            target=self.__write_loop, name='score-writer', daemon=True)
+        self.writer.start()
+        # Savers keeping the best scores in memory load them out of the game loop
+        self.__enqueue(lambda: self.score_saver.top_scores(1))
+
+    def __write_loop(self) -> None:
+        """
+        Body of the writer thread, None stops it
+        """
+        while True:
+            write: Callable[[], None] = self.pending_writes.get()
+            try:
+                if write is None:
+                    return
+                write()
+            except OSError as error:
+                print(f'ERROR: Could not save scores: {error}')
+            finally:
+                self.pending_writes.task_done()
+
+    def __enqueue(self, write: Callable[[], None]) -> None:
+        """
+        Only blocks the caller when the queue is full: the write is then done
+        synchronously as a last resort instead of being lost
+        """
+        if not self.writer.is_alive():
+            write()
+            return
+        try:
+            self.pending_writes.put_nowait(write)
+        except queue.Full:
+            print('ERROR: Too many pending score writes, saving synchronously')
+            write()
+
+    def save_scores(self, score_list: List[Tuple[str, int]]) -> None:
+        """
+        Queue the save of all the scores
+        """
+        score_list_copy: List[Tuple[str, int]] = list(score_list)
+        self.__enqueue(lambda: self.score_saver.save_scores(score_list_copy))
+
+    def append_score(self, user_name: str, score: int,
+                     score_list: List[Tuple[str, int]], level: str = None) -> None:
+        """
+        Queue the save of one new score
+        """
+        score_list_copy: List[Tuple[str, int]] = list(score_list)
+        self.__enqueue(lambda: self.score_saver.append_score(
+            user_name, score, score_list_copy, level))
+
+    def flush(self) -> None:
+        """
+        Wait until all queued writes are done
+        """
+        if self.writer.is_alive():
+            self.pending_writes.join()
+
+    def load_scores(self) -> List[Tuple[str, int]]:
+        """
+        Load after pending writes are on disk
+        """
+        self.flush()
+        return self.score_saver.load_scores()
+
+    def rank_of(self, score: int, at_most: int = None, level: str = None,
+                day: str = None) -> int:
+        """
+        Queries do not wait for pending writes: they must stay cheap
+        enough to be called from the game loop (give at_most)
+        """
+        return self.score_saver.rank_of(score, at_most, level, day)
+
+    def top_scores(self, count: int, level: str = None,
+                   day: str = None) -> List[Tuple[str, int]]:
+        """
+        See rank_of
+        """
+        return self.score_saver.top_scores(count, level, day)
+
+    def close(self) -> None:
+        """
+        Flush and stop the writer thread
+        """
+        if self.writer.is_alive():
+            # The wrapped saver may hold resources owned by the writer thread
+            self.pending_writes.put(self.score_saver.close)
+            self.pending_writes.put(None)
+            self.writer.join()
+        self.score_saver.close()
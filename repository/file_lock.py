@@ -0,0 +1,56 @@
+"""
+Inter process lock based on a lock file so that several game
+processes can share the same storage
+"""
+from __future__ import annotations
+import os
+try:
+    import fcntl
+except ImportError: # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """
+    Advisory lock held on a dedicated lock file.
+    Use it as a context manager:
+        with FileLock('scores.txt.lock'):
+            ...
+    Shared locks are only available with fcntl, on other platforms
+    every lock is exclusive.
+    """
+    def __init__(self, lock_file_name: str, shared: bool = False):
+        self.lock_file_name: str = lock_file_name
+        self.shared: bool = shared
+        self.file_descriptor: int = -1
+
+    def acquire(self) -> FileLock:
+        """
+        Block until the lock is granted
+        """
+        self.file_descriptor = os.open(self.lock_file_name, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self.file_descriptor, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.file_descriptor, msvcrt.LK_LOCK, 1)
+        return self
+
+    def release(self) -> None:
+        """
+        Give the lock back
+        """
+        if self.file_descriptor < 0:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.file_descriptor, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.file_descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(self.file_descriptor, msvcrt.LK_UNLCK, 1)
+        os.close(self.file_descriptor)
+        self.file_descriptor = -1
+
+    def __enter__(self) -> FileLock:
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
@@ -2,8 +2,10 @@
 Repository to access scores (save / load)
 """
 from typing import List, Tuple
-from domain.user_panel_interface.score_handler import ScoreSaver
+import os
 import os.path
+from domain.user_panel_interface.score_handler import ScoreSaver
+from repository.file_lock import FileLock
 
 class FileScoreSaver(ScoreSaver):
     """
@@ -12,22 +14,183 @@ class FileScoreSaver(ScoreSaver):
     def __init__(self, file_name: str = 'wall_scores.txt'):
         self.file_name: str = file_name
 
+    @staticmethod
+    def format_score(user_name: str, score: int) -> str:
+        """
+        One line of the score file
+        """
+        return user_name + ',' + str(score) + '\n'
+
+    @staticmethod
+    def parse_scores(lines: List[str]) -> List[Tuple[str, int]]:
+        """
+        Parse lines of the score file, lines which are incomplete
+        (crash while writing) are ignored
+        """
+        scores: List[Tuple[str, int]] = []
+        for user_name_score in lines:
+            if not user_name_score.endswith('\n'):
+                continue
+            user_name, _, score_str = user_name_score[:-1].rpartition(',')
+            try:
+                scores.append((user_name, int(score_str)))
+            except ValueError:
+                print(f'ERROR: Ignoring corrupted score line {user_name_score!r}')
+        return scores
+
     def save_scores(self, score_list: List[Tuple[str, int]]) -> None:
         """
-        Save the scores on file system
+        Save the scores on file system: the content is written in a temporary
+        file first and then moved over the previous one so that a crash can
+        never leave a half written file behind
+        """
+        self.write_lines([self.format_score(user_name, score)
+                          for user_name, score in score_list])
+
+    def write_lines(self, lines: List[str]) -> None:
+        """
+        Replace the content of the score file atomically
         """
-        with open(self.file_name, 'w', encoding="utf-8") as file:
-            for user_name,score in score_list:
-                file.write(user_name + ',' + str(score) + '\n')
+        temporary_file_name: str = self.file_name + '.tmp'
+        with open(temporary_file_name, 'w', encoding="utf-8") as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_file_name, self.file_name)
 
     def load_scores(self) -> List[Tuple[str, int]]:
         """
         Load scores from the file system
         """
-        scores: List[Tuple[str, int]] = []
         if os.path.isfile(self.file_name):
             with open(self.file_name, 'r', encoding="utf-8") as file:
-                for user_name_score in file.readlines():
-                    user_name, score_str = user_name_score.split(',')
-                    scores.append((user_name, int(score_str)))
+                return self.parse_scores(file.readlines())
+        return []
+
+class JournaledFileScoreSaver(FileScoreSaver):
+    """
+    New scores are appended to a journal instead of rewriting the whole file.
+    The journal is merged into the score file (compaction) once it grows
+    above compact_size bytes. All accesses are protected by a lock file so
+    that several game processes can share the same scores.
+    Each journal line starts with an increasing id and the score file starts
+    with the id of the last line merged into it (MERGED_PREFIX): the score
+    file is replaced before the journal is emptied, after a crash between
+    both steps the lines already merged are not replayed a second time.
+    The wall of fames is kept in memory, loaded on first use and updated by
+    each load and write of this process: afterwards rank_of and top_scores
+    never touch the disk nor wait for the lock (see BackgroundScoreSaver,
+    which loads it out of the game loop).
+    """
+    MERGED_PREFIX: str = '#'
+
+    def __init__(self, file_name: str = 'wall_scores.txt',
+                 max_scores: int = 10, compact_size: int = 4096):
+        super().__init__(file_name)
+        self.journal_file_name: str = file_name + '.journal'
+        self.lock_file_name: str = file_name + '.lock'
+        self.max_scores: int = max_scores
+        self.compact_size: int = compact_size
+        # Replaced, never modified: read by the game loop, written by the writer thread
+        self.wall_of_fames: List[Tuple[str, int]] = None
+
+    @staticmethod
+    def __read_lines(file_name: str) -> List[str]:
+        if os.path.isfile(file_name):
+            with open(file_name, 'r', encoding="utf-8") as file:
+                return file.readlines()
+        return []
+
+    def __read_all(self) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Score file followed by the journal lines not merged yet, best scores
+        first, and the id of the last journal line
+        """
+        lines: List[str] = self.__read_lines(self.file_name)
+        last_id: int = 0
+        if len(lines) > 0 and lines[0].startswith(self.MERGED_PREFIX):
+            last_id = int(lines.pop(0)[len(self.MERGED_PREFIX):])
+        merged_id: int = last_id
+        scores: List[Tuple[str, int]] = self.parse_scores(lines)
+        for line in self.__read_lines(self.journal_file_name):
+            line_id, _, score_line = line.partition(' ')
+            if not line_id.isdigit():
+                # Written before the journal had ids
+                scores.extend(self.parse_scores([line]))
+            elif int(line_id) > merged_id:
+                scores.extend(self.parse_scores([score_line]))
+                last_id = max(last_id, int(line_id))
+        # sorted() is stable: on equal scores the oldest entry stays first
+        return sorted(scores, key=lambda user_name_score: -user_name_score[1])[0:self.max_scores], \
+               last_id
+
+    def __replace(self, score_list: List[Tuple[str, int]], last_id: int) -> None:
+        """
+        Must be called with the exclusive lock held: the score file is
+        replaced (atomically) before the journal is emptied
+        """
+        self.write_lines([f'{self.MERGED_PREFIX}{last_id}\n'] +
+                         [self.format_score(user_name, score) for user_name, score in score_list])
+        with open(self.journal_file_name, 'w', encoding="utf-8"):
+            pass
+
+    def save_scores(self, score_list: List[Tuple[str, int]]) -> None:
+        """
+        Replace all the scores
+        """
+        with FileLock(self.lock_file_name):
+            _, last_id = self.__read_all()
+            self.__replace(score_list, last_id)
+        self.wall_of_fames = list(score_list[0:self.max_scores])
+
+    def append_score(self, user_name: str, score: int,
+                     score_list: List[Tuple[str, int]], level: str = None) -> None:
+        """
+        Append one line to the journal, compact when the journal is too big
+        """
+        with FileLock(self.lock_file_name):
+            scores, last_id = self.__read_all()
+            with open(self.journal_file_name, 'a', encoding="utf-8") as file:
+                file.write(f'{last_id + 1} ' + self.format_score(user_name, score))
+                file.flush()
+                os.fsync(file.fileno())
+                journal_size: int = file.tell()
+            if journal_size > self.compact_size:
+                self.__replace(*self.__read_all())
+        # sorted() is stable: the new score comes after the equal ones
+        self.wall_of_fames = sorted(scores + [(user_name, score)],
+                                    key=lambda user_name_score: -user_name_score[1]) \
+                             [0:self.max_scores]
+
+    def load_scores(self) -> List[Tuple[str, int]]:
+        """
+        Load the score file and replay the journal
+        """
+        with FileLock(self.lock_file_name, shared=True):
+            scores, _ = self.__read_all()
+        self.wall_of_fames = list(scores)
         return scores
+
+    def rank_of(self, score: int, at_most: int = None, level: str = None,
+                day: str = None) -> int:
+        """
+        From the wall of fames in memory: only max_scores scores are kept
+        """
+        if level is not None or day is not None:
+            return super().rank_of(score, at_most, level, day)
+        rank: int = len([saved_score for _, saved_score in self.__get_wall_of_fames()
+                         if saved_score > score])
+        return rank if at_most is None else min(rank, at_most)
+
+    def top_scores(self, count: int, level: str = None,
+                   day: str = None) -> List[Tuple[str, int]]:
+        """
+        From the wall of fames in memory
+        """
+        if level is not None or day is not None:
+            return super().top_scores(count, level, day)
+        return self.__get_wall_of_fames()[0:count]
+
+    def __get_wall_of_fames(self) -> List[Tuple[str, int]]:
+        wall_of_fames: List[Tuple[str, int]] = self.wall_of_fames
+        return wall_of_fames if wall_of_fames is not None else self.load_scores()
@@ -0,0 +1,165 @@
+"""
+Leaderboard keeping every score ever played in a SQLite database
+"""
+from typing import Iterable, List, Tuple
+from datetime import date
+import sqlite3
+import threading
+from domain.user_panel_interface.score_handler import ScoreSaver
+
+class SqliteScoreSaver(ScoreSaver):
+    """
+    Every score is a row, the B-tree indexes give O(log n) inserts,
+    top-k reads walking the index from its best end, and rank queries
+    whose cost is bounded by the requested rank (at_most).
+    Each thread gets its own connection: the database can be shared by
+    the background writer, the game loop and several game processes.
+    """
+    SCHEMA: List[str] = [
+        'CREATE TABLE IF NOT EXISTS scores ('
+        ' id INTEGER PRIMARY KEY,'
+        ' user_name TEXT NOT NULL,'
+        ' score INTEGER NOT NULL,'
+        ' level TEXT,'
+        ' played_on TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS scores_by_score ON scores(score DESC)',
+        'CREATE INDEX IF NOT EXISTS scores_by_level ON scores(level, score DESC)',
+        'CREATE INDEX IF NOT EXISTS scores_by_day ON scores(played_on, score DESC)',
+    ]
+    IMPORTED_VERSION: int = 1
+
+    def __init__(self, database_name: str = 'scores.db', max_scores: int = 10,
+                 import_from: ScoreSaver = None):
+        self.database_name: str = database_name
+        self.max_scores: int = max_scores
+        self.connections: threading.local = threading.local()
+        connection: sqlite3.Connection = self.__get_connection()
+        with connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+        # user_version tells the import was done, even when nothing was imported
+        if import_from is not None and \
+           connection.execute('PRAGMA user_version').fetchone()[0] < self.IMPORTED_VERSION:
+            if self.__count() == 0:
+                self.import_scores((user_name, score, None, None) \
+                                   for user_name, score in import_from.load_scores())
+            with connection:
+                connection.execute(f'PRAGMA user_version = {self.IMPORTED_VERSION}')
+
+    def __get_connection(self) -> sqlite3.Connection:
+        """
+        One connection per thread, created on first use
+        """
+        connection: sqlite3.Connection = getattr(self.connections, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_name, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.connections.connection = connection
+        return connection
+
+    def __count(self) -> int:
+        return self.__get_connection().execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+
+    @staticmethod
+    def __where(level: str, day: str) -> Tuple[str, List[str]]:
+        """
+        Filter matching the per level / per day indexes
+        """
+        conditions: List[str] = []
+        parameters: List[str] = []
+        if level is not None:
+            conditions.append('level = ?')
+            parameters.append(level)
+        if day is not None:
+            conditions.append('played_on = ?')
+            parameters.append(day)
+        return ' AND '.join(conditions), parameters
+
+    def import_scores(self, scores: Iterable[Tuple[str, int, str, str]],
+                      batch_size: int = 10000) -> int:
+        """
+        Batched import of (user_name, score, level, day) tuples, day being
+        YYYY-MM-DD or None for today. Return the number of imported rows
+        """
+        today: str = date.today().isoformat()
+        connection: sqlite3.Connection = self.__get_connection()
+        imported: int = 0
+        batch: List[Tuple[str, int, str, str]] = []
+        for user_name, score, level, day in scores:
+            batch.append((user_name, score, level, day if day is not None else today))
+            if len(batch) >= batch_size:
+                with connection:
+                    connection.executemany('INSERT INTO scores(user_name, score, level, played_on)'
+                                           ' VALUES (?, ?, ?, ?)', batch)
+                imported += len(batch)
+                batch = []
+        if len(batch) > 0:
+            with connection:
+                connection.executemany('INSERT INTO scores(user_name, score, level, played_on)'
+                                       ' VALUES (?, ?, ?, ?)', batch)
+            imported += len(batch)
+        return imported
+
+    def save_scores(self, score_list: List[Tuple[str, int]]) -> None:
+        """
+        Replace all the scores
+        """
+        connection: sqlite3.Connection = self.__get_connection()
+        with connection:
+            connection.execute('DELETE FROM scores')
+        self.import_scores((user_name, score, None, None) for user_name, score in score_list)
+
+    def append_score(self, user_name: str, score: int,
+                     score_list: List[Tuple[str, int]], level: str = None) -> None:
+        """
+        Only the new score is inserted, score_list is not needed
+        """
+        connection: sqlite3.Connection = self.__get_connection()
+        with connection:
+            connection.execute('INSERT INTO scores(user_name, score, level, played_on)'
+                               ' VALUES (?, ?, ?, ?)',
+                               (user_name, score, level, date.today().isoformat()))
+
+    def load_scores(self) -> List[Tuple[str, int]]:
+        """
+        The wall of fame
+        """
+        return self.top_scores(self.max_scores)
+
+    def top_scores(self, count: int, level: str = None,
+                   day: str = None) -> List[Tuple[str, int]]:
+        """
+        Best scores overall, for a level and / or for a day
+        """
+        where, parameters = self.__where(level, day)
+        return self.__get_connection().execute(
+            'SELECT user_name, score FROM scores' + (' WHERE ' + where if where else '') +
+            ' ORDER BY score DESC, id LIMIT ?', parameters + [count]).fetchall()
+
+    def rank_of(self, score: int, at_most: int = None, level: str = None,
+                day: str = None) -> int:
+        """
+        Count better scores, stopping after at_most rows so that
+        "is this in the top 10" costs O(log n) whatever the table size.
+        Without at_most every better score is visited: O(rank), meant for
+        offline reports, not for the game loop.
+        """
+        where, parameters = self.__where(level, day)
+        query: str = 'SELECT 1 FROM scores WHERE ' + (where + ' AND ' if where else '') + \
+                     'score > ?'
+        parameters.append(score)
+        if at_most is not None:
+            query += ' LIMIT ?'
+            parameters.append(at_most)
+        return self.__get_connection().execute(
+            'SELECT COUNT(*) FROM (' + query + ')', parameters).fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the connection of the calling thread
+        """
+        connection: sqlite3.Connection = getattr(self.connections, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.connections.connection = None
@@ -1,27 +1,92 @@
 """
 Main Module
 """
+from typing import List, Tuple
+import os.path
 from domain.common import Common
+from domain.game_clock import GameClock
+from domain.user_panel_interface.score_handler import ScoreHandler
+from domain.user_panel_interface.score_handler import ScoreSaver
 from services.create_scene_service import CreateSceneService
+from services.startup_profiler import StartupProfiler
+from infrastructure.asset_pack import AssetPack
+from infrastructure.frame_scheduler import FrameScheduler
 from infrastructure.gui_library import Canvas
+from infrastructure.gui_library import SoundLibrary
+from infrastructure.input_recording import InputRecorder
+from repository.background_score_saver import BackgroundScoreSaver
+from repository.score_save import JournaledFileScoreSaver
 
-def start():
+GAME_LIST: List[str] = [Common.GAME_NAME + 'assets/levels/game2',
+                        Common.GAME_NAME + 'assets/levels/game3',
+                        Common.GAME_NAME + 'assets/levels/game1',
+                        Common.GAME_NAME + 'assets/levels/game1']
+# Where the scores are kept: every score in a SQLite leaderboard, or only
+# the wall of fames in a journaled text file
+SCORE_STORES: Tuple[str, ...] = ('sqlite', 'file')
+
+def start(record_file_name: str = None, hash_interval: int = 80,
+          snapshot_file_name: str = None, profiler: StartupProfiler = None,
+          render_size: Tuple[int, int] = (1000, 800), window_size: Tuple[int, int] = None,
+          smooth_scale: bool = False, frame_stats: bool = False, fixed_point: bool = False,
+          score_store: str = 'sqlite'):
     """
       Main function of the program
+      When record_file_name is given all inputs are recorded so that
+      the session can be replayed (see replay_service)
+      When snapshot_file_name is given the game resumes from this file
+      if it exists and is saved in it when leaving
+      The first frame is shown before anything else is loaded, sounds
+      are decoded in the background
+      Assets are read from the asset pack when it has been built
+      The game is drawn at render_size and scaled to window_size when given
+      Frames are only drawn at full rate while something moves on screen,
+      frame_stats prints the frame rate and CPU usage every second
+      fixed_point plays with integer physics, the recordings then replay
+      bit-identically on any machine
+      score_store is one of SCORE_STORES
     """
-    screen_width: int = 1000
-    screen_height: int = 800
-    screen: Canvas = Canvas('Candy Cat', screen_width, screen_height, Common.START_MUSIC)
+    if profiler is None:
+        profiler = StartupProfiler()
+    AssetPack.mount(Common.ASSET_PACK, Common.GAME_NAME)
+    screen_width, screen_height = render_size
+    screen: Canvas = Canvas('Candy Cat', screen_width, screen_height, Common.START_MUSIC,
+                            window_size, smooth_scale)
+    profiler.mark('display')
+    screen.show_progress(0)
+    profiler.mark('first paint')
+    SoundLibrary.preload(list(Common.SOUNDS))
 
+    recorder: InputRecorder = None
+    if record_file_name is not None:
+        recorder = InputRecorder(record_file_name, hash_interval,
+                                 screen.get_screen_size(), GAME_LIST, fixed_point)
+    # The scene creates the SQLite leaderboard by default
+    score_saver: ScoreSaver = None
+    if score_store == 'file':
+        score_saver = BackgroundScoreSaver(JournaledFileScoreSaver('scores.txt',
+                                                                   ScoreHandler.max_scores))
     create_scene_service: CreateSceneService = CreateSceneService(
-        [Common.GAME_NAME + 'assets/levels/game2',
-         Common.GAME_NAME + 'assets/levels/game3',
-         Common.GAME_NAME + 'assets/levels/game1',
-         Common.GAME_NAME + 'assets/levels/game1'],screen)
+        GAME_LIST, screen, recorder, score_saver=score_saver, clock=GameClock(),
+        fixed_point=fixed_point)
+    profiler.mark('first level')
+    screen.show_progress(1)
+    if snapshot_file_name is not None and os.path.isfile(snapshot_file_name):
+        with open(snapshot_file_name, 'rb') as file:
+            create_scene_service.restore_snapshot(file.read())
 
 
+    frame_scheduler: FrameScheduler = FrameScheduler(report=frame_stats)
     while not create_scene_service.is_done():
         create_scene_service.update_game_scene()
 
-        screen.refresh()
+        if create_scene_service.has_new_frame():
+            screen.present()
+        frame_scheduler.wait_next_frame(create_scene_service.is_animating())
+        profiler.mark('first game frame')
+        profiler.report()
+    if snapshot_file_name is not None:
+        with open(snapshot_file_name, 'wb') as file:
+            file.write(create_scene_service.take_snapshot(compress=True))
+    create_scene_service.close()
     Canvas.quit()
@@ -0,0 +1,326 @@
+"""
+Simulate many balls on a giant level with several processes: the brick
+grid and the balls live in shared memory (NumPy views) and the grid is cut
+in horizontal bands, one band per worker process
+"""
+from __future__ import annotations
+from multiprocessing import shared_memory
+from random import Random
+from typing import List, Tuple
+import hashlib
+import multiprocessing
+import numpy as np
+from domain.fixed_point import FixedPoint
+from domain.metrics import Metrics
+from services.bricks_creator_service import ReadGame
+
+class SharedBoard:
+    """
+    All the arrays of a simulation in one block of shared memory:
+    - cells: one u8 per cell of the level, 0 when empty, UNBREAKABLE or the
+      remaining bumps of the brick (poisoned bricks are bricks here)
+    - balls: x, y, change x, change y of each ball, FixedPoint numbers of
+      cells: a cell is FixedPoint.ONE wide and high
+    - damage: cells bumped by the balls of each worker during the tick
+    - stats: bumps and destroyed bricks applied by each worker
+    - control: ticks the workers have to play, -1 to stop
+    The process creating the board unlinks it, the others only attach.
+    """
+    UNBREAKABLE: int = 255
+    # A ball bumps at most two cells per tick
+    DAMAGE_PER_BALL: int = 2
+
+    def __init__(self, rows: int, columns: int, number_balls: int, number_workers: int,
+                 name: str = None):
+        self.rows: int = rows
+        self.columns: int = columns
+        self.number_balls: int = number_balls
+        self.number_workers: int = number_workers
+        shapes: List[Tuple[str, Tuple[int, ...], type]] = [
+            ('control', (1,), np.int64),
+            ('stats', (number_workers, 2), np.int64),
+            ('damage_count', (number_workers,), np.int64),
+            ('damage', (number_workers, self.DAMAGE_PER_BALL * number_balls), np.int64),
+            ('balls', (4, number_balls), np.int64),
+            ('cells', (rows, columns), np.uint8),
+        ]
+        size: int = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize
+                        for _, shape, dtype in shapes)
+        self.owner: bool = name is None
+        self.memory: shared_memory.SharedMemory = shared_memory.SharedMemory(
+            name, create=self.owner, size=size)
+        offset: int = 0
+        views: dict = {}
+        for field, shape, dtype in shapes:
+            views[field] = np.ndarray(shape, dtype, self.memory.buf, offset)
+            offset += views[field].nbytes
+        self.control: np.ndarray = views['control']
+        self.stats: np.ndarray = views['stats']
+        self.damage_count: np.ndarray = views['damage_count']
+        self.damage: np.ndarray = views['damage']
+        self.balls: np.ndarray = views['balls']
+        self.cells: np.ndarray = views['cells']
+        if self.owner:
+            self.memory.buf[:size] = bytes(size)
+
+    def get_attach_arguments(self) -> Tuple[int, int, int, int, str]:
+        """
+        What another process needs to attach to the board
+        """
+        return (self.rows, self.columns, self.number_balls, self.number_workers,
+                self.memory.name)
+
+    def get_band(self, index: int) -> Tuple[int, int]:
+        """
+        First and last + 1 rows owned by a worker
+        """
+        return (self.rows * index // self.number_workers,
+                self.rows * (index + 1) // self.number_workers)
+
+    def close(self) -> None:
+        """
+        Detach, and free the memory when this process created it
+        """
+        # The views must go before the memory they point to
+        self.control = self.stats = self.damage_count = self.damage = None
+        self.balls = self.cells = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+class BandWorker:
+    """
+    Plays the balls of a band. Each tick has two phases separated by a
+    barrier so that nobody reads what another worker is writing:
+    - move_balls: the grid is only read. A ball belongs to the band of the
+      row it is in at the start of the tick and only its owner moves it.
+      A ball bounces on a cell which is a brick at the start of the tick,
+      the bumped cells are written in the damage list of the worker, even
+      when they belong to another band.
+    - apply_damage: the balls are only read. Each worker applies to the
+      cells of its band the damage listed by all workers, then finds the
+      balls it owns for the next tick.
+    The result does not depend on the number of workers: bumps only
+    subtract from the cells, in any order.
+    """
+    def __init__(self, board: SharedBoard, index: int):
+        self.board: SharedBoard = board
+        self.index: int = index
+        self.first_row: int
+        self.last_row: int
+        self.first_row, self.last_row = board.get_band(index)
+        self.cells: np.ndarray = board.cells.reshape(-1)
+        self.owned: np.ndarray = self.__find_owned()
+
+    def __find_owned(self) -> np.ndarray:
+        """
+        Balls in the band
+        """
+        rows: np.ndarray = self.board.balls[1] >> FixedPoint.FRACTION_BITS
+        return np.flatnonzero((rows >= self.first_row) & (rows < self.last_row))
+
+    def __is_wall(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        Brick or outside of the grid
+        """
+        outside: np.ndarray = (rows < 0) | (rows >= self.board.rows) | \
+                              (columns < 0) | (columns >= self.board.columns)
+        cells: np.ndarray = self.board.cells[np.clip(rows, 0, self.board.rows - 1),
+                                             np.clip(columns, 0, self.board.columns - 1)]
+        return outside | (cells != 0)
+
+    def move_balls(self) -> None:
+        """
+        First phase of a tick: a ball moves less than a cell per tick, it
+        bounces back on the side of the cell it was about to enter
+        """
+        balls: np.ndarray = self.board.balls
+        pos_x, pos_y, change_x, change_y = balls[:, self.owned]
+        next_x: np.ndarray = pos_x + change_x
+        next_y: np.ndarray = pos_y + change_y
+        column: np.ndarray = pos_x >> FixedPoint.FRACTION_BITS
+        row: np.ndarray = pos_y >> FixedPoint.FRACTION_BITS
+        next_column: np.ndarray = next_x >> FixedPoint.FRACTION_BITS
+        next_row: np.ndarray = next_y >> FixedPoint.FRACTION_BITS
+        moves_x: np.ndarray = next_column != column
+        moves_y: np.ndarray = next_row != row
+        bumps_x: np.ndarray = moves_x & self.__is_wall(row, next_column)
+        bumps_y: np.ndarray = moves_y & self.__is_wall(next_row, column)
+        # Only the corner of the next cell is on the way
+        bumps_corner: np.ndarray = moves_x & moves_y & ~bumps_x & ~bumps_y & \
+                                   self.__is_wall(next_row, next_column)
+        bounces_x: np.ndarray = bumps_x | bumps_corner
+        bounces_y: np.ndarray = bumps_y | bumps_corner
+        balls[0, self.owned] = np.where(bounces_x, pos_x, next_x)
+        balls[1, self.owned] = np.where(bounces_y, pos_y, next_y)
+        balls[2, self.owned] = np.where(bounces_x, -change_x, change_x)
+        balls[3, self.owned] = np.where(bounces_y, -change_y, change_y)
+
+        bumped_rows: np.ndarray = np.concatenate((row[bumps_x], next_row[bumps_y],
+                                                  next_row[bumps_corner]))
+        bumped_columns: np.ndarray = np.concatenate((next_column[bumps_x], column[bumps_y],
+                                                     next_column[bumps_corner]))
+        inside: np.ndarray = (bumped_rows >= 0) & (bumped_rows < self.board.rows) & \
+                             (bumped_columns >= 0) & (bumped_columns < self.board.columns)
+        damage: np.ndarray = bumped_rows[inside] * self.board.columns + bumped_columns[inside]
+        self.board.damage[self.index, :len(damage)] = damage
+        self.board.damage_count[self.index] = len(damage)
+
+    def apply_damage(self) -> None:
+        """
+        Second phase of a tick
+        """
+        first_cell: int = self.first_row * self.board.columns
+        last_cell: int = self.last_row * self.board.columns
+        damage: np.ndarray = np.concatenate(
+            [self.board.damage[worker, :self.board.damage_count[worker]]
+             for worker in range(self.board.number_workers)])
+        damage = damage[(damage >= first_cell) & (damage < last_cell)]
+        if len(damage) > 0:
+            cells, bumps = np.unique(damage, return_counts=True)
+            remaining: np.ndarray = self.cells[cells].astype(np.int64)
+            breakable: np.ndarray = remaining != SharedBoard.UNBREAKABLE
+            cells, bumps, remaining = cells[breakable], bumps[breakable], remaining[breakable]
+            remaining = np.maximum(remaining - bumps, 0)
+            self.cells[cells] = remaining
+            self.board.stats[self.index, 0] += int(bumps.sum())
+            self.board.stats[self.index, 1] += np.count_nonzero(remaining == 0)
+        self.owned = self.__find_owned()
+
+def run_band_worker(attach_arguments: Tuple[int, int, int, int, str], index: int,
+                    start: multiprocessing.Barrier, phase: multiprocessing.Barrier,
+                    done: multiprocessing.Barrier) -> None:
+    """
+    Body of a worker process: plays the ticks asked through the control
+    array until it is asked to stop
+    """
+    board: SharedBoard = SharedBoard(*attach_arguments)
+    worker: BandWorker = BandWorker(board, index)
+    while True:
+        start.wait()
+        ticks: int = int(board.control[0])
+        if ticks < 0:
+            break
+        for _ in range(ticks):
+            worker.move_balls()
+            phase.wait()
+            worker.apply_damage()
+            phase.wait()
+        done.wait()
+    worker = None
+    board.close()
+
+class BandSimulation:
+    """
+    Balls bouncing on the bricks of a level read with read_game, played by
+    number_workers processes. The main process only hands out the ticks:
+    it is free to draw a frame while the workers play the next ones.
+    """
+    # Bricks of the level file and their remaining bumps
+    CELL_VALUES: bytes = bytes(
+        SharedBoard.UNBREAKABLE if character == ord('U') else
+        character - ord('0') if ord('0') <= character <= ord('9') else
+        character - ord('P') if ord('P') < character <= ord('Z') else 0
+        for character in range(256))
+
+    def __init__(self, read_game: ReadGame, number_balls: int, number_workers: int,
+                 seed: int = 0):
+        brick_map: List[str] = [row.rstrip('\n') for row in read_game.read_game()]
+        columns: int = max(len(row) for row in brick_map)
+        self.board: SharedBoard = SharedBoard(len(brick_map), columns, number_balls,
+                                              number_workers)
+        for index, row in enumerate(brick_map):
+            self.board.cells[index, :len(row)] = np.frombuffer(
+                row.encode('latin-1').translate(self.CELL_VALUES), np.uint8)
+        self.__place_balls(Random(seed))
+        self.running: bool = False
+
+        context = multiprocessing.get_context('spawn')
+        self.start_barrier: multiprocessing.Barrier = context.Barrier(number_workers + 1)
+        self.done_barrier: multiprocessing.Barrier = context.Barrier(number_workers + 1)
+        # Kept until the workers stop: they need it to be alive to attach to it
+        self.phase_barrier: multiprocessing.Barrier = context.Barrier(number_workers)
+        self.workers: List[multiprocessing.Process] = [
+            context.Process(target=run_band_worker,
+                            args=(self.board.get_attach_arguments(), index, self.start_barrier,
+                                  self.phase_barrier, self.done_barrier), daemon=True)
+            for index in range(number_workers)]
+        for worker in self.workers:
+            worker.start()
+        # Returns once every worker is attached to the board
+        self.run(0)
+
+    def __place_balls(self, random: Random) -> None:
+        """
+        Each ball starts in the middle of an empty cell, at less than half a
+        cell per tick
+        """
+        empty: np.ndarray = np.flatnonzero(self.board.cells.reshape(-1) == 0)
+        if len(empty) == 0:
+            raise ValueError('The level has no room for a ball')
+        for ball in range(self.board.number_balls):
+            row, column = divmod(int(empty[random.randrange(len(empty))]), self.board.columns)
+            self.board.balls[:, ball] = (
+                (column << FixedPoint.FRACTION_BITS) + FixedPoint.ONE // 2,
+                (row << FixedPoint.FRACTION_BITS) + FixedPoint.ONE // 2,
+                random.choice((-1, 1)) * random.randint(FixedPoint.ONE // 8, FixedPoint.ONE // 2),
+                random.choice((-1, 1)) * random.randint(FixedPoint.ONE // 8, FixedPoint.ONE // 2))
+
+    def start_ticks(self, ticks: int) -> None:
+        """
+        Let the workers play ticks, wait_ticks waits until they are done
+        """
+        self.board.control[0] = ticks
+        self.start_barrier.wait()
+        self.running = True
+
+    def wait_ticks(self) -> None:
+        """
+        Return when the ticks asked by start_ticks have been played
+        """
+        if self.running:
+            self.done_barrier.wait()
+            self.running = False
+            bumps, destroyed = self.board.stats.sum(axis=0)
+            Metrics.set('band_simulation.bumps', int(bumps))
+            Metrics.set('band_simulation.destroyed_bricks', int(destroyed))
+
+    def run(self, ticks: int) -> None:
+        """
+        Play ticks
+        """
+        self.start_ticks(ticks)
+        self.wait_ticks()
+
+    def get_frame(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of the cells and of the ball positions (in cells, FixedPoint),
+        to be drawn while the workers go on. Only between two runs.
+        """
+        return self.board.cells.copy(), self.board.balls[:2].copy()
+
+    def get_stats(self) -> Tuple[int, int]:
+        """
+        Bumps and destroyed bricks so far
+        """
+        bumps, destroyed = self.board.stats.sum(axis=0)
+        return int(bumps), int(destroyed)
+
+    def get_state_hash(self) -> str:
+        """
+        Same cells and same balls give the same hash, whatever the number
+        of workers
+        """
+        return hashlib.blake2b(self.board.cells.tobytes() + self.board.balls.tobytes(),
+                               digest_size=8).hexdigest()
+
+    def close(self) -> None:
+        """
+        Stop the workers and free the shared memory
+        """
+        self.wait_ticks()
+        self.board.control[0] = -1
+        self.start_barrier.wait()
+        for worker in self.workers:
+            worker.join()
+        self.board.close()
@@ -1,18 +1,24 @@
 """
 Create all bricks and their position as defined in the game stored on the file system
 """
+from __future__ import annotations
 from typing import Tuple
 from typing import Dict
 from typing import List
+from typing import Set
+from typing import TYPE_CHECKING
 from abc import ABC, abstractmethod
 from domain.sprites.sprites import StaticSprite
 from domain.sprites.sprites import Brick
 from domain.sprites.sprites import BreakableBrick
 from domain.sprites.sprites import PoisonedBrick
 from domain.sprites.sprites import UnbreakableBrick
+from domain.sprites.sprites import UnbreakableWall
 from domain.collision_handler.collision_handler import CollisionHandler
 from domain.common import Common
 from infrastructure.gui_library import Canvas
+if TYPE_CHECKING:
+    from domain.sprites.brick_store import BrickStore
 
 class ReadGame(ABC): # pylint: disable=too-few-public-methods
     """
@@ -34,14 +40,22 @@ class BricksCreatorService():
     Create bricks
     """
     def __init__(self, from_height: int, screen: Canvas, read_game: ReadGame,
-                 collision_handler: CollisionHandler):
+                 collision_handler: CollisionHandler, fixed_point: bool = False,
+                 brick_size: Tuple[int, int] = None, first_column: int = 0):
         self.screen_width: int
         self.screen_height: int
         self.screen_width, self.screen_height = screen.get_screen_size()
         self.from_height: int = from_height
         self.screen: Canvas = screen
         self.collision_handler: CollisionHandler = collision_handler
+        self.fixed_point: bool = fixed_point
+        # Part of a wider level (see ScrollingLevel): bricks of a given size,
+        # the first column of read_game is first_column in the level
+        self.brick_size: Tuple[int, int] = brick_size
+        self.first_column: int = first_column
         self.brick_map: List[str] = read_game.read_game()
+        self.bricks: List[StaticSprite] = []
+        self.unbreakable_bricks_by_cell: Dict[Tuple[int, int], Brick] = {}
 
     def open_game(self, filename: str) -> None:
         """
@@ -85,19 +99,41 @@ class BricksCreatorService():
                     .set_collision_handler(self.collision_handler)\
                         .set_number_bumped(number_bumper_before_vanishes)
 
+    def __get_brick_size(self) -> Tuple[float, float]:
+        """
+        Bricks fill the width of the screen and 3/4 of its height
+        With fixed-point physics brick sizes are whole pixels, rounded down:
+        every brick bound is then an integer and a few pixels may be left on
+        the right of the bricks.
+        """
+        height: int = self.screen_height - self.from_height
+        if self.brick_size is not None:
+            return self.brick_size
+        if self.fixed_point:
+            return (self.screen_width // (len(self.brick_map[0]) - 1),
+                    3 * height // (4 * len(self.brick_map)))
+        return (self.screen_width / (len(self.brick_map[0]) - 1),
+                3 * height / (4 * len(self.brick_map)))
+
+    def get_number_bricks(self) -> int:
+        """
+        Number of bricks of the level, before creating them
+        """
+        return sum(1 for row in self.brick_map for element in row
+                   if element == 'U' or element > 'P' or element.isdigit())
+
     def create_bricks(self) -> List[StaticSprite]:
         """
         Create the world of bricks and place each brich at its expected place
         """
-        height: int = self.screen_height - self.from_height
-        brick_width: int = self.screen_width / (len(self.brick_map[0]) - 1)
-        brick_height: int = 3 * height / (4 * len(self.brick_map))
+        brick_width, brick_height = self.__get_brick_size()
         self.smallest_brick_side = min(brick_width, brick_height)
         index_x: int = 0
         index_y: int = 0
         bricks: List[StaticSprite] = []
         breakable_brick_positions: List[Tuple[Dict[str, int], int]] = []
         unbreakable_brick_positions: List[Dict[str, int]] = []
+        unbreakable_brick_cells: List[Tuple[int, int]] = []
         poisoned_brick_positions: List[Tuple[Dict[str, int], int]] = []
         poisoned_number_bumper_before_vanishes: int = 0
         breakable_number_bumper_before_vanishes: int = 0
@@ -105,10 +141,11 @@ class BricksCreatorService():
         for row in self.brick_map:
             for element in row:
                 if element != ' ':
-                    position = {'x':index_x * brick_width + brick_width // 2,
+                    position = {'x':(self.first_column + index_x) * brick_width + brick_width // 2,
                                 'y':index_y * brick_height + brick_height // 2 + self.from_height}
                     if element == 'U':
                         unbreakable_brick_positions.append(position)
+                        unbreakable_brick_cells.append((index_x, index_y))
 
                     elif element[0] > 'P':
                         number_bumper_before_vanishes: int = ord(element[0]) - ord('P')
@@ -134,9 +171,11 @@ class BricksCreatorService():
                     breakable_number_bumper_before_vanishes)
                       for position, number_bumper_before_vanishes in breakable_brick_positions])
 
-        bricks.extend([ self.__create_unbreakable_brick(
+        unbreakable_bricks: List[Brick] = [ self.__create_unbreakable_brick(
                     brick_width, brick_height, position)
-                      for position in unbreakable_brick_positions ])
+                      for position in unbreakable_brick_positions ]
+        bricks.extend(unbreakable_bricks)
+        self.unbreakable_bricks_by_cell = dict(zip(unbreakable_brick_cells, unbreakable_bricks))
 
 
         bricks.extend([self.__create_poisoned_brick(
@@ -145,7 +184,77 @@ class BricksCreatorService():
                     poisoned_number_bumper_before_vanishes)
                       for position, number_bumper_before_vanishes in poisoned_brick_positions])
 
+        self.bricks = bricks
         return bricks
 
+    def create_brick_store(self) -> BrickStore:
+        """
+        Same bricks as create_bricks, in the same order, kept in a BrickStore
+        """
+        # NumPy is only imported by the levels big enough to need it: pygame
+        # does not import it either (see __main__.py)
+        from domain.sprites.brick_store import BrickStore, BrickKind # pylint: disable=import-outside-toplevel
+        brick_width, brick_height = self.__get_brick_size()
+        self.smallest_brick_side = min(brick_width, brick_height)
+        cells: Dict[int, List[Tuple[int, int, int]]] = {
+            BrickKind.BREAKABLE: [], BrickKind.UNBREAKABLE: [], BrickKind.POISONED: []}
+        for index_y, row in enumerate(self.brick_map):
+            for index_x, element in enumerate(row):
+                if element == 'U':
+                    cells[BrickKind.UNBREAKABLE].append((index_x, index_y, 0))
+                elif element > 'P':
+                    cells[BrickKind.POISONED].append((index_x, index_y,
+                                                      ord(element) - ord('P')))
+                elif element.isdigit():
+                    cells[BrickKind.BREAKABLE].append((index_x, index_y, int(element)))
+
+        kinds: List[int] = []
+        ordered_cells: List[Tuple[int, int, int]] = []
+        for kind in (BrickKind.BREAKABLE, BrickKind.UNBREAKABLE, BrickKind.POISONED):
+            kinds.extend([kind] * len(cells[kind]))
+            ordered_cells.extend(cells[kind])
+        store: BrickStore = BrickStore(self.screen, brick_width, brick_height, self.from_height)\
+            .set_collision_handler(self.collision_handler)\
+                .add_bricks(kinds, [cell[0] for cell in ordered_cells],
+                            [cell[1] for cell in ordered_cells],
+                            [cell[2] for cell in ordered_cells])
+        self.bricks = store.get_bricks()
+        first_unbreakable: int = len(cells[BrickKind.BREAKABLE])
+        self.unbreakable_bricks_by_cell = {
+            (index_x, index_y): self.bricks[first_unbreakable + index]
+            for index, (index_x, index_y, _) in enumerate(cells[BrickKind.UNBREAKABLE])}
+        return store
+
+    def get_colliders(self) -> List[StaticSprite]:
+        """
+        What the collision handler needs to know about: contiguous unbreakable
+        bricks are greedily merged into maximal rectangles (as wide as possible
+        first, then as high as possible), the other bricks collide one by one
+        """
+        walls: List[StaticSprite] = []
+        merged_cells: Set[Tuple[int, int]] = set()
+        for (index_x, index_y) in sorted(self.unbreakable_bricks_by_cell,
+                                         key=lambda cell: (cell[1], cell[0])):
+            if (index_x, index_y) in merged_cells:
+                continue
+            width: int = 1
+            while (index_x + width, index_y) in self.unbreakable_bricks_by_cell and \
+                  (index_x + width, index_y) not in merged_cells:
+                width += 1
+            height: int = 1
+            while all((index_x + column, index_y + height) in self.unbreakable_bricks_by_cell and \
+                      (index_x + column, index_y + height) not in merged_cells
+                      for column in range(width)):
+                height += 1
+            cells: List[Tuple[int, int]] = [(index_x + column, index_y + row)
+                                            for row in range(height) for column in range(width)]
+            merged_cells.update(cells)
+            walls.append(UnbreakableWall(self.screen,
+                                         [self.unbreakable_bricks_by_cell[cell] for cell in cells])\
+                             .set_collision_handler(self.collision_handler))
+
+        unbreakable_bricks: Set[StaticSprite] = set(self.unbreakable_bricks_by_cell.values())
+        return [brick for brick in self.bricks if brick not in unbreakable_bricks] + walls
+
     def get_smallest_brick_size(self) -> int:
         return self.smallest_brick_side
@@ -2,13 +2,20 @@
 """
 Create scene and handle the state machine of the game
 """
-from typing import List
+from __future__ import annotations
+from typing import List, Tuple, TYPE_CHECKING
+import hashlib
+import os.path
+import struct
 from domain.sprites.base_classes.static_sprite import StaticSprite
 from domain.sprites.sprites import Ball
 from domain.sprites.sprites import Player
 from domain.game_task_handler import WinLostManagement
 from domain.game_task_handler import GameTaskChanger
 from domain.event_dispatcher import EventDispatcher
+from domain.cycle_detector import CycleDetector
+from domain.game_clock import GameClock
+from domain.frame_events import FrameEvents
 from domain.common import Common
 from domain.user_panel_interface.score_banner import Score
 from domain.collision_handler.collision_handler_sprites import CollisionHandlerSprites
@@ -17,21 +24,40 @@ from domain.user_panel_interface.information_screen import AllScores
 from domain.user_panel_interface.information_screen import InformationEndGame
 from domain.user_panel_interface.information_screen import GetName
 from domain.user_panel_interface.score_handler import ScoreHandler
+from domain.user_panel_interface.score_handler import ScoreSaver
 from services.bricks_creator_service import BricksCreatorService
 from services.game_state import GameState
+from services.game_snapshot import GameSnapshot
+from services.scrolling_level_service import ScrollingLevel
 from infrastructure.read_game_from_file import ReadGameFromFile
-from repository.score_save import FileScoreSaver
+from infrastructure.read_game_from_file import LevelChunkFile
+from repository.score_save import JournaledFileScoreSaver
+from repository.background_score_saver import BackgroundScoreSaver
+from repository.sqlite_score_saver import SqliteScoreSaver
 from infrastructure.gui_library import SoundPlayer
 from infrastructure.gui_library import Canvas
+from infrastructure.gui_library import SpriteBatch
+from infrastructure.gui_library import Events
+from infrastructure.input_recording import InputLog
+from infrastructure.input_recording import InputRecorder
+if TYPE_CHECKING:
+    from domain.sprites.brick_store import BrickStore
 
 
 class CreateSceneService(WinLostManagement, GameTaskChanger):
     """
     Create the visual part of the game
     """
-    def __init__(self,
+    def __init__(self, # pylint: disable=too-many-arguments
                  game_list: List[str],
-                 screen: Canvas):
+                 screen: Canvas,
+                 recorder: InputRecorder = None,
+                 input_log: InputLog = None,
+                 score_saver: ScoreSaver = None,
+                 render: bool = True,
+                 events: Events = None,
+                 clock: GameClock = None,
+                 fixed_point: bool = False):
         self.game_index:int = 0
         self.game_list: List[str] = game_list
         self.screen: Canvas = screen
@@ -40,15 +66,45 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         self.from_height: int = 50
         self.get_name: GetName = GetName(self.screen)
         self.game_state: GameState = GameState.WAITING_PLAYER_READY_BEFORE_LEVEL_REPLAY
-        file_score_saver: FileScoreSaver = FileScoreSaver('scores.txt')
-        self.score_handler: ScoreHandler = ScoreHandler(file_score_saver)
+        if score_saver is None:
+            score_saver = BackgroundScoreSaver(
+                SqliteScoreSaver('scores.db', ScoreHandler.max_scores,
+                                 import_from=JournaledFileScoreSaver('scores.txt',
+                                                                     ScoreHandler.max_scores)))
+        self.score_handler: ScoreHandler = ScoreHandler(score_saver)
+        self.recorder: InputRecorder = recorder
+        self.input_log: InputLog = input_log
+        self.hash_interval: int = 0
+        if input_log is not None:
+            self.hash_interval = input_log.hash_interval
+        elif recorder is not None:
+            self.hash_interval = recorder.hash_interval
+        self.hash_mismatch_ticks: List[int] = []
+        # Integer physics, bit-identical on every machine (see FixedPoint)
+        self.fixed_point: bool = fixed_point
+        if input_log is not None:
+            self.fixed_point = input_log.fixed_point
+        self.tick: int = 0
+        self.render: bool = render
+        # Inputs read from pygame unless they come from elsewhere
+        self.events: Events = events
+        # Headless games run on virtual time unless told otherwise
+        self.clock: GameClock = clock if clock is not None else GameClock(virtual=True)
+        self.level_start_ns: int = 0
+        # Outside of PLAYING the scene is only drawn again when it changed
+        self.drawn_scene: Tuple = None
+        self.scene_changed: bool = True
         self.remaining_balls: int = 3
         self.player: Player = None
         self.ball: Ball = None
+        self.cycle_detector: CycleDetector = None
         self.score: Score = None
         self.bricks: List[StaticSprite] = None
         self.event_dispatcher: EventDispatcher = None
         self.collision_handler: CollisionHandler = None
+        self.brick_store: BrickStore = None
+        self.brick_batch: SpriteBatch = None
+        self.scrolling_level: ScrollingLevel = None
         self.current_score: int = 0
         self.sound_player: SoundPlayer = SoundPlayer(
             [Common.YOU_LOST,
@@ -64,19 +120,53 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         """
         return self.event_dispatcher.is_done()
 
+    def is_animating(self) -> bool:
+        """
+        True while the scene changes from one frame to the next
+        """
+        return (self.game_state == GameState.PLAYING and not self.clock.is_paused()) or \
+               self.scene_changed
+
+    def has_new_frame(self) -> bool:
+        """
+        True when the last update drew something new
+        """
+        return self.render and self.scene_changed
+
+    def __get_scene_signature(self) -> Tuple:
+        """
+        Everything which is visible when the game is not being played
+        """
+        return (self.game_state, self.ball.get_position(), self.player.get_position(),
+                tuple(self.message), self.get_name.get_user_string(),
+                self.score.get_score(), self.remaining_balls, self.game_index,
+                self.clock.is_paused())
+
+    def close(self) -> None:
+        """
+        The game is over: make sure everything is saved
+        """
+        self.score_handler.close()
+        if self.scrolling_level is not None:
+            self.scrolling_level.close()
+        if self.recorder is not None:
+            self.recorder.close(self.tick)
+
     def __create_main_sprites(self, highest_ball_increment: int) -> None:
         """
         Handle ball, player and event dispatch
         """
         screen_width, screen_height = self.screen.get_screen_size()
 
-        self.event_dispatcher = EventDispatcher()
+        self.event_dispatcher = EventDispatcher(self.recorder, self.input_log, self.events,
+                                                self.clock)
         self.event_dispatcher.subscribe_next_task(self)
 
         self.player = Player(self.screen)\
             .set_image(150, 8, Common.PING_IMAGE_NAME)\
                 .set_position(screen_width // 2, screen_height)\
-                    .set_collision_handler(self.collision_handler)
+                    .set_collision_handler(self.collision_handler)\
+                        .set_fixed_point(self.fixed_point)
         self.collision_handler.subscribe_moving(self.player)
         self.event_dispatcher.subscribe(self.player)
 
@@ -84,9 +174,14 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
             .set_max_increment(highest_ball_increment)\
                 .set_image(10, 10, Common.BALL_IMAGE_NAME)\
                     .set_position(screen_width // 2, 4 * screen_height // 5)\
-                        .set_collision_handler(self.collision_handler)
-        self.ball.subscribe(self)
+                        .set_collision_handler(self.collision_handler)\
+                            .set_fixed_point(self.fixed_point)
+        self.ball.subscribe(self.frame_events)
         self.collision_handler.subscribe_moving(self.ball)
+        self.cycle_detector = CycleDetector(self.ball, self.player)
+        if self.scrolling_level is not None:
+            self.player.set_world_width(self.scrolling_level.get_world_width())
+            self.ball.set_world_width(self.scrolling_level.get_world_width())
 
     def create_game(self) -> None:
         """
@@ -96,16 +191,51 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
             self.game_index = 0
         game_name = self.game_list[self.game_index]
         self.score: Score = Score(self.screen, self.score_height, self.current_score, self.remaining_balls)
-        self.collision_handler: CollisionHandlerSprites = CollisionHandlerSprites(self.score, self)
+        self.frame_events: FrameEvents = FrameEvents(self.score, self)
+        self.collision_handler: CollisionHandlerSprites = CollisionHandlerSprites(self.frame_events)
+        if self.scrolling_level is not None:
+            self.scrolling_level.close()
+            self.scrolling_level = None
+        if LevelChunkFile.get_number_columns(game_name) >= Common.SCROLLING_MIN_COLUMNS:
+            self.__create_scrolling_game(game_name)
+            return
         bricks_creator_service: BricksCreatorService = BricksCreatorService(
             self.from_height, self.screen,
-                ReadGameFromFile(game_name), self.collision_handler)
-        self.bricks = bricks_creator_service.create_bricks()
-        for brick in self.bricks:
-            self.collision_handler.subscribe_static(brick)
+                ReadGameFromFile(game_name), self.collision_handler, self.fixed_point)
+        self.brick_store = None
+        self.brick_batch = None
+        if bricks_creator_service.get_number_bricks() >= Common.BRICK_STORE_MIN_BRICKS:
+            self.brick_store = bricks_creator_service.create_brick_store()
+            self.bricks = bricks_creator_service.bricks
+        else:
+            self.bricks = bricks_creator_service.create_bricks()
+            self.brick_batch = SpriteBatch(self.screen)
+            for brick in self.bricks:
+                brick.set_batch(self.brick_batch)
+        for collider in bricks_creator_service.get_colliders():
+            self.collision_handler.subscribe_static(collider)
         self.__create_main_sprites(\
             max(bricks_creator_service.get_smallest_brick_size() // 15,\
                 1))
+        self.level_start_ns = self.clock.now_ns()
+
+    def __create_scrolling_game(self, game_name: str) -> None:
+        """
+        Level too wide for the screen: only the bricks around the view exist
+        """
+        self.brick_store = None
+        self.brick_batch = None
+        self.scrolling_level = ScrollingLevel(self.screen, game_name, self.from_height,
+                                              self.collision_handler, self.fixed_point)
+        self.bricks = self.scrolling_level.get_bricks()
+        self.__create_main_sprites(max(self.scrolling_level.get_smallest_brick_size() // 15, 1))
+        self.level_start_ns = self.clock.now_ns()
+
+    def get_level_time(self) -> float:
+        """
+        Seconds of game time spent on the current level
+        """
+        return (self.clock.now_ns() - self.level_start_ns) / GameClock.NANOSECONDS_PER_SECOND
 
 
     def init_game(self) -> None:
@@ -116,6 +246,61 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         self.current_score = 0
         self.game_index = 0
 
+    def __get_level_name(self) -> str:
+        """
+        Level the scores are saved for
+        """
+        return os.path.basename(self.game_list[self.game_index])
+
+    def __is_wall_of_fames(self, score: int) -> bool:
+        """
+        The answer depends on previous games: it is recorded / replayed
+        """
+        if self.input_log is not None:
+            return self.input_log.wall_of_fames.get(self.tick, False)
+        is_wall_of_fames: bool = self.score_handler.is_wall_of_fames(score)
+        if self.recorder is not None:
+            self.recorder.record_wall_of_fame(self.tick, is_wall_of_fames)
+        return is_wall_of_fames
+
+    def get_state_hash(self) -> int:
+        """
+        Hash of the game state used to check that a replay matches its recording
+        """
+        ball_x, ball_y, ball_change_x, ball_change_y = self.ball.get_movement()
+        player_x, player_y = self.player.get_position()
+        state: bytes = struct.pack('<6d4i', ball_x, ball_y, ball_change_x, ball_change_y,
+                                   player_x, player_y,
+                                   self.score.get_score(), self.remaining_balls,
+                                   self.game_index, self.game_state.value) + \
+                       bytes(min(getattr(brick, 'number_remaining_bumps', 255), 255) \
+                             for brick in self.bricks)
+        return int.from_bytes(hashlib.blake2b(state, digest_size=8).digest(), 'little')
+
+    def __check_state_hash(self) -> None:
+        """
+        Every hash_interval ticks the state hash is recorded or verified
+        """
+        if self.hash_interval <= 0 or self.tick % self.hash_interval != 0:
+            return
+        if self.recorder is not None:
+            self.recorder.record_state_hash(self.tick, self.get_state_hash())
+        elif self.input_log is not None and self.tick in self.input_log.state_hashes:
+            if self.input_log.state_hashes[self.tick] != self.get_state_hash():
+                self.hash_mismatch_ticks.append(self.tick)
+
+    def take_snapshot(self, compress: bool = False) -> bytes:
+        """
+        Save the full state of the game
+        """
+        return GameSnapshot.take(self, compress)
+
+    def restore_snapshot(self, snapshot: bytes) -> None:
+        """
+        Go back to a state saved with take_snapshot
+        """
+        GameSnapshot.restore(self, snapshot)
+
     def inform_player_lost(self) -> None:
         """
         Behaviour when the player lost
@@ -127,11 +312,14 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
                             f'You have another {self.remaining_balls} ball(s)']
             self.game_state = GameState.WAITING_PLAYER_READY_BEFORE_LEVEL_REPLAY
         else:
-            if self.score_handler.is_wall_of_fames(self.score.get_score()):
+            if self.__is_wall_of_fames(self.score.get_score()):
                 self.sound_player.play(Common.GO_GAME_BOARD)
                 self.get_name.clear_input()
                 self.game_state = GameState.ASKING_USER_NAME
             else:
+                # Saved for the per level and daily boards, no name asked
+                self.score_handler.add_score(ScoreHandler.anonymous_name, self.score.get_score(),
+                                             self.__get_level_name())
                 self.sound_player.play(Common.YOU_LOST)
                 self.message = ["No wall of fame for this time ... ",
                                 "your score is far too low!"]
@@ -142,6 +330,7 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         Behaviour when the player won
         """
         self.message = ["Well done :-)",
+                        f'Level cleared in {self.get_level_time():.1f} seconds',
                         "Next one will be much harder :-)",
                         f'You have another {self.remaining_balls} ball(s)']
         self.game_state = GameState.WAITING_PLAYER_READY_BEFORE_NEXT_LEVEL
@@ -153,7 +342,8 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         """
         if self.game_state == GameState.ASKING_USER_NAME:
             self.score_handler.add_score(
-                self.get_name.get_user_string(), self.score.get_score())
+                self.get_name.get_user_string(), self.score.get_score(),
+                self.__get_level_name())
             self.game_state = GameState.SHOWING_SCORE
         elif self.game_state in [ GameState.SHOWING_SCORE,
                                   GameState.WAITING_PLAYER_READY_BEFORE_GAME_RESTART ]:
@@ -173,26 +363,64 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         """
         Visually update the scene of the game
         """
+        paused: bool = self.clock.is_paused()
         if self.game_state != GameState.PLAYING:
             self.ball.move_from_bottom(
                 self.player.get_best_ball_place_before_start())
-        else:
+        elif not paused:
             self.ball.move()
-            if self.player.timeout(): 
-                self.ball.adapt_infinte_loop()
 
-        self.event_dispatcher.process_event()
-        self.player.move()
+        self.event_dispatcher.process_event(self.tick)
+        if not paused:
+            self.player.move()
+        # The state machine only sees the state at the end of the physics
+        self.frame_events.apply()
+        self.collision_handler.publish_metrics()
+        if self.scrolling_level is not None:
+            if self.scrolling_level.follow(self.ball):
+                self.bricks = self.scrolling_level.get_bricks()
+            self.player.set_view_x(self.scrolling_level.camera_x)
+        if self.game_state == GameState.PLAYING and not paused:
+            self.cycle_detector.update(self.frame_events.get_last_bumped_sprites())
 
-        self.screen.fill_color(Common.black)
-        self.player.display_on_screen()
-        self.ball.display_on_screen()
-        self.score.display_on_screen()
-        for brick in self.bricks:
-            brick.display_on_screen()
         if self.game_state == GameState.ASKING_USER_NAME:
             self.event_dispatcher.subscribe_input(self.get_name)
             self.get_name.set_input_on_screen_requested(True)
+
+        self.__check_state_hash()
+        self.tick += 1
+        self.clock.tick()
+        if self.render:
+            scene_signature: Tuple = None
+            if self.game_state != GameState.PLAYING or self.clock.is_paused():
+                scene_signature = self.__get_scene_signature()
+            self.scene_changed = scene_signature is None or scene_signature != self.drawn_scene
+            self.drawn_scene = scene_signature
+            if self.scene_changed:
+                self.__display_game_scene()
+
+    def __display_game_scene(self) -> None:
+        """
+        Paint everything
+        """
+        self.screen.fill_color(Common.black)
+        if self.scrolling_level is not None:
+            # The level is drawn where the camera is, the score stays in place
+            self.screen.set_camera(self.scrolling_level.camera_x, 0)
+            self.player.display_on_screen()
+            self.ball.display_on_screen()
+            self.scrolling_level.display_on_screen()
+            self.screen.set_camera(0, 0)
+            self.score.display_on_screen()
+        else:
+            self.player.display_on_screen()
+            self.ball.display_on_screen()
+            self.score.display_on_screen()
+            if self.brick_store is not None:
+                self.brick_store.display_on_screen()
+            else:
+                self.brick_batch.display_on_screen()
+        if self.game_state == GameState.ASKING_USER_NAME:
             self.get_name.print_information()
         elif self.game_state in [
             GameState.WAITING_PLAYER_READY_BEFORE_LEVEL_REPLAY,
@@ -203,3 +431,5 @@ class CreateSceneService(WinLostManagement, GameTaskChanger):
         elif self.game_state == GameState.SHOWING_SCORE:
             information = AllScores(self.screen, self.score_handler.get_score_list_formated())
             information.print_information()
+        elif self.clock.is_paused():
+            InformationEndGame(self.screen, ['Paused', 'Press P to continue']).print_information()
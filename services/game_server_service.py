@@ -0,0 +1,214 @@
+"""
+Host many games in one process: thin clients send the paddle input
+and receive the state of their board (see infrastructure/game_protocol)
+"""
+import asyncio
+import os
+import signal
+import time
+from typing import List, Tuple
+from domain.common import Common
+from domain.metrics import Metrics
+from services.create_scene_service import CreateSceneService
+from services.state_stream_service import SceneStateStream
+from infrastructure.asset_pack import AssetPack
+from infrastructure.game_protocol import INPUT
+from infrastructure.game_protocol import RemoteEvents
+from infrastructure.gui_library import Canvas
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+class Board:
+    """
+    The game of one client. A tick taking longer than its budget is paid
+    back by skipping the next ticks of the board: a slow board slows down
+    its own game, not the others.
+    """
+    # A client which does not read its state is disconnected
+    MAX_BUFFERED_BYTES: int = 1 << 20
+    # Creating a level takes much more than a tick: it is not paid back
+    MAX_SKIPPED_TICKS: int = 8
+
+    def __init__(self, scene: CreateSceneService, events: RemoteEvents,
+                 writer: asyncio.StreamWriter):
+        self.scene: CreateSceneService = scene
+        self.events: RemoteEvents = events
+        self.writer: asyncio.StreamWriter = writer
+        self.state_stream: SceneStateStream = SceneStateStream(scene)
+        self.debt: float = 0.0
+        self.closed: bool = False
+
+    def update(self, budget: float) -> bool:
+        """
+        Play a tick and send its state, False when the tick was skipped
+        """
+        if self.debt > 0:
+            self.debt = max(0.0, self.debt - budget)
+            return False
+        start: float = time.perf_counter()
+        self.scene.update_game_scene()
+        self.debt = min(max(0.0, time.perf_counter() - start - budget),
+                        budget * self.MAX_SKIPPED_TICKS)
+        self.__send_state()
+        return True
+
+    def __send_state(self) -> None:
+        """
+        What changed during the tick
+        """
+        if self.writer.transport.get_write_buffer_size() > self.MAX_BUFFERED_BYTES:
+            print('ERROR: client does not read its state, disconnected')
+            self.close()
+            return
+        self.writer.write(self.state_stream.encode_tick(self.events.sequence))
+
+    def close(self) -> None:
+        """
+        The client left
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.close()
+        self.scene.close()
+
+class GameServer:
+    """
+    One board per connection, all boards are played at tick_rate.
+    board_budget is the time a board may use per tick, by default a fair
+    share of the tick. The event loop gets the hand back every
+    YIELD_INTERVAL seconds so that inputs are read while boards are played.
+    """
+    YIELD_INTERVAL: float = 0.002
+
+    def __init__(self, screen: Canvas, game_list: List[str], tick_rate: int = 80,
+                 board_budget: float = None, report: bool = False):
+        self.screen: Canvas = screen
+        self.game_list: List[str] = game_list
+        self.tick_period: float = 1.0 / tick_rate
+        self.board_budget: float = board_budget
+        self.report: bool = report
+        self.boards: List[Board] = []
+        self.first_board: int = 0
+
+    def create_board(self, writer: asyncio.StreamWriter) -> Board:
+        """
+        New game waiting for the client to start it
+        """
+        events: RemoteEvents = RemoteEvents()
+        scene: CreateSceneService = CreateSceneService(
+            self.game_list, self.screen,
+            score_saver=SqliteScoreSaver(':memory:'), render=False, events=events)
+        return Board(scene, events, writer)
+
+    async def serve(self, host: str, port: int) -> None:
+        """
+        Accept clients and play their boards until cancelled
+        """
+        server: asyncio.Server = await asyncio.start_server(self.__handle_client, host, port)
+        print(f'Serving on {host}:{port}')
+        # SDL turns the signals into quit events nobody reads here
+        play: asyncio.Task = asyncio.current_task()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signal_number, play.cancel)
+        async with server:
+            try:
+                await self.__play()
+            except asyncio.CancelledError:
+                pass
+
+    async def __handle_client(self, reader: asyncio.StreamReader,
+                              writer: asyncio.StreamWriter) -> None:
+        """
+        Read the inputs of a client until it leaves
+        """
+        board: Board = self.create_board(writer)
+        self.boards.append(board)
+        try:
+            while not board.closed:
+                board.events.push(*INPUT.unpack(await reader.readexactly(INPUT.size)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.boards.remove(board)
+            board.close()
+
+    async def __play(self) -> None:
+        """
+        Play all boards once per tick. Late ticks are not caught up.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        next_tick: float = loop.time()
+        second_start: float = time.perf_counter()
+        ticks: int = 0
+        late_ticks: int = 0
+        played_ticks: int = 0
+        skipped_ticks: int = 0
+        busy: float = 0.0
+        while True:
+            start: float = time.perf_counter()
+            played, skipped = await self.__play_boards()
+            busy += time.perf_counter() - start
+            played_ticks += played
+            skipped_ticks += skipped
+            ticks += 1
+            next_tick += self.tick_period
+            delay: float = next_tick - loop.time()
+            if delay < 0:
+                late_ticks += 1
+                next_tick = loop.time()
+            await asyncio.sleep(max(delay, 0.0))
+
+            elapsed: float = time.perf_counter() - second_start
+            if elapsed >= 1.0:
+                Metrics.set('server.boards', len(self.boards))
+                Metrics.set('server.ticks_per_second', ticks / elapsed)
+                Metrics.set('server.late_ticks_per_second', late_ticks / elapsed)
+                Metrics.set('server.board_ticks_per_second', played_ticks / elapsed)
+                Metrics.set('server.skipped_board_ticks_per_second', skipped_ticks / elapsed)
+                Metrics.set('server.busy', busy / elapsed)
+                if self.report:
+                    print(Metrics.format('server.'))
+                second_start = time.perf_counter()
+                ticks = late_ticks = played_ticks = skipped_ticks = 0
+                busy = 0.0
+
+    async def __play_boards(self) -> Tuple[int, int]:
+        """
+        Boards are played starting from another one at each tick so that
+        the same boards are not always the last ones. Number of board ticks
+        played and skipped.
+        """
+        boards: List[Board] = self.boards[self.first_board:] + self.boards[:self.first_board]
+        self.first_board = (self.first_board + 1) % max(len(self.boards), 1)
+        budget: float = self.board_budget
+        if budget is None:
+            budget = self.tick_period / max(len(boards), 1)
+        played: int = 0
+        skipped: int = 0
+        slice_start: float = time.perf_counter()
+        for board in boards:
+            if board.closed:
+                continue
+            if board.update(budget):
+                played += 1
+            else:
+                skipped += 1
+            if time.perf_counter() - slice_start > self.YIELD_INTERVAL:
+                await asyncio.sleep(0)
+                slice_start = time.perf_counter()
+        return played, skipped
+
+def serve(host: str, port: int, game_list: List[str], tick_rate: int = 80,
+          board_budget: float = None, report: bool = False) -> None:
+    """
+    Run the server headless until interrupted (SIGINT or SIGTERM)
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    AssetPack.mount(Common.ASSET_PACK, Common.GAME_NAME)
+    screen: Canvas = Canvas('Candy Cat server', 1000, 800, Common.START_MUSIC)
+    server: GameServer = GameServer(screen, game_list, tick_rate, board_budget, report)
+    asyncio.run(server.serve(host, port))
+    for board in list(server.boards):
+        board.close()
+    Canvas.quit()
@@ -0,0 +1,164 @@
+"""
+Save and restore the full state of a game in a compact binary form
+
+Layout (little endian):
+    header:  magic 'CCSS', version u16, flags u8 (bit 0: body is zlib compressed)
+    body:    tick u32, game index u16, game state u8, remaining balls i16,
+             current score i32, score i32, game time spent on the level (ns, i64),
+             ball x, y, change x, change y (f64),
+             player x, y, change x, change y, next x (f64),
+             message: length u16 + utf-8 lines separated by new lines,
+             cycle detector: right u8, down u8, bounces u32, escapes u32,
+             history: count u16 + for each its state (5 x i32) and bounce u32,
+             scrolling level: scrolls u8, camera x i32, bytes per chunk u32,
+             chunks loaded: count u16 + u32 each in loading order,
+             chunks changed: count u32 + for each its index u32 and its cells
+             (see ScrollingLevel.get_state),
+             bricks: count u32 + one u8 per brick (remaining bumps, 255 if unbreakable),
+             none for a scrolling level: the bumps are in the cells of the chunks
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Tuple, TYPE_CHECKING
+import struct
+import zlib
+from services.game_state import GameState
+if TYPE_CHECKING:
+    from services.create_scene_service import CreateSceneService
+    from services.scrolling_level_service import ScrollingLevel
+
+MAGIC: bytes = b'CCSS'
+VERSION: int = 6
+COMPRESSED: int = 1
+UNBREAKABLE: int = 255
+HEADER: struct.Struct = struct.Struct('<4sHB')
+GAME: struct.Struct = struct.Struct('<IHBhiiq')
+MOVING_SPRITES: struct.Struct = struct.Struct('<9d')
+LENGTH: struct.Struct = struct.Struct('<H')
+COUNT: struct.Struct = struct.Struct('<I')
+SCROLLING: struct.Struct = struct.Struct('<?iIH')
+CYCLE_DETECTOR: struct.Struct = struct.Struct('<??IIH')
+BOUNCE: struct.Struct = struct.Struct('<5iI')
+
+class GameSnapshot:
+    """
+    Encode / decode the state of a CreateSceneService
+    """
+    @staticmethod
+    def take(scene: CreateSceneService, compress: bool = False) -> bytes:
+        """
+        Serialize the game
+        """
+        ball_x, ball_y, ball_change_x, ball_change_y = scene.ball.get_movement()
+        player_x, player_y, player_change_x, player_change_y = scene.player.get_movement()
+        next_position_x: float = scene.player.get_next_position_x()
+        message: bytes = '\n'.join(scene.message).encode('utf-8')
+        right, down, number_bounces, number_escapes, history = scene.cycle_detector.get_state()
+        scrolling: List[bytes] = [SCROLLING.pack(False, 0, 0, 0), COUNT.pack(0)]
+        level: ScrollingLevel = scene.scrolling_level
+        if level is not None:
+            loaded_chunks, cells = level.get_state()
+            scrolling = [SCROLLING.pack(True, level.camera_x,
+                                        level.chunk_file.rows * level.CHUNK_COLUMNS,
+                                        len(loaded_chunks)),
+                         array('I', loaded_chunks).tobytes(), COUNT.pack(len(cells))]
+            for chunk, chunk_cells in cells.items():
+                scrolling += [COUNT.pack(chunk), chunk_cells]
+        bumps: bytes = b''
+        if level is None:
+            bumps = bytes(getattr(brick, 'number_remaining_bumps', UNBREAKABLE) \
+                          for brick in scene.bricks)
+
+        body: bytes = b''.join([
+            GAME.pack(scene.tick, scene.game_index, scene.game_state.value,
+                      scene.remaining_balls, scene.current_score, scene.score.get_score(),
+                      scene.clock.now_ns() - scene.level_start_ns),
+            MOVING_SPRITES.pack(ball_x, ball_y, ball_change_x, ball_change_y,
+                                player_x, player_y, player_change_x, player_change_y,
+                                next_position_x),
+            LENGTH.pack(len(message)), message,
+            CYCLE_DETECTOR.pack(right, down, number_bounces, number_escapes, len(history)),
+            *(BOUNCE.pack(*state, bounce) for state, bounce in history),
+            *scrolling,
+            COUNT.pack(len(bumps)), bumps])
+        if compress:
+            body = zlib.compress(body)
+        return HEADER.pack(MAGIC, VERSION, COMPRESSED if compress else 0) + body
+
+    @staticmethod
+    def restore(scene: CreateSceneService, snapshot: bytes) -> None:
+        """
+        Rebuild the level saved in the snapshot and put everything back in place
+        """
+        magic, version, flags = HEADER.unpack_from(snapshot, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a snapshot this version can restore')
+        body: bytes = snapshot[HEADER.size:]
+        if flags & COMPRESSED:
+            body = zlib.decompress(body)
+
+        offset: int = 0
+        tick, game_index, game_state, remaining_balls, current_score, score, level_ns = \
+            GAME.unpack_from(body, offset)
+        offset += GAME.size
+        moving_sprites: Tuple = MOVING_SPRITES.unpack_from(body, offset)
+        offset += MOVING_SPRITES.size
+        (message_length,) = LENGTH.unpack_from(body, offset)
+        offset += LENGTH.size
+        message: str = body[offset:offset + message_length].decode('utf-8')
+        offset += message_length
+        right, down, number_bounces, number_escapes, history_length = \
+            CYCLE_DETECTOR.unpack_from(body, offset)
+        offset += CYCLE_DETECTOR.size
+        history: List[Tuple[Tuple, int]] = []
+        for _ in range(history_length):
+            *state, bounce = BOUNCE.unpack_from(body, offset)
+            offset += BOUNCE.size
+            history.append((tuple(state), bounce))
+        scrolls, camera_x, chunk_size, number_loaded_chunks = SCROLLING.unpack_from(body, offset)
+        offset += SCROLLING.size
+        loaded_chunks: array = array('I')
+        loaded_chunks.frombytes(body[offset:offset + number_loaded_chunks * loaded_chunks.itemsize])
+        offset += number_loaded_chunks * loaded_chunks.itemsize
+        (number_chunks,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        cells: Dict[int, bytes] = {}
+        for _ in range(number_chunks):
+            (chunk,) = COUNT.unpack_from(body, offset)
+            offset += COUNT.size
+            cells[chunk] = body[offset:offset + chunk_size]
+            offset += chunk_size
+        (number_bricks,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+        bumps: bytes = body[offset:offset + number_bricks]
+
+        scene.game_index = game_index
+        scene.current_score = current_score
+        scene.remaining_balls = remaining_balls
+        scene.create_game()
+        if scrolls != (scene.scrolling_level is not None):
+            raise ValueError(f'Snapshot and level {scene.game_list[game_index]} '
+                             'do not both scroll')
+        if scrolls:
+            # Bricks destroyed are not created again: the chunks replace the bumps
+            scene.scrolling_level.set_state(camera_x, loaded_chunks.tolist(), cells)
+            scene.bricks = scene.scrolling_level.get_bricks()
+            scene.player.set_view_x(camera_x)
+        elif len(scene.bricks) != number_bricks:
+            raise ValueError(f'Snapshot has {number_bricks} bricks, '
+                             f'level {scene.game_list[game_index]} has {len(scene.bricks)}')
+        bricks: List = scene.bricks
+        for index, remaining_bumps in enumerate(bumps):
+            if remaining_bumps != UNBREAKABLE:
+                bricks[index].restore_number_bumped(remaining_bumps)
+
+        scene.score.set_score(score)
+        scene.score.set_number_balls(remaining_balls)
+        scene.ball.set_movement(moving_sprites[0:4])
+        scene.player.set_movement(moving_sprites[4:8])
+        scene.player.set_next_position_x(moving_sprites[8])
+        scene.cycle_detector.set_state(right, down, number_bounces, number_escapes, history)
+        scene.message = message.split('\n') if message_length > 0 else []
+        scene.game_state = GameState(game_state)
+        scene.tick = tick
+        scene.level_start_ns = scene.clock.now_ns() - level_ns
@@ -0,0 +1,182 @@
+"""
+Generate levels of any size in the format read by BricksCreatorService
+"""
+from random import Random
+from typing import Iterator, List, Tuple
+from services.bricks_creator_service import ReadGame
+
+class Layout:
+    """
+    Layouts the generator knows
+    """
+    DENSE: str = 'dense'
+    CORRIDORS: str = 'corridors'
+    MAZE: str = 'maze'
+    TRAPS: str = 'traps'
+    ALL: Tuple[str, ...] = (DENSE, CORRIDORS, MAZE, TRAPS)
+
+class LevelGenerator:
+    """
+    Rows are generated one at a time from top to bottom and only the row
+    being built is kept: a level of millions of cells is written in memory
+    proportional to its width. The same seed gives the same level.
+    density is the probability that a free cell holds a brick.
+    """
+    UNBREAKABLE: str = 'U'
+    EMPTY: str = ' '
+    # Breakable bricks need 1 to MAX_BUMPS bumps, some are poisoned
+    MAX_BUMPS: int = 3
+    POISONED_RATE: float = 0.05
+    # Share of the bricks of a dense field which are unbreakable
+    UNBREAKABLE_RATE: float = 0.1
+    # Rows between two walls of corridors, doors per wall
+    CORRIDOR_HEIGHT: int = 4
+    DOOR_WIDTH: int = 2
+    # Side of a trap, the cup opening downwards around its brick
+    TRAP_SIZE: int = 5
+
+    def __init__(self, layout: str, columns: int, rows: int, seed: int = 0,
+                 density: float = 0.5):
+        if layout not in Layout.ALL:
+            raise ValueError(f'Unknown layout {layout}, expected one of {", ".join(Layout.ALL)}')
+        if columns < 3 or rows < 3:
+            raise ValueError('A level has at least 3 columns and 3 rows')
+        self.layout: str = layout
+        self.columns: int = columns
+        self.rows: int = rows
+        self.seed: int = seed
+        self.density: float = density
+
+    def generate(self) -> Iterator[str]:
+        """
+        Rows of the level, each ending with a new line
+        """
+        random: Random = Random(self.seed)
+        rows: Iterator[List[str]] = {
+            Layout.DENSE: self.__dense,
+            Layout.CORRIDORS: self.__corridors,
+            Layout.MAZE: self.__maze,
+            Layout.TRAPS: self.__traps,
+        }[self.layout](random)
+        for _, row in zip(range(self.rows), rows):
+            yield ''.join(row) + '\n'
+
+    def write(self, file_name: str) -> int:
+        """
+        Stream the level to a file, return the number of bricks
+        """
+        number_bricks: int = 0
+        with open(file_name, 'w', encoding='utf-8') as file:
+            for row in self.generate():
+                number_bricks += len(row) - 1 - row.count(self.EMPTY)
+                file.write(row)
+        return number_bricks
+
+    def __brick(self, random: Random) -> str:
+        """
+        A breakable or a poisoned brick
+        """
+        bumps: int = random.randint(1, self.MAX_BUMPS)
+        if random.random() < self.POISONED_RATE:
+            return chr(ord('P') + bumps)
+        return str(bumps)
+
+    def __fill(self, random: Random) -> str:
+        """
+        A free cell: a brick with probability density
+        """
+        return self.__brick(random) if random.random() < self.density else self.EMPTY
+
+    def __dense(self, random: Random) -> Iterator[List[str]]:
+        """
+        Bricks everywhere, some of them unbreakable
+        """
+        while True:
+            row: List[str] = []
+            for _ in range(self.columns):
+                if random.random() >= self.density:
+                    row.append(self.EMPTY)
+                elif random.random() < self.UNBREAKABLE_RATE:
+                    row.append(self.UNBREAKABLE)
+                else:
+                    row.append(self.__brick(random))
+            yield row
+
+    def __corridors(self, random: Random) -> Iterator[List[str]]:
+        """
+        Horizontal unbreakable walls with a few doors, bricks in between
+        """
+        doors: int = max(1, self.columns // 20)
+        index: int = 0
+        while True:
+            if index % self.CORRIDOR_HEIGHT == self.CORRIDOR_HEIGHT - 1:
+                row: List[str] = [self.UNBREAKABLE] * self.columns
+                for _ in range(doors):
+                    door: int = random.randrange(self.columns - self.DOOR_WIDTH + 1)
+                    row[door:door + self.DOOR_WIDTH] = [self.EMPTY] * self.DOOR_WIDTH
+            else:
+                row = [self.__fill(random) for _ in range(self.columns)]
+            yield row
+            index += 1
+
+    def __maze(self, random: Random) -> Iterator[List[str]]:
+        """
+        Perfect maze built with the sidewinder algorithm, which only needs
+        the current row: each run of cells carved eastwards is linked to the
+        row above through one of its cells. Walls are unbreakable, passages
+        hold bricks.
+        """
+        cells: int = (self.columns - 1) // 2
+        # The rightmost column is a wall when columns is even
+        padding: List[str] = [self.UNBREAKABLE] * (self.columns - 2 * cells - 1)
+        yield [self.UNBREAKABLE] * self.columns
+        first: bool = True
+        while True:
+            above: List[str] = [self.UNBREAKABLE] * self.columns
+            row: List[str] = [self.UNBREAKABLE] * self.columns
+            run_start: int = 0
+            for cell in range(cells):
+                row[2 * cell + 1] = self.__fill(random)
+                close_run: bool = cell == cells - 1 or (not first and random.random() < 0.5)
+                if not close_run:
+                    row[2 * cell + 2] = self.__fill(random)
+                    continue
+                if not first:
+                    north: int = random.randint(run_start, cell)
+                    above[2 * north + 1] = self.__fill(random)
+                run_start = cell + 1
+            if not first:
+                yield above[:self.columns - len(padding)] + padding
+            yield row[:self.columns - len(padding)] + padding
+            first = False
+
+    def __traps(self, random: Random) -> Iterator[List[str]]:
+        """
+        Bands of cups opening downwards with a brick at the back: the ball
+        goes in from below and bounces around inside. A slot holds a cup
+        with probability density, bricks are scattered between them.
+        """
+        size: int = self.TRAP_SIZE
+        while True:
+            offset: int = random.randrange(size)
+            band: List[List[str]] = [[self.EMPTY] * self.columns for _ in range(size)]
+            for left in range(offset, self.columns - size + 1, size + 1):
+                if random.random() >= self.density:
+                    band[random.randrange(size)][left + size // 2] = self.__brick(random)
+                    continue
+                band[0][left:left + size] = [self.UNBREAKABLE] * size
+                for line in band[1:size - 1]:
+                    line[left] = line[left + size - 1] = self.UNBREAKABLE
+                band[1][left + size // 2] = self.__brick(random)
+            yield from band
+
+class GeneratedLevel(ReadGame): # pylint: disable=too-few-public-methods
+    """
+    A generated level read without going through a file
+    """
+    def __init__(self, generator: LevelGenerator):
+        super().__init__(f'{generator.layout}-{generator.columns}x{generator.rows}')
+        self.generator: LevelGenerator = generator
+
+    def read_game(self) -> List[str]:
+        return list(self.generator.generate())
@@ -0,0 +1,44 @@
+"""
+Replay a recorded session headless and as fast as possible
+"""
+import os
+import time
+from domain.common import Common
+from services.create_scene_service import CreateSceneService
+from infrastructure.asset_pack import AssetPack
+from infrastructure.gui_library import Canvas
+from infrastructure.input_recording import InputLog
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+def replay(record_file_name: str) -> bool:
+    """
+    Feed the recorded inputs to the game loop without rendering nor waiting
+    for the next frame. Return True when every recorded state hash matched
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    input_log: InputLog = InputLog(record_file_name)
+    AssetPack.mount(Common.ASSET_PACK, Common.GAME_NAME)
+    screen_width, screen_height = input_log.screen_size
+    screen: Canvas = Canvas('Candy Cat replay', screen_width, screen_height, Common.START_MUSIC)
+
+    start_time: float = time.perf_counter()
+    create_scene_service: CreateSceneService = CreateSceneService(
+        input_log.game_list, screen, input_log=input_log,
+        score_saver=SqliteScoreSaver(':memory:'), render=False)
+    while create_scene_service.tick <= input_log.last_tick and \
+          not create_scene_service.is_done():
+        create_scene_service.update_game_scene()
+    duration: float = time.perf_counter() - start_time
+
+    create_scene_service.close()
+    Canvas.quit()
+    mismatches = create_scene_service.hash_mismatch_ticks
+    print(f'Replayed {create_scene_service.tick} ticks in {duration:.2f} s '
+          f'({create_scene_service.tick / max(duration, 1e-9):,.0f} ticks/s), '
+          f'{len(input_log.state_hashes)} state hashes checked')
+    if len(mismatches) > 0:
+        print(f'ERROR: replay diverged from the recording at tick {mismatches[0]} '
+              f'({len(mismatches)} mismatching hashes)')
+        return False
+    return True
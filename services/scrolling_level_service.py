@@ -0,0 +1,234 @@
+"""
+Levels too wide for the screen: bricks keep a readable size, the view
+scrolls horizontally with the ball and the level is streamed by chunks
+"""
+from typing import Dict, List, Tuple
+from domain.collision_handler.collision_handler_sprites import CollisionHandlerSprites
+from domain.sprites.base_classes.static_sprite import StaticSprite
+from domain.sprites.sprites import Ball
+from domain.sprites.sprites import BreakableBrick
+from domain.sprites.sprites import PoisonedBrick
+from services.bricks_creator_service import BricksCreatorService
+from services.bricks_creator_service import ReadGame
+from infrastructure.gui_library import Canvas
+from infrastructure.gui_library import SpriteBatch
+from infrastructure.read_game_from_file import LevelChunkFile
+
+class LevelChunk(ReadGame): # pylint: disable=too-few-public-methods
+    """
+    Rows of a chunk, read beforehand
+    """
+    def __init__(self, game_name: str, rows: List[str]):
+        super().__init__(game_name)
+        self.rows: List[str] = rows
+
+    def read_game(self) -> List[str]:
+        return self.rows
+
+class LoadedChunk: # pylint: disable=too-few-public-methods
+    """
+    Bricks of a chunk, what collides and what is drawn
+    """
+    def __init__(self, bricks: List[StaticSprite], colliders: List[StaticSprite],
+                 batch: SpriteBatch):
+        self.bricks: List[StaticSprite] = bricks
+        self.colliders: List[StaticSprite] = colliders
+        self.batch: SpriteBatch = batch
+
+class ScrollingLevel:
+    """
+    VIEW_COLUMNS columns of bricks fill the width of the screen, the camera
+    keeps the ball in the middle of the view. Chunks of CHUNK_COLUMNS columns
+    are loaded from disk when they come within LOAD_MARGIN chunks of the
+    view and evicted, their state saved, when they are more than
+    EVICT_MARGIN chunks away: the bricks in memory, collisions and drawing
+    only depend on the size of the view, never on the size of the level.
+    The collision handler is told how many breakable bricks are not loaded:
+    the level is won when they are all destroyed too. get_state / set_state
+    save and restore the camera, the chunks loaded and the cells of every
+    chunk not as in the level file anymore (snapshots).
+    """
+    VIEW_COLUMNS: int = 40
+    CHUNK_COLUMNS: int = 16
+    LOAD_MARGIN: int = 1
+    EVICT_MARGIN: int = 3
+
+    def __init__(self, screen: Canvas, game_name: str, from_height: int,
+                 collision_handler: CollisionHandlerSprites, fixed_point: bool = False):
+        self.screen: Canvas = screen
+        self.game_name: str = game_name
+        self.from_height: int = from_height
+        self.collision_handler: CollisionHandlerSprites = collision_handler
+        self.fixed_point: bool = fixed_point
+        self.chunk_file: LevelChunkFile = LevelChunkFile.open_level(game_name,
+                                                                    self.CHUNK_COLUMNS)
+        self.screen_width: int
+        screen_height: int
+        self.screen_width, screen_height = screen.get_screen_size()
+        # Whole pixels: cells are found back from the positions of the bricks
+        self.brick_size: Tuple[int, int] = (
+            self.screen_width // self.VIEW_COLUMNS,
+            3 * (screen_height - from_height) // (4 * max(self.chunk_file.rows, 1)))
+        self.world_width: int = self.chunk_file.columns * self.brick_size[0]
+        self.chunk_width: int = self.CHUNK_COLUMNS * self.brick_size[0]
+        self.camera_x: int = 0
+        self.chunks: Dict[int, LoadedChunk] = {}
+        self.bricks: List[StaticSprite] = []
+        self.number_chunks_loaded: int = 0
+        self.number_chunks_evicted: int = 0
+        self.collision_handler.live_bricks.add_elsewhere(self.chunk_file.number_breakable_bricks)
+        self.__stream()
+
+    def get_world_width(self) -> int:
+        return self.world_width
+
+    def get_smallest_brick_size(self) -> int:
+        return min(self.brick_size)
+
+    def get_bricks(self) -> List[StaticSprite]:
+        """
+        Bricks loaded, chunk after chunk
+        """
+        return self.bricks
+
+    def follow(self, ball: Ball) -> bool:
+        """
+        Move the camera with the ball and stream the chunks around the view,
+        True when chunks were loaded or evicted
+        """
+        ball_x, _ = ball.get_position()
+        camera_x: int = int(ball_x) + ball.get_width() // 2 - self.screen_width // 2
+        self.camera_x = max(0, min(camera_x, self.world_width - self.screen_width))
+        return self.__stream()
+
+    def get_state(self) -> Tuple[List[int], Dict[int, bytes]]:
+        """
+        Chunks loaded, in loading order, and the cells of the chunks loaded or
+        evicted: chunk_file.rows rows of CHUNK_COLUMNS bytes each
+        """
+        cells: Dict[int, bytes] = {chunk: self.__to_cells(self.chunk_file.read_chunk(chunk))
+                                   for chunk in sorted(self.chunk_file.saved_chunks)}
+        for chunk, loaded in self.chunks.items():
+            cells[chunk] = self.__to_cells(self.__get_rows(chunk, loaded))
+        return list(self.chunks), cells
+
+    def set_state(self, camera_x: int, loaded_chunks: List[int], cells: Dict[int, bytes]) -> None:
+        """
+        Put back a state returned by get_state, on a level just created
+        """
+        chunk_size: int = self.chunk_file.rows * self.CHUNK_COLUMNS
+        for chunk in list(cells) + loaded_chunks:
+            if not 0 <= chunk < self.chunk_file.number_chunks or \
+               len(cells.get(chunk, bytes(chunk_size))) != chunk_size:
+                raise ValueError(f'Chunk {chunk} does not belong to level {self.game_name}')
+        for chunk in list(self.chunks):
+            self.__evict(chunk)
+        for chunk, chunk_cells in cells.items():
+            self.collision_handler.live_bricks.add_elsewhere(
+                LevelChunkFile.count_breakable(chunk_cells) -
+                LevelChunkFile.count_breakable(self.__to_cells(self.chunk_file.read_chunk(chunk))))
+            self.chunk_file.save_chunk(chunk, [
+                chunk_cells[first:first + self.CHUNK_COLUMNS].decode('latin-1') + '\n'
+                for first in range(0, chunk_size, self.CHUNK_COLUMNS)])
+        self.camera_x = camera_x
+        for chunk in loaded_chunks:
+            self.__load(chunk)
+        self.__stream()
+        self.bricks = [brick for chunk in sorted(self.chunks)
+                       for brick in self.chunks[chunk].bricks]
+
+    @staticmethod
+    def __to_cells(rows: List[str]) -> bytes:
+        return ''.join(row.rstrip('\n') for row in rows).encode('latin-1')
+
+    def __stream(self) -> bool:
+        """
+        Load what comes close to the view, evict what is far behind
+        """
+        first_visible: int = self.camera_x // self.chunk_width
+        last_visible: int = (self.camera_x + self.screen_width - 1) // self.chunk_width
+        changed: bool = False
+        for chunk in list(self.chunks):
+            if chunk < first_visible - self.EVICT_MARGIN or \
+               chunk > last_visible + self.EVICT_MARGIN:
+                self.__evict(chunk)
+                changed = True
+        for chunk in range(max(first_visible - self.LOAD_MARGIN, 0),
+                           min(last_visible + self.LOAD_MARGIN, self.chunk_file.number_chunks - 1)
+                           + 1):
+            if chunk not in self.chunks:
+                self.__load(chunk)
+                changed = True
+        if changed:
+            self.bricks = [brick for chunk in sorted(self.chunks)
+                           for brick in self.chunks[chunk].bricks]
+        return changed
+
+    def __load(self, chunk: int) -> None:
+        """
+        Create the bricks of the chunk, in the state they were evicted
+        """
+        rows: List[str] = self.chunk_file.read_chunk(chunk)
+        creator: BricksCreatorService = BricksCreatorService(
+            self.from_height, self.screen, LevelChunk(self.game_name, rows),
+            self.collision_handler, self.fixed_point, self.brick_size,
+            chunk * self.CHUNK_COLUMNS)
+        bricks: List[StaticSprite] = creator.create_bricks()
+        batch: SpriteBatch = SpriteBatch(self.screen)
+        for brick in bricks:
+            brick.set_batch(batch)
+        colliders: List[StaticSprite] = creator.get_colliders()
+        self.collision_handler.subscribe_static_sprites(colliders)
+        self.collision_handler.live_bricks.add_elsewhere(
+            -sum(1 for brick in bricks if brick.bring_points()))
+        self.chunks[chunk] = LoadedChunk(bricks, colliders, batch)
+        self.number_chunks_loaded += 1
+
+    def __evict(self, chunk: int) -> None:
+        """
+        Save the remaining bumps of the bricks of the chunk and forget them
+        """
+        loaded: LoadedChunk = self.chunks.pop(chunk)
+        rows: List[str] = self.__get_rows(chunk, loaded)
+        self.collision_handler.unsubscribe_sprites(loaded.colliders, inform_player_won=False)
+        self.collision_handler.live_bricks.add_elsewhere(
+            LevelChunkFile.count_breakable(self.__to_cells(rows)))
+        self.chunk_file.save_chunk(chunk, rows)
+        self.number_chunks_evicted += 1
+
+    def __get_rows(self, chunk: int, loaded: LoadedChunk) -> List[str]:
+        """
+        Rows of a loaded chunk with the remaining bumps of its bricks, as
+        LevelChunkFile.read_chunk returns them
+        """
+        brick_width, brick_height = self.brick_size
+        cells: List[List[str]] = [[LevelChunkFile.EMPTY.decode()] * self.CHUNK_COLUMNS
+                                  for _ in range(self.chunk_file.rows)]
+        for brick in loaded.bricks:
+            remaining_bumps: int = getattr(brick, 'number_remaining_bumps', -1)
+            if remaining_bumps == 0:
+                continue
+            pos_x, pos_y = brick.get_position()
+            column: int = int(pos_x) // brick_width - chunk * self.CHUNK_COLUMNS
+            row: int = (int(pos_y) - self.from_height) // brick_height
+            if isinstance(brick, BreakableBrick):
+                cells[row][column] = str(remaining_bumps)
+            elif isinstance(brick, PoisonedBrick):
+                cells[row][column] = chr(ord('P') + remaining_bumps)
+            else:
+                cells[row][column] = 'U'
+        return [''.join(row) + '\n' for row in cells]
+
+    def display_on_screen(self) -> None:
+        """
+        Only the chunks in the view are drawn, at the position of the camera
+        (see Canvas.set_camera)
+        """
+        for chunk, loaded in self.chunks.items():
+            left: int = chunk * self.chunk_width
+            if left < self.camera_x + self.screen_width and \
+               left + self.chunk_width > self.camera_x:
+                loaded.batch.display_on_screen()
+
+    def close(self) -> None:
+        self.chunk_file.close()
@@ -0,0 +1,48 @@
+"""
+Measure where the time goes between the start of the program and its first frames
+"""
+from typing import List, Tuple
+import cProfile
+import io
+import pstats
+import time
+
+class StartupProfiler:
+    """
+    Create it before any other import: marks are timed from its creation and,
+    when enabled, the main thread is profiled (imports included) until report
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self.start: float = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.profile: cProfile.Profile = None
+        if enabled:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def mark(self, phase: str) -> None:
+        """
+        The phase just ended
+        """
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter()))
+
+    def report(self, number_functions: int = 25) -> None:
+        """
+        Print the duration of each phase and the most expensive functions, only once
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.profile.disable()
+        print('Startup phases (ms):')
+        previous: float = self.start
+        for phase, mark_time in self.marks:
+            print(f'  {phase:<25} {(mark_time - previous) * 1000:8.1f}'
+                  f'  (at {(mark_time - self.start) * 1000:8.1f})')
+            previous = mark_time
+        output: io.StringIO = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats('cumulative')\
+            .print_stats(number_functions)
+        print(output.getvalue())
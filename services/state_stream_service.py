@@ -0,0 +1,59 @@
+"""
+Follow a game and encode its state after each tick
+"""
+from __future__ import annotations
+from typing import Dict, List, TYPE_CHECKING
+from infrastructure.state_stream import BoardState
+from infrastructure.state_stream import StateEncoder
+if TYPE_CHECKING:
+    from domain.sprites.base_classes.base_sprite import BaseSprite
+    from domain.sprites.base_classes.static_sprite import StaticSprite
+    from services.create_scene_service import CreateSceneService
+
+class SceneStateStream:
+    """
+    The bricks are not compared at each tick: only the sprites bumped
+    during the tick (see FrameEvents) may have changed
+    """
+    def __init__(self, scene: CreateSceneService,
+                 keyframe_interval: int = StateEncoder.KEYFRAME_INTERVAL):
+        self.scene: CreateSceneService = scene
+        self.encoder: StateEncoder = StateEncoder(keyframe_interval)
+        self.state: BoardState = BoardState()
+        # Bricks of the state and their index
+        self.bricks: List[StaticSprite] = None
+        self.brick_indexes: Dict[BaseSprite, int] = {}
+        self.changed_bricks: List[int] = []
+
+    def encode_tick(self, input_sequence: int = 0) -> bytes:
+        """
+        Frame describing the state of the scene after its last tick
+        """
+        scene: CreateSceneService = self.scene
+        state: BoardState = self.state
+        new_level: bool = self.bricks is not scene.bricks
+        self.changed_bricks.clear()
+        if new_level:
+            self.bricks = scene.bricks
+            self.brick_indexes = {brick: index for index, brick in enumerate(self.bricks)}
+            state.bricks = bytearray(self.__get_remaining_bumps(brick) for brick in self.bricks)
+        else:
+            for sprite in scene.frame_events.get_last_bumped_sprites():
+                index: int = self.brick_indexes.get(sprite)
+                if index is not None:
+                    state.bricks[index] = self.__get_remaining_bumps(sprite)
+                    self.changed_bricks.append(index)
+        ball_x, ball_y = scene.ball.get_position()
+        paddle_x, _ = scene.player.get_position()
+        state.tick = scene.tick
+        state.game_index = scene.game_index
+        state.set_fields((round(ball_x), round(ball_y), round(paddle_x), scene.score.get_score(),
+                          scene.remaining_balls, scene.game_state.value, input_sequence))
+        return self.encoder.encode(state, self.changed_bricks, new_level)
+
+    @staticmethod
+    def __get_remaining_bumps(brick: BaseSprite) -> int:
+        """
+        255 for unbreakable bricks
+        """
+        return min(getattr(brick, 'number_remaining_bumps', 255), 255)
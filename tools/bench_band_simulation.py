@@ -0,0 +1,111 @@
+"""
+Scaling of the band simulation: hundreds of balls bounce on a generated
+giant level played by 1, 2, 4 and 8 worker processes. Prints the ticks per
+second and the speedup of each number of workers, all of them must end in
+the same state: exits with status 1 otherwise.
+With --render the main process draws a frame every --frame-ticks ticks
+while the workers play the next ones.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/bench_band_simulation.py --columns 1000 --rows 1000 --balls 512
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+import numpy as np
+import pygame
+from domain.common import Common
+from domain.fixed_point import FixedPoint
+from infrastructure.gui_library import Canvas
+from services.band_simulation_service import BandSimulation
+from services.band_simulation_service import SharedBoard
+from services.level_generator_service import GeneratedLevel
+from services.level_generator_service import Layout
+from services.level_generator_service import LevelGenerator
+
+def draw(screen: Canvas, frame: Tuple[np.ndarray, np.ndarray]) -> None:
+    """
+    The whole level shrunk to the screen, one pixel per ball
+    """
+    cells, balls = frame
+    screen_width, screen_height = screen.get_screen_size()
+    rows, columns = cells.shape
+    # Nearest cell of each pixel
+    shown: np.ndarray = cells[np.arange(screen_height) * rows // screen_height][
+        :, np.arange(screen_width) * columns // screen_width]
+    colors: np.ndarray = np.zeros((screen_height, screen_width, 3), np.uint8)
+    colors[shown == SharedBoard.UNBREAKABLE] = Common.blue
+    colors[(shown != 0) & (shown != SharedBoard.UNBREAKABLE)] = Common.green
+    ball_x: np.ndarray = (balls[0] * screen_width // columns) >> FixedPoint.FRACTION_BITS
+    ball_y: np.ndarray = (balls[1] * screen_height // rows) >> FixedPoint.FRACTION_BITS
+    colors[np.clip(ball_y, 0, screen_height - 1), np.clip(ball_x, 0, screen_width - 1)] = \
+        Common.red
+    screen.blit(pygame.surfarray.make_surface(colors.swapaxes(0, 1)), 0, 0)
+    screen.present()
+
+def bench(level: GeneratedLevel, balls: int, workers: int, ticks: int, frame_ticks: int,
+          screen: Canvas) -> Tuple[float, Tuple[int, int], str]:
+    """
+    Ticks per second, bumps and destroyed bricks, state hash at the end
+    """
+    simulation: BandSimulation = BandSimulation(level, balls, workers)
+    frames: int = 0
+    start: float = time.perf_counter()
+    for first_tick in range(0, ticks, frame_ticks):
+        frame: Tuple[np.ndarray, np.ndarray] = simulation.get_frame() \
+                                               if screen is not None else None
+        simulation.start_ticks(min(frame_ticks, ticks - first_tick))
+        if frame is not None:
+            draw(screen, frame)
+            frames += 1
+        simulation.wait_ticks()
+    elapsed: float = time.perf_counter() - start
+    stats: Tuple[int, int] = simulation.get_stats()
+    state_hash: str = simulation.get_state_hash()
+    simulation.close()
+    return ticks / elapsed, stats, state_hash
+
+def main() -> None:
+    """
+    Same level, same balls, more and more workers
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--layout', choices=Layout.ALL, default=Layout.MAZE)
+    parser.add_argument('--columns', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--balls', type=int, default=512)
+    parser.add_argument('--ticks', type=int, default=800)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--frame-ticks', type=int, default=8,
+                        help='ticks played by the workers between two frames')
+    parser.add_argument('--render', action='store_true',
+                        help='draw the frames, headless unless SDL_VIDEODRIVER is set')
+    arguments = parser.parse_args()
+
+    level: GeneratedLevel = GeneratedLevel(LevelGenerator(arguments.layout, arguments.columns,
+                                                          arguments.rows))
+    screen: Canvas = Canvas('Band simulation', 1000, 800, Common.START_MUSIC) \
+                     if arguments.render else None
+    print(f'{level.game_name}: {arguments.balls} balls, {arguments.ticks} ticks, '
+          f'{os.cpu_count()} CPUs')
+    results: List[Tuple[int, float, Tuple[int, int], str]] = []
+    for workers in arguments.workers:
+        rate, (bumps, destroyed), state_hash = bench(level, arguments.balls, workers,
+                                                     arguments.ticks, arguments.frame_ticks,
+                                                     screen)
+        results.append((workers, rate, (bumps, destroyed), state_hash))
+        print(f'{workers} workers: {rate:8,.0f} ticks/s, speedup {rate / results[0][1]:.2f}, '
+              f'{bumps} bumps, {destroyed} bricks destroyed, state {state_hash}')
+    if screen is not None:
+        Canvas.quit()
+    if len({state_hash for _, _, _, state_hash in results}) != 1:
+        print('ERROR: the number of workers changed the result of the simulation')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
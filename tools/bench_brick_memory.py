@@ -0,0 +1,85 @@
+"""
+Memory per brick: one object graph per brick against the BrickStore columns.
+Pixels allocated by SDL (images, the atlas) are not traced.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/bench_brick_memory.py --columns 100 --rows 1000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+# Imported before measuring: loading NumPy is not part of the memory of the store
+import numpy # pylint: disable=unused-import
+from domain.common import Common
+from domain.sprites.base_classes.static_sprite import StaticSprite
+from domain.sprites.brick_store import BrickStore
+from infrastructure.gui_library import Canvas, SpriteBatch
+from services.bricks_creator_service import BricksCreatorService
+from tools.bench_brick_rendering import GeneratedGame, NoCollision
+
+def measure(create: Callable[[], object]) -> Tuple[object, int, float]:
+    """
+    What create returns, the memory it still holds and how long it took
+    """
+    gc.collect()
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    created: object = create()
+    duration: float = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return created, size, duration
+
+def main() -> None:
+    """
+    Create the same level both ways
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--columns', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=1000)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('Brick memory', 1000, 800, Common.START_MUSIC)
+    game: GeneratedGame = GeneratedGame(arguments.columns, arguments.rows)
+    # Images are cached by the canvas: load them before measuring
+    BricksCreatorService(0, screen, GeneratedGame(6, 1), NoCollision()).create_bricks()
+
+    def create_objects() -> List[StaticSprite]:
+        bricks: List[StaticSprite] = BricksCreatorService(
+            0, screen, game, NoCollision()).create_bricks()
+        batch: SpriteBatch = SpriteBatch(screen)
+        for brick in bricks:
+            brick.set_batch(batch)
+        return bricks, batch
+
+    def create_store() -> BrickStore:
+        creator: BricksCreatorService = BricksCreatorService(0, screen, game, NoCollision())
+        store: BrickStore = creator.create_brick_store()
+        return store, creator.bricks
+
+    (bricks, _), objects_size, objects_duration = measure(create_objects)
+    number_bricks: int = len(bricks)
+    del bricks
+    (store, _), store_size, store_duration = measure(create_store)
+
+    print(f'{number_bricks} bricks')
+    print(f'{"":<24} {"bytes/brick":>12} {"MiB":>8} {"created in":>11}')
+    for label, size, duration in (('object graph', objects_size, objects_duration),
+                                  ('BrickStore + proxies', store_size, store_duration)):
+        print(f'{label:<24} {size / number_bricks:12.0f} {size / 2**20:8.1f} '
+              f'{duration:10.2f}s')
+    print(f'{"of which NumPy columns":<24} {store.get_nbytes() / number_bricks:12.0f}')
+    print(f'memory reduced {objects_size / store_size:.1f}x')
+    Canvas.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of brick drawing: one blit per brick against the batched renderer.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/bench_brick_rendering.py --columns 100 --rows 50
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.common import Common
+from domain.sprites.base_classes.static_sprite import StaticSprite
+from infrastructure.gui_library import BasicCanvas, Canvas, SpriteBatch
+from services.bricks_creator_service import BricksCreatorService, ReadGame
+
+class GeneratedGame(ReadGame): # pylint: disable=too-few-public-methods
+    """
+    Level full of breakable, unbreakable and poisoned bricks
+    """
+    def __init__(self, columns: int, rows: int):
+        super().__init__('generated')
+        self.columns: int = columns
+        self.rows: int = rows
+
+    def read_game(self) -> List[str]:
+        kinds: str = '123U5Q'
+        return [''.join(kinds[(row + column) % len(kinds)] for column in range(self.columns)) + '\n'
+                for row in range(self.rows)]
+
+class NoCollision: # pylint: disable=too-few-public-methods
+    """
+    Bricks only need a collision handler to be created
+    """
+
+class NullCanvas(BasicCanvas):
+    """
+    Draws nothing: what remains is the Python overhead of drawing
+    """
+    def blit(self, image, pox_x, pos_y) -> None:
+        pass
+
+    def blits(self, sequence) -> None:
+        pass
+
+def measure(label: str, frames: int, action) -> float:
+    """
+    Print and return the mean duration of a frame
+    """
+    start: float = time.perf_counter()
+    for _ in range(frames):
+        action()
+    duration: float = (time.perf_counter() - start) / frames
+    print(f'{label:<40} {duration * 1e3:9.3f} ms / frame')
+    return duration
+
+def main() -> None:
+    """
+    Draw the same bricks both ways
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--columns', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--frames', type=int, default=200)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('Brick rendering', 1000, 800, Common.START_MUSIC)
+    bricks: List[StaticSprite] = BricksCreatorService(
+        0, screen, GeneratedGame(arguments.columns, arguments.rows), NoCollision()).create_bricks()
+    batch: SpriteBatch = SpriteBatch(screen)
+    for brick in bricks:
+        brick.set_batch(batch)
+    print(f'{len(bricks)} bricks, atlas {batch.atlas.surface.get_size()}')
+
+    def one_blit_per_brick() -> None:
+        for brick in bricks:
+            brick.display_on_screen()
+    one_by_one: float = measure('one blit per brick', arguments.frames, one_blit_per_brick)
+    batched: float = measure('batched Surface.blits', arguments.frames, batch.display_on_screen)
+    print(f'speed up {one_by_one / batched:.1f}x')
+
+    null_canvas: NullCanvas = NullCanvas()
+    for brick in bricks:
+        brick.image.image.screen = null_canvas
+    batch.screen = null_canvas
+    python_one_by_one: float = measure('python overhead, one blit per brick',
+                                       arguments.frames, one_blit_per_brick)
+    python_batched: float = measure('python overhead, batched',
+                                    arguments.frames, batch.display_on_screen)
+    print(f'python overhead reduced {python_one_by_one / python_batched:,.0f}x')
+    Canvas.quit()
+
+if __name__ == '__main__':
+    main()
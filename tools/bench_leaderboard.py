@@ -0,0 +1,73 @@
+"""
+Benchmark of the SQLite leaderboard.
+Run from the candy_cat directory:
+python3 tools/bench_leaderboard.py --rows 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Iterator, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from repository.sqlite_score_saver import SqliteScoreSaver # pylint: disable=wrong-import-position
+
+LEVELS = ['game1', 'game2', 'game3', 'game4']
+
+def generate_rows(rows: int) -> Iterator[Tuple[str, int, str, str]]:
+    """
+    Random scores spread over levels and 365 days
+    """
+    generator: random.Random = random.Random(42)
+    for index in range(rows):
+        yield (f'player{index % 5000}', generator.randint(-2000, 100000),
+               LEVELS[index % len(LEVELS)], f'2026-{1 + index % 12:02d}-{1 + index % 28:02d}')
+
+def measure(label: str, repeat: int, action) -> None:
+    """
+    Print the mean duration of an action
+    """
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    duration: float = (time.perf_counter() - start) / repeat
+    print(f'{label:<40} {duration * 1e6:12.1f} us')
+
+def main() -> None:
+    """
+    Fill a database and time the leaderboard operations
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--database', default='bench_scores.db')
+    parser.add_argument('--keep', action='store_true', help='keep the database afterwards')
+    arguments = parser.parse_args()
+
+    for suffix in ['', '-wal', '-shm']:
+        if os.path.exists(arguments.database + suffix):
+            os.remove(arguments.database + suffix)
+    leaderboard: SqliteScoreSaver = SqliteScoreSaver(arguments.database)
+
+    start: float = time.perf_counter()
+    imported: int = leaderboard.import_scores(generate_rows(arguments.rows), 100_000)
+    duration: float = time.perf_counter() - start
+    print(f'Imported {imported} rows in {duration:.1f} s ({imported / duration:,.0f} rows/s)')
+
+    generator: random.Random = random.Random(7)
+    measure('append_score', 1000, lambda: leaderboard.append_score(
+        'bench', generator.randint(0, 100000), [], 'game1'))
+    measure('top_scores(10)', 1000, lambda: leaderboard.top_scores(10))
+    measure('top_scores(10, level)', 1000, lambda: leaderboard.top_scores(10, 'game2'))
+    measure('top_scores(10, day)', 1000, lambda: leaderboard.top_scores(10, None, '2026-03-03'))
+    measure('rank_of(score, at_most=10)', 1000, lambda: leaderboard.rank_of(
+        generator.randint(0, 100000), 10))
+    measure('rank_of(high score)', 100, lambda: leaderboard.rank_of(99000))
+    measure('rank_of(median score)', 3, lambda: leaderboard.rank_of(50000))
+    leaderboard.close()
+    if not arguments.keep:
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(arguments.database + suffix):
+                os.remove(arguments.database + suffix)
+
+if __name__ == '__main__':
+    main()
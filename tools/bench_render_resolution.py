@@ -0,0 +1,62 @@
+"""
+Fill rate of the render pipeline: the game drawn at a render resolution and
+scaled to the window, for several render / window sizes and scaling modes.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/bench_render_resolution.py --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.common import Common
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+MODES: List[Tuple[str, Tuple[int, int], Tuple[int, int], bool]] = [
+    ('native 1000x800', (1000, 800), None, False),
+    ('native 3840x2160', (3840, 2160), None, False),
+    ('1000x800 -> 3840x2160 nearest', (1000, 800), (3840, 2160), False),
+    ('1000x800 -> 3840x2160 smooth', (1000, 800), (3840, 2160), True),
+    ('1920x1080 -> 3840x2160 nearest', (1920, 1080), (3840, 2160), False),
+    ('1920x1080 -> 3840x2160 smooth', (1920, 1080), (3840, 2160), True),
+]
+
+def main() -> None:
+    """
+    Draw the first level in each mode
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=300)
+    arguments = parser.parse_args()
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+    print(f'{"mode":<32} {"ms/frame":>9} {"Mpixel/frame":>13} {"Mpixel/s":>9}')
+    for label, (render_width, render_height), window_size, smooth_scale in MODES:
+        screen: Canvas = Canvas('Render resolution', render_width, render_height,
+                                Common.START_MUSIC, window_size, smooth_scale)
+        scene: CreateSceneService = CreateSceneService(
+            [Common.GAME_NAME + 'assets/levels/game1'], screen,
+            score_saver=SqliteScoreSaver(':memory:'))
+        scene.next_task()
+        start: float = time.perf_counter()
+        for _ in range(arguments.frames):
+            scene.update_game_scene()
+            screen.present()
+        duration: float = (time.perf_counter() - start) / arguments.frames
+        # The frame is cleared at render resolution, the scale pass writes the window
+        pixels: int = render_width * render_height
+        if window_size is not None:
+            pixels += window_size[0] * window_size[1]
+        print(f'{label:<32} {duration * 1e3:9.2f} {pixels / 1e6:13.2f} '
+              f'{pixels / 1e6 / duration:9.0f}')
+        scene.close()
+    Canvas.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Cycle detection on a level built to trap the ball: played by the perfect
+autopilot, the ball loops between the paddle and the unbreakable bricks
+without ever reaching the last breakable brick. The paddle touches the ball
+all the time, the old timeout never fired there. The cycle detector must
+send the ball out of its loop so that the level is won within BUDGET ticks.
+Exits with status 1 otherwise.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/check_cycle_detection.py --level trap
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.autopilot import Autopilot
+from domain.common import Common
+from domain.metrics import Metrics
+from domain.sprites.sprites import Ball
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+# 50 seconds at 80 ticks per second
+BUDGET: int = 4000
+TICKS_PER_SECOND: int = 80
+
+def main() -> None:
+    """
+    Play the trap level until it is won
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--level', default='trap')
+    parser.add_argument('--ticks', type=int, default=2 * BUDGET, help='ticks at most')
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('Cycle detection', 1000, 800, Common.START_MUSIC)
+    scene: CreateSceneService = CreateSceneService(
+        [Common.GAME_NAME + 'assets/levels/' + arguments.level], screen,
+        score_saver=SqliteScoreSaver(':memory:'), render=False)
+    Metrics.set('cycle_detector.escapes', 0)
+    escape_ticks: List[int] = []
+    autopilot: Autopilot = None
+    ball: Ball = None
+    won_tick: int = None
+    start: float = time.perf_counter()
+    for tick in range(arguments.ticks):
+        if scene.game_state == GameState.WAITING_PLAYER_READY_BEFORE_NEXT_LEVEL:
+            won_tick = tick
+            break
+        if scene.game_state != GameState.PLAYING:
+            scene.next_task()
+        if scene.ball is not ball:
+            ball = scene.ball
+            autopilot = Autopilot(scene.player, ball, scene.collision_handler.exposed_faces)
+        autopilot.update()
+        scene.update_game_scene()
+        if Metrics.get('cycle_detector.escapes') > len(escape_ticks):
+            escape_ticks.append(tick)
+    elapsed: float = time.perf_counter() - start
+    scene.close()
+    Canvas.quit()
+
+    print(f'{arguments.level}: {scene.cycle_detector.number_bounces} bounces, '
+          f'escapes at ticks {escape_ticks}, {elapsed:.2f}s')
+    if won_tick is None or won_tick > BUDGET:
+        print(f'ERROR: level not won within {BUDGET} ticks')
+        sys.exit(1)
+    print(f'won at tick {won_tick} ({won_tick / TICKS_PER_SECOND:.1f}s of play)')
+
+if __name__ == '__main__':
+    main()
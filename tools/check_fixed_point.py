@@ -0,0 +1,122 @@
+"""
+Fixed-point physics: the levels are played headless by the autopilot with
+integer physics in several fresh processes, each of them must go through
+exactly the same states (state hash of every tick). Every position, speed
+and brick bound must stay an integer. Prints the ticks per second of both
+physics. Exits with status 1 when something does not add up.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/check_fixed_point.py --ticks 5000 --processes 3
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from typing import List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.autopilot import Autopilot
+from domain.common import Common
+from domain.sprites.sprites import Ball
+from domain.sprites.sprites import GameMovingSprite
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+LEVELS: Tuple[str, ...] = ('game1', 'game2', 'game3', 'game4')
+
+def find_floats(scene: CreateSceneService) -> List[str]:
+    """
+    What is not an integer in the moving sprites of the scene
+    """
+    floats: List[str] = []
+    sprites: List[Tuple[str, GameMovingSprite]] = [('ball', scene.ball),
+                                                   ('player', scene.player)]
+    for name, sprite in sprites:
+        values = (*sprite.get_position(), sprite.change_x, sprite.change_y,
+                  sprite.remainder_x, sprite.remainder_y)
+        if not all(isinstance(value, int) for value in values):
+            floats.append(f'{name} {values}')
+    return floats
+
+def find_float_bricks(scene: CreateSceneService) -> List[str]:
+    """
+    Bricks whose bounds are not integers
+    """
+    floats: List[str] = []
+    for brick in scene.bricks:
+        values = (*brick.get_position(), brick.image.width, brick.image.height)
+        if not all(isinstance(value, int) for value in values):
+            floats.append(f'brick {values}')
+    return floats
+
+def play(level: str, ticks: int, fixed_point: bool) -> Tuple[str, float, List[str]]:
+    """
+    Digest of the state hashes of every tick, ticks per second and the
+    floats found in the physics. Called in a process of its own: a process
+    only opens the display once.
+    """
+    screen: Canvas = Canvas('Fixed point', 1000, 800, Common.START_MUSIC)
+    scene: CreateSceneService = CreateSceneService(
+        [Common.GAME_NAME + 'assets/levels/' + level], screen,
+        score_saver=SqliteScoreSaver(':memory:'), render=False, fixed_point=fixed_point)
+    digest = hashlib.blake2b(digest_size=16)
+    floats: List[str] = find_float_bricks(scene)[:1] if fixed_point else []
+    autopilot: Autopilot = None
+    ball: Ball = None
+    start: float = time.perf_counter()
+    for _ in range(ticks):
+        if scene.game_state != GameState.PLAYING:
+            scene.next_task()
+        if scene.ball is not ball:
+            ball = scene.ball
+            autopilot = Autopilot(scene.player, ball, scene.collision_handler.exposed_faces)
+        autopilot.update()
+        scene.update_game_scene()
+        digest.update(scene.get_state_hash().to_bytes(8, 'little'))
+        if fixed_point and len(floats) == 0:
+            floats = find_floats(scene)
+    elapsed: float = time.perf_counter() - start
+    scene.close()
+    Canvas.quit()
+    return digest.hexdigest(), ticks / elapsed, floats
+
+def main() -> None:
+    """
+    Play every level in each process and compare
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=3)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    errors: List[str] = []
+    # Spawned processes start from a fresh interpreter, hash seed included
+    context = multiprocessing.get_context('spawn')
+    for level in LEVELS:
+        with context.Pool(arguments.processes, maxtasksperchild=1) as pool:
+            results: List[Tuple[str, float, List[str]]] = pool.starmap(
+                play, [(level, arguments.ticks, False)] +
+                [(level, arguments.ticks, True)] * arguments.processes)
+        _, float_rate, _ = results.pop(0)
+        digests: List[str] = [digest for digest, _, _ in results]
+        fixed_rate: float = min(rate for _, rate, _ in results)
+        print(f'{level}: {arguments.ticks} ticks, {float_rate:,.0f} ticks/s with floats, '
+              f'{fixed_rate:,.0f} ticks/s in fixed point, states {digests[0][:16]}')
+        if len(set(digests)) != 1:
+            errors.append(f'{level}: the processes went through different states')
+        _, _, floats = results[0]
+        if len(floats) > 0:
+            errors.append(f'{level}: not an integer: {", ".join(floats)}')
+    for error in errors:
+        print(f'ERROR: {error}')
+    if len(errors) > 0:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Allocation budget of a frame in the steady state: the first level is played
+by an autopilot, then tracemalloc measures for each frame the memory allocated
+on top of what was allocated before it (peak) and what stays allocated
+(growth). The peak budget holds for PEAK_PERCENTILE % of the frames: a
+few expensive frames are not hidden by the mean of the cheap ones. Exits
+with status 1 when a budget is exceeded.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/check_frame_allocations.py --frames 500
+"""
+from array import array
+import argparse
+import os
+import sys
+import tracemalloc
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.common import Common
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+# Bytes per frame
+PEAK_BUDGET: int = 1024
+PEAK_PERCENTILE: int = 99
+GROWTH_BUDGET: int = 16
+
+def play_frame(scene: CreateSceneService, screen: Canvas) -> None:
+    """
+    The paddle follows the ball, a lost ball is played again
+    """
+    if scene.game_state == GameState.WAITING_PLAYER_READY_BEFORE_LEVEL_REPLAY:
+        scene.next_task()
+    ball_x, _ = scene.ball.get_position()
+    scene.player.mouse_position_move((ball_x + 10, 0))
+    scene.update_game_scene()
+    screen.present()
+
+def main() -> None:
+    """
+    Warm up, then measure
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--warm-up', type=int, default=200)
+    parser.add_argument('--frames', type=int, default=500)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('Frame allocations', 1000, 800, Common.START_MUSIC)
+    scene: CreateSceneService = CreateSceneService(
+        [Common.GAME_NAME + 'assets/levels/game1'], screen,
+        score_saver=SqliteScoreSaver(':memory:'))
+    scene.next_task()
+    for _ in range(arguments.warm_up):
+        play_frame(scene, screen)
+
+    # Allocated upfront: the measures must not allocate memory themselves
+    peaks: array = array('q', bytes(8 * arguments.frames))
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for frame in range(arguments.frames):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        play_frame(scene, screen)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[frame] = peak - before
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    scene.close()
+    Canvas.quit()
+
+    sorted_peaks: List[int] = sorted(peaks)
+    mean_peak: float = sum(sorted_peaks) / len(sorted_peaks)
+    percentile_peak: int = sorted_peaks[min(len(sorted_peaks) * PEAK_PERCENTILE // 100,
+                                            len(sorted_peaks) - 1)]
+    growth: float = (end - start) / arguments.frames
+    print(f'peak per frame: mean {mean_peak:.0f} bytes, median {sorted_peaks[len(sorted_peaks) // 2]}, '
+          f'{PEAK_PERCENTILE}th percentile {percentile_peak} (budget {PEAK_BUDGET}), '
+          f'max {sorted_peaks[-1]}')
+    print(f'growth per frame: {growth:.1f} bytes (budget {GROWTH_BUDGET})')
+    if percentile_peak > PEAK_BUDGET or growth > GROWTH_BUDGET:
+        print('ERROR: Allocation budget exceeded')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Game clock: pause and time scale against a fake monotonic source, then the
+level timer of the trap level played headless on virtual time. The level is
+paused with the P key for a while: nothing may move meanwhile, and the time
+shown when the level is cleared must only count the ticks played.
+Exits with status 1 when something does not add up.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/check_game_clock.py
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+import pygame
+from domain.autopilot import Autopilot
+from domain.common import Common
+from domain.game_clock import GameClock
+from domain.sprites.sprites import Ball
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+SECOND: int = GameClock.NANOSECONDS_PER_SECOND
+
+class FakeSource: # pylint: disable=too-few-public-methods
+    """
+    Monotonic time moved by hand
+    """
+    def __init__(self):
+        self.now_ns: int = 0
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+def check_clock() -> List[str]:
+    """
+    Errors found in the clock itself
+    """
+    errors: List[str] = []
+    source: FakeSource = FakeSource()
+    live: GameClock = GameClock(source=source)
+    steps: List[Tuple[str, int, float]] = [('run', 1, 1), ('pause', 5, 1), ('resume', 1, 2),
+                                           ('scale', 1, 5)]
+    for step, seconds, expected in steps:
+        if step == 'pause':
+            live.pause()
+        elif step == 'resume':
+            live.resume()
+        elif step == 'scale':
+            live.set_time_scale(3)
+        source.now_ns += seconds * SECOND
+        if live.now() != expected:
+            errors.append(f'live clock after {step}: {live.now()}s instead of {expected}s')
+
+    virtual: GameClock = GameClock(virtual=True, ticks_per_second=80)
+    for _ in range(80):
+        virtual.tick()
+    virtual.set_time_scale(1000)
+    for _ in range(80):
+        virtual.tick()
+    if virtual.now() != 1001:
+        errors.append(f'virtual clock: {virtual.now()}s instead of 1001s')
+    return errors
+
+def check_level_timer(level: str, pause_tick: int, pause_ticks: int) -> List[str]:
+    """
+    Errors found while playing the level
+    """
+    screen: Canvas = Canvas('Game clock', 1000, 800, Common.START_MUSIC)
+    scene: CreateSceneService = CreateSceneService(
+        [Common.GAME_NAME + 'assets/levels/' + level], screen,
+        score_saver=SqliteScoreSaver(':memory:'), render=False)
+    errors: List[str] = []
+    autopilot: Autopilot = None
+    ball: Ball = None
+    won_tick: int = None
+    paused_movement: Tuple[float, float, float, float] = None
+    start: float = time.perf_counter()
+    for tick in range(20000):
+        if scene.game_state == GameState.WAITING_PLAYER_READY_BEFORE_NEXT_LEVEL:
+            won_tick = tick
+            break
+        if scene.game_state != GameState.PLAYING:
+            scene.next_task()
+        if scene.ball is not ball:
+            ball = scene.ball
+            autopilot = Autopilot(scene.player, ball, scene.collision_handler.exposed_faces)
+        if tick in (pause_tick, pause_tick + pause_ticks):
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_p))
+        if scene.clock.is_paused():
+            if paused_movement is None:
+                paused_movement = ball.get_movement()
+            elif ball.get_movement() != paused_movement:
+                errors.append(f'the ball moved during the pause at tick {tick}')
+                break
+        else:
+            autopilot.update()
+        scene.update_game_scene()
+    elapsed: float = time.perf_counter() - start
+    scene.close()
+    Canvas.quit()
+
+    if won_tick is None:
+        return errors + [f'{level} not won']
+    # The pause starts and ends while processing the events of these ticks
+    expected: float = (won_tick - pause_ticks) / 80
+    print(f'{level}: won at tick {won_tick} after a pause of {pause_ticks} ticks, '
+          f'{scene.message[1]!r} in {elapsed:.2f}s '
+          f'({scene.get_level_time() / elapsed:.0f} times real time)')
+    if abs(scene.get_level_time() - expected) > 1e-9:
+        errors.append(f'level time {scene.get_level_time()}s instead of {expected}s')
+    return errors
+
+def main() -> None:
+    """
+    Check the clock then the level timer
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--level', default='trap')
+    parser.add_argument('--pause-tick', type=int, default=500)
+    parser.add_argument('--pause-ticks', type=int, default=400)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    errors: List[str] = check_clock()
+    errors += check_level_timer(arguments.level, arguments.pause_tick, arguments.pause_ticks)
+    for error in errors:
+        print(f'ERROR: {error}')
+    if len(errors) > 0:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Scrolling levels: a generated level much wider than the screen is played
+headless by the autopilot, every tick is drawn. The chunks loaded and the
+bricks in memory must stay bounded by the size of the view whatever the size
+of the level, and a chunk evicted then loaded again must come back with the
+bumps its bricks had. A snapshot taken at the end must restore the same
+camera, chunks and bricks. Exits with status 1 otherwise.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/check_scrolling_level.py --columns 20000 --rows 30
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.autopilot import Autopilot
+from domain.collision_handler.live_bricks import LiveBricks
+from domain.common import Common
+from domain.sprites.sprites import Ball
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from services.level_generator_service import Layout
+from services.level_generator_service import LevelGenerator
+from services.scrolling_level_service import ScrollingLevel
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+def get_bumps(level: ScrollingLevel, chunk: int) -> Dict[Tuple[int, int], int]:
+    """
+    Remaining bumps of the bricks of a loaded chunk by position
+    """
+    return {brick.get_position(): getattr(brick, 'number_remaining_bumps', -1)
+            for brick in level.chunks[chunk].bricks
+            if getattr(brick, 'number_remaining_bumps', -1) != 0}
+
+def check_eviction(scene: CreateSceneService) -> List[str]:
+    """
+    Bump the bricks of the first chunk, send the camera to the other end of
+    the level and back: the chunk must be evicted and come back as it was
+    """
+    level: ScrollingLevel = scene.scrolling_level
+    ball: Ball = scene.ball
+    position: Tuple[int, int] = ball.get_position()
+    for brick in level.chunks[0].bricks[:level.CHUNK_COLUMNS]:
+        brick.bumped({})
+    scene.frame_events.apply()
+    expected: Dict[Tuple[int, int], int] = get_bumps(level, 0)
+    ball.set_position(level.get_world_width() - ball.get_width(), position[1])
+    level.follow(ball)
+    if 0 in level.chunks:
+        return ['the first chunk was not evicted']
+    ball.set_position(*position)
+    level.follow(ball)
+    if get_bumps(level, 0) != expected:
+        return ['the first chunk came back in another state']
+    return []
+
+def get_level_state(scene: CreateSceneService) -> Tuple:
+    """
+    Camera, chunks loaded and cells of every chunk of the level
+    """
+    level: ScrollingLevel = scene.scrolling_level
+    loaded_chunks, cells = level.get_state()
+    for chunk in range(level.chunk_file.number_chunks):
+        if chunk not in cells:
+            cells[chunk] = ''.join(row.rstrip('\n')
+                                   for row in level.chunk_file.read_chunk(chunk)).encode('latin-1')
+    return (level.camera_x, loaded_chunks, cells,
+            scene.collision_handler.live_bricks.number_elsewhere, scene.ball.get_movement(),
+            [(brick.get_position(), getattr(brick, 'number_remaining_bumps', -1))
+             for brick in scene.bricks if getattr(brick, 'number_remaining_bumps', -1) != 0])
+
+def check_snapshot(scene: CreateSceneService, game_name: str, screen: Canvas) -> List[str]:
+    """
+    Restore a snapshot of the game in another game
+    """
+    restored: CreateSceneService = CreateSceneService(
+        [game_name], screen, score_saver=SqliteScoreSaver(':memory:'))
+    restored.restore_snapshot(scene.take_snapshot(compress=True))
+    errors: List[str] = []
+    if get_level_state(restored) != get_level_state(scene):
+        errors.append('the snapshot restored another state')
+    restored.close()
+    return errors
+
+def main() -> None:
+    """
+    Generate the level, check eviction, then play it
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--layout', choices=Layout.ALL, default=Layout.CORRIDORS)
+    parser.add_argument('--columns', type=int, default=20000)
+    parser.add_argument('--rows', type=int, default=30)
+    parser.add_argument('--ticks', type=int, default=20000)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    errors: List[str] = []
+    # Levels are read relatively to the current directory
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        game_name: str = os.path.join(os.path.relpath(directory), 'wide')
+        number_bricks: int = LevelGenerator(arguments.layout, arguments.columns,
+                                            arguments.rows).write(game_name + '.txt')
+        screen: Canvas = Canvas('Scrolling level', 1000, 800, Common.START_MUSIC)
+        scene: CreateSceneService = CreateSceneService(
+            [game_name], screen, score_saver=SqliteScoreSaver(':memory:'))
+        level: ScrollingLevel = scene.scrolling_level
+        if level is None:
+            print(f'ERROR: {arguments.columns} columns is not a scrolling level')
+            sys.exit(1)
+        errors.extend(check_eviction(scene))
+
+        view_chunks: int = -(-screen.get_screen_size()[0] // level.chunk_width) + 1
+        chunks_bound: int = view_chunks + 2 * level.EVICT_MARGIN
+        bricks_bound: int = chunks_bound * level.CHUNK_COLUMNS * arguments.rows
+        most_chunks: int = 0
+        most_bricks: int = 0
+        camera_range: Tuple[int, int] = (level.camera_x, level.camera_x)
+        autopilot: Autopilot = None
+        ball: Ball = None
+        start: float = time.perf_counter()
+        for _ in range(arguments.ticks):
+            if scene.game_state != GameState.PLAYING:
+                scene.next_task()
+            if scene.ball is not ball:
+                ball = scene.ball
+                autopilot = Autopilot(scene.player, ball, scene.collision_handler.exposed_faces)
+            autopilot.update()
+            scene.update_game_scene()
+            most_chunks = max(most_chunks, len(level.chunks))
+            most_bricks = max(most_bricks, len(scene.bricks))
+            camera_range = (min(camera_range[0], level.camera_x),
+                            max(camera_range[1], level.camera_x))
+        elapsed: float = time.perf_counter() - start
+        errors.extend(check_snapshot(scene, game_name, screen))
+        print(f'{game_name}: {arguments.columns}x{arguments.rows}, {number_bricks} bricks, '
+              f'{level.chunk_file.number_chunks} chunks of {level.CHUNK_COLUMNS} columns')
+        print(f'{arguments.ticks} ticks in {elapsed:.2f}s, camera from {camera_range[0]} '
+              f'to {camera_range[1]}, {level.number_chunks_loaded} chunks loaded, '
+              f'{level.number_chunks_evicted} evicted, at most {most_chunks} chunks '
+              f'and {most_bricks} bricks in memory, score {scene.score.get_score()}')
+        live_bricks: LiveBricks = scene.collision_handler.live_bricks
+        print(f'{len(live_bricks)} live colliders, '
+              f'{live_bricks.get_number_to_destroy()} bricks left to destroy')
+        scene.close()
+        Canvas.quit()
+    if most_chunks > chunks_bound:
+        errors.append(f'{most_chunks} chunks loaded, more than {chunks_bound}')
+    if most_bricks > bricks_bound:
+        errors.append(f'{most_bricks} bricks in memory, more than {bricks_bound}')
+    for error in errors:
+        print(f'ERROR: {error}')
+    if len(errors) > 0:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
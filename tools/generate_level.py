@@ -0,0 +1,40 @@
+"""
+Write a generated level, to stress the game at any scale. The file is
+streamed: millions of cells only need memory for one row.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/generate_level.py --layout maze --columns 2001 --rows 2000 /tmp/maze
+then play it headless, e.g.:
+python3 candy_cat/tools/soak_autopilot.py --levels /tmp/maze
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+from services.level_generator_service import Layout
+from services.level_generator_service import LevelGenerator
+
+def main() -> None:
+    """
+    Generate and write the level
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('level', help='level file to write, without the .txt suffix')
+    parser.add_argument('--layout', choices=Layout.ALL, default=Layout.DENSE)
+    parser.add_argument('--columns', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--density', type=float, default=0.5,
+                        help='probability that a free cell holds a brick')
+    arguments = parser.parse_args()
+
+    generator: LevelGenerator = LevelGenerator(arguments.layout, arguments.columns,
+                                               arguments.rows, arguments.seed, arguments.density)
+    start: float = time.perf_counter()
+    number_bricks: int = generator.write(arguments.level + '.txt')
+    print(f'{arguments.level}.txt: {arguments.layout} {arguments.columns}x{arguments.rows}, '
+          f'{number_bricks} bricks in {time.perf_counter() - start:.2f}s')
+
+if __name__ == '__main__':
+    main()
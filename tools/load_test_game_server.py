@@ -0,0 +1,183 @@
+"""
+Load test of the game server: simulated players connect, start their game
+and move the paddle under the ball at each state received. The latency
+between an input and the first state which applied it is measured once
+every player is connected.
+Without --server a server is started on a free port for the test.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/load_test_game_server.py --players 1000 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pylint: disable=wrong-import-position
+from infrastructure.game_protocol import Buttons
+from infrastructure.game_protocol import INPUT
+from infrastructure.game_protocol import read_frame
+from infrastructure.state_stream import BoardState
+from infrastructure.state_stream import StateDecoder
+from services.game_state import GameState
+
+class Statistics:
+    """
+    Measures shared by all players
+    """
+    def __init__(self):
+        self.measuring: bool = False
+        self.latencies: List[float] = []
+        self.ticks: int = 0
+        self.bytes: int = 0
+        self.connected: int = 0
+        self.errors: int = 0
+
+async def play(host: str, port: int, statistics: Statistics) -> None:
+    """
+    One player: answer each state with an input
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        statistics.errors += 1
+        return
+    statistics.connected += 1
+    sequence: int = 0
+    measured_sequence: int = 0
+    sent: Dict[int, float] = {}
+    last_state: int = None
+    decoder: StateDecoder = StateDecoder()
+    try:
+        while True:
+            frame: bytes = await read_frame(reader)
+            now: float = time.perf_counter()
+            state: BoardState = decoder.decode(frame)
+            if state is None:
+                continue
+            applied_sequence: int = state.input_sequence
+            game_state: int = state.game_state
+            if statistics.measuring:
+                statistics.ticks += 1
+                statistics.bytes += len(frame) + 1
+                if applied_sequence > measured_sequence and applied_sequence in sent:
+                    statistics.latencies.append(now - sent[applied_sequence])
+            measured_sequence = max(measured_sequence, applied_sequence)
+            for old_sequence in [old for old in sent if old <= applied_sequence]:
+                del sent[old_sequence]
+
+            buttons: int = 0
+            if game_state != last_state:
+                if game_state == GameState.ASKING_USER_NAME.value:
+                    buttons = Buttons.VALIDATE
+                elif game_state != GameState.PLAYING.value:
+                    buttons = Buttons.START
+            last_state = game_state
+            sequence += 1
+            sent[sequence] = time.perf_counter()
+            writer.write(INPUT.pack(sequence, state.ball_x + 5, buttons))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest rank
+    """
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+async def load_test(host: str, port: int, players: int, connect_rate: float,
+                    duration: float) -> Statistics:
+    """
+    Connect the players, then measure for duration seconds
+    """
+    statistics: Statistics = Statistics()
+    tasks: List[asyncio.Task] = []
+    for _ in range(players):
+        tasks.append(asyncio.create_task(play(host, port, statistics)))
+        await asyncio.sleep(1.0 / connect_rate)
+    # Wait until the server created all the boards
+    while statistics.connected + statistics.errors < players:
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(2.0)
+    statistics.measuring = True
+    await asyncio.sleep(duration)
+    statistics.measuring = False
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return statistics
+
+def start_server(tick_rate: int) -> Tuple[subprocess.Popen, int]:
+    """
+    Server on a free port of the loopback, ready to accept players
+    """
+    with socket.socket() as free_socket:
+        free_socket.bind(('127.0.0.1', 0))
+        port: int = free_socket.getsockname()[1]
+    repository: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server: subprocess.Popen = subprocess.Popen( # pylint: disable=consider-using-with
+        [sys.executable, os.path.basename(repository), '--serve', f'127.0.0.1:{port}',
+         '--tick-rate', str(tick_rate)], cwd=os.path.dirname(repository))
+    deadline: float = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, port
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    print('ERROR: the server did not start')
+    sys.exit(1)
+
+def main() -> None:
+    """
+    Run the load test and print the latency percentiles
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--server', metavar='HOST:PORT',
+                        help='server to test, one is started when not given')
+    parser.add_argument('--players', type=int, default=1000)
+    parser.add_argument('--connect-rate', type=float, default=200,
+                        help='players connecting per second')
+    parser.add_argument('--duration', type=float, default=20, help='seconds measured')
+    parser.add_argument('--tick-rate', type=int, default=80,
+                        help='tick rate of the server started by the test')
+    arguments = parser.parse_args()
+
+    server: subprocess.Popen = None
+    if arguments.server is None:
+        server, port = start_server(arguments.tick_rate)
+        host: str = '127.0.0.1'
+    else:
+        host, port = arguments.server.rsplit(':', 1)
+        port = int(port)
+    try:
+        statistics: Statistics = asyncio.run(load_test(
+            host, port, arguments.players, arguments.connect_rate, arguments.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies: List[float] = sorted(statistics.latencies)
+    print(f'{statistics.connected} players connected, {statistics.errors} failed')
+    print(f'{statistics.ticks / arguments.duration / max(statistics.connected, 1):.1f} '
+          f'ticks/s per player, '
+          f'{statistics.bytes / arguments.duration / max(statistics.connected, 1):.0f} '
+          f'bytes/s per player')
+    if len(latencies) == 0:
+        print('ERROR: no state received')
+        sys.exit(1)
+    print('input to state latency (ms): ' +
+          ', '.join(f'p{label} {percentile(latencies, fraction) * 1e3:.1f}'
+                    for label, fraction in (('50', 0.5), ('90', 0.9), ('99', 0.99),
+                                            ('99.9', 0.999))) +
+          f', max {latencies[-1] * 1e3:.1f}')
+
+if __name__ == '__main__':
+    main()
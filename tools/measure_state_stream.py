@@ -0,0 +1,98 @@
+"""
+Size of the state stream: each bundled level is played by an autopilot,
+its state is encoded after each tick and decoded back. The decoded state
+must match the scene, the stream must stay under BUDGET bytes per second.
+Exits with status 1 otherwise.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/measure_state_stream.py --ticks 8000
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.common import Common
+from infrastructure.gui_library import Canvas
+from infrastructure.state_stream import BoardState
+from infrastructure.state_stream import FrameKind
+from infrastructure.state_stream import StateDecoder
+from infrastructure.state_stream import split_frames
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from services.state_stream_service import SceneStateStream
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+# Bytes per second
+BUDGET: int = 4096
+TICKS_PER_SECOND: int = 80
+
+def get_scene_state(scene: CreateSceneService) -> BoardState:
+    """
+    State read from the scene without the stream, to check the stream
+    """
+    ball_x, ball_y = scene.ball.get_position()
+    paddle_x, _ = scene.player.get_position()
+    return BoardState(scene.tick, scene.game_index, round(ball_x), round(ball_y),
+                      round(paddle_x), scene.score.get_score(), scene.remaining_balls,
+                      scene.game_state.value, scene.tick,
+                      bytearray(min(getattr(brick, 'number_remaining_bumps', 255), 255)
+                                for brick in scene.bricks))
+
+def measure(level: str, screen: Canvas, ticks: int) -> bool:
+    """
+    Play the level, print the size of its stream. False when the stream
+    does not describe the scene or is over budget.
+    """
+    scene: CreateSceneService = CreateSceneService(
+        [level], screen, score_saver=SqliteScoreSaver(':memory:'), render=False)
+    stream: SceneStateStream = SceneStateStream(scene)
+    decoder: StateDecoder = StateDecoder()
+    encoded: bytearray = bytearray()
+    mismatches: int = 0
+    for _ in range(ticks):
+        if scene.game_state != GameState.PLAYING:
+            scene.next_task()
+        ball_x, _ = scene.ball.get_position()
+        scene.player.mouse_position_move((ball_x + 10, 0))
+        scene.update_game_scene()
+        frame: bytes = stream.encode_tick(scene.tick)
+        encoded += frame
+        if decoder.decode(split_frames(frame)[0]) != get_scene_state(scene):
+            mismatches += 1
+    scene.close()
+
+    frames: List[bytes] = split_frames(bytes(encoded))
+    keyframes: int = sum(len(frame) for frame in frames if frame[0] == FrameKind.KEYFRAME)
+    bytes_per_second: float = len(encoded) / ticks * TICKS_PER_SECOND
+    print(f'{os.path.basename(level):<8} {len(decoder.state.bricks):>7} '
+          f'{len(encoded) / ticks:10.1f} {bytes_per_second:10.0f} '
+          f'{keyframes / len(encoded):10.0%} {max(len(frame) for frame in frames):10} '
+          f'{mismatches:11}')
+    return mismatches == 0 and bytes_per_second <= BUDGET
+
+def main() -> None:
+    """
+    Every bundled level
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=8000)
+    arguments = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('State stream', 1000, 800, Common.START_MUSIC)
+    levels: List[str] = sorted(os.path.splitext(path)[0] for path in
+                               glob.glob(Common.GAME_NAME + 'assets/levels/game*.txt'))
+    print(f'{"level":<8} {"bricks":>7} {"bytes/tick":>10} {"bytes/s":>10} '
+          f'{"keyframes":>10} {"max frame":>10} {"mismatches":>11}')
+    succeeded: bool = all([measure(level, screen, arguments.ticks) for level in levels])
+    Canvas.quit()
+    if not succeeded:
+        print(f'ERROR: state stream mismatch or over {BUDGET} bytes/s')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Soak run: the bundled levels are played headless by the autopilot for a
+number of ticks, restarting each game when it ends. Prints the ticks per
+second, the balls lost and the levels won. The perfect autopilot must not
+lose any ball: exits with status 1 otherwise.
+Run from the directory containing candy_cat:
+python3 candy_cat/tools/soak_autopilot.py --ticks 20000 --profile perfect
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from random import Random
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# pylint: disable=wrong-import-position
+from domain.autopilot import Autopilot
+from domain.autopilot import AutopilotProfile
+from domain.autopilot import PERFECT
+from domain.autopilot import PROFILES
+from domain.common import Common
+from domain.metrics import Metrics
+from domain.sprites.sprites import Ball
+from infrastructure.gui_library import Canvas
+from services.create_scene_service import CreateSceneService
+from services.game_state import GameState
+from repository.sqlite_score_saver import SqliteScoreSaver
+
+def soak(level: str, screen: Canvas, ticks: int, profile: AutopilotProfile) -> int:
+    """
+    Play the level, print what happened. Returns the number of balls lost.
+    """
+    scene: CreateSceneService = CreateSceneService(
+        [level], screen, score_saver=SqliteScoreSaver(':memory:'), render=False)
+    random: Random = Random(0)
+    autopilot: Autopilot = None
+    ball: Ball = None
+    balls_lost: int = 0
+    levels_won: int = 0
+    Metrics.set('autopilot.predictions', 0)
+    start: float = time.perf_counter()
+    for _ in range(ticks):
+        if scene.game_state != GameState.PLAYING:
+            if scene.game_state == GameState.WAITING_PLAYER_READY_BEFORE_NEXT_LEVEL:
+                levels_won += 1
+            scene.next_task()
+        # A new ball is created for each life and each level
+        if scene.ball is not ball:
+            ball = scene.ball
+            autopilot = Autopilot(scene.player, ball, scene.collision_handler.exposed_faces,
+                                  profile, random)
+        autopilot.update()
+        remaining_balls: int = scene.remaining_balls
+        scene.update_game_scene()
+        if scene.remaining_balls < remaining_balls:
+            balls_lost += 1
+    elapsed: float = time.perf_counter() - start
+    scene.close()
+    print(f'{os.path.basename(level):<8} {ticks / elapsed:10.0f} {balls_lost:11} '
+          f'{levels_won:11} {Metrics.get("autopilot.predictions"):12}')
+    return balls_lost
+
+def main() -> None:
+    """
+    Every bundled level, or the ones given
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=20000, help='ticks per level')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=PERFECT.name)
+    parser.add_argument('--levels', nargs='*', metavar='LEVEL',
+                        help='names of bundled levels or paths of level files without '
+                             'their .txt suffix (see generate_level.py), all the bundled '
+                             'levels when not given')
+    arguments = parser.parse_args()
+    level_files: List[str] = [os.path.abspath(level) for level in arguments.levels or []
+                              if os.sep in level]
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    screen: Canvas = Canvas('Soak', 1000, 800, Common.START_MUSIC)
+    levels: List[str] = sorted(os.path.splitext(path)[0] for path in
+                               glob.glob(Common.GAME_NAME + 'assets/levels/game*.txt'))
+    if arguments.levels:
+        # Level files are read relative to the current directory
+        levels = [Common.GAME_NAME + 'assets/levels/' + level for level in arguments.levels
+                  if os.sep not in level] + [os.path.relpath(path) for path in level_files]
+    profile: AutopilotProfile = PROFILES[arguments.profile]
+    print(f'{"level":<8} {"ticks/s":>10} {"balls lost":>11} {"levels won":>11} '
+          f'{"predictions":>12}')
+    balls_lost: int = sum([soak(level, screen, arguments.ticks, profile) for level in levels])
+    Canvas.quit()
+    if profile is PERFECT and balls_lost > 0:
+        print(f'ERROR: the perfect autopilot lost {balls_lost} balls')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()